@@ -0,0 +1,134 @@
+"""
+🗃️ Folyamaton belüli gyorsítótárak
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Optional
+
+
+def normalize_city(city: str) -> str:
+    """Város név normalizálása cache kulcshoz"""
+    return " ".join(city.split()).casefold()
+
+
+class TTLCache:
+    """
+    Szálbiztos, méretkorlátos LRU cache lejárati idővel.
+
+    A bejegyzések `ttl` másodperc után lejárnak, a méretkorlát elérésekor
+    a legrégebben használt bejegyzés kerül ki.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 1800):
+        """
+        :param maxsize: Bejegyzések maximális száma
+        :param ttl: Élettartam másodpercben
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Érték lekérése, lejárt vagy hiányzó kulcsnál None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any):
+        """Érték eltárolása"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def expires_in(self, key: str) -> Optional[float]:
+        """Hátralévő élettartam másodpercben (lejárt vagy hiányzó kulcsnál None); a számlálókat nem érinti"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            remaining = entry[0] - time.monotonic()
+            return remaining if remaining > 0 else None
+
+    def clear(self):
+        """Cache ürítése és számlálók nullázása"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Cache statisztikák"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+
+class SingleFlight:
+    """
+    Párhuzamos kérések összevonása kulcsonként.
+
+    Egy kulcshoz egyszerre csak egy hívás fut; az ugyanarra a kulcsra közben
+    érkező hívók megvárják és megkapják annak eredményét (vagy kivételét).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        """`func` futtatása, vagy csatlakozás a kulcshoz tartozó futó híváshoz"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def active(self, key: Hashable) -> bool:
+        """Fut-e éppen hívás a kulcshoz"""
+        with self._lock:
+            return key in self._calls
+
+    def in_flight(self) -> int:
+        """Éppen futó hívások száma"""
+        with self._lock:
+            return len(self._calls)
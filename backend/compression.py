@@ -0,0 +1,177 @@
+"""
+🗜️ Válasz tömörítés (Accept-Encoding alapján brotli vagy gzip)
+
+ASGI middleware: a küszöb alatti válaszokat változatlanul adja tovább, a
+nagyobb JSON/szöveges válaszokat a kliens által elfogadott, általunk
+preferált kódolással tömöríti. Folyamatos (streaming) válaszoknál a
+darabokat menet közben tömöríti. A brotli opcionális: ha a csomag nincs
+telepítve, csak gzip érhető el.
+"""
+import zlib
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Tömöríthető tartalomtípusok (a képek, már tömörített fájlok kimaradnak)
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/",
+)
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """Accept-Encoding fejléc → {kódolás: q érték}"""
+    encodings = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        encodings[name] = quality
+    return encodings
+
+
+class _GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip fejléc
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """Tárgyalt brotli/gzip tömörítés méret küszöbbel és állítható szinttel"""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        """
+        :param minimum_size: Ennél kisebb (bájt) válaszok tömörítetlenül mennek
+        :param gzip_level: gzip tömörítési szint (1-9)
+        :param brotli_quality: brotli minőség (0-11); a magas értékek CPU-igényesek
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        """A kliens által elfogadott legjobb kódolás (brotli előnyben, ha telepítve van)"""
+        accepted = parse_accept_encoding(accept_encoding)
+        candidates = (["br"] if brotli is not None else []) + ["gzip"]
+        best = None
+        for name in candidates:
+            quality = accepted.get(name, accepted.get("*", 0.0))
+            if quality > 0 and (best is None or quality > best[1]):
+                best = (name, quality)
+        return best[0] if best else None
+
+    def _encoder(self, name: str):
+        if name == "br":
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = self.choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        encoder = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, encoder, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if encoder is None:
+                response_headers = {key.lower(): value for key, value in start_message["headers"]}
+                content_type = response_headers.get(b"content-type", b"").decode("latin-1")
+                if (
+                    b"content-encoding" in response_headers
+                    or start_message["status"] in (204, 304)
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                encoder = self._encoder(encoding)
+                new_headers = [
+                    (key, value) for key, value in start_message["headers"]
+                    if key.lower() not in (b"content-length", b"vary")
+                ]
+                vary = response_headers.get(b"vary")
+                new_headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+                new_headers.append((b"content-encoding", encoding.encode()))
+
+                if not more_body:
+                    compressed = encoder.process(body) + encoder.finish()
+                    new_headers.append((b"content-length", str(len(compressed)).encode()))
+                    await send({**start_message, "headers": new_headers})
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+
+                # Streaming válasz: hossz nélkül, darabonként tömörítve
+                await send({**start_message, "headers": new_headers})
+
+            if more_body:
+                chunk = encoder.process(body) + encoder.flush()
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": encoder.process(body) + encoder.finish()})
+
+        await self.app(scope, receive, send_compressed)
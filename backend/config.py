@@ -12,13 +12,58 @@ class Config:
     
     # OpenWeather API
     OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
+    # Alap URL - teszteléshez hamis upstreamre állítható (benchmarks/fake_upstream.py)
+    OPENWEATHER_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "https://api.openweathermap.org/data/2.5")
     
     # Adatbázis
-    DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./weather.db")
+    DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./weather.db")  # fájl vagy szerver; :memory: nem támogatott
+    SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "performance")  # "performance" (WAL) vagy "default"
+    READ_DATABASE_URL = os.getenv("READ_DATABASE_URL", "")  # opcionális olvasó replika
+    ASYNC_POOL_SIZE = int(os.getenv("ASYNC_POOL_SIZE", 20))  # async olvasó kapcsolatok (aiosqlite/asyncpg)
+    
+    # Író szál (egyetlen író, kötegelt mentés)
+    WRITER_QUEUE_SIZE = int(os.getenv("WRITER_QUEUE_SIZE", 10000))
+    WRITER_BATCH_SIZE = int(os.getenv("WRITER_BATCH_SIZE", 500))
+    WRITER_FLUSH_INTERVAL = float(os.getenv("WRITER_FLUSH_INTERVAL", 0.05))  # másodperc
     
     # Alkalmazás beállítások
     SCHEDULE_INTERVAL = int(os.getenv("SCHEDULE_INTERVAL", 30))  # perc
     DEFAULT_CITIES = os.getenv("DEFAULT_CITIES", "Budapest,Debrecen,Szeged,Pécs,Győr,Miskolc,Nyíregyháza").split(",")
+    SCHEDULER_MAX_WORKERS = int(os.getenv("SCHEDULER_MAX_WORKERS", 8))  # párhuzamosan frissített városok
+    
+    # Upstream (OpenWeather) HTTP kliens
+    UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", 10))
+    UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", 3.05))  # másodperc
+    UPSTREAM_RETRIES = int(os.getenv("UPSTREAM_RETRIES", 1))
+    UPSTREAM_POOL_TIMEOUT = float(os.getenv("UPSTREAM_POOL_TIMEOUT", 5))  # várakozás szabad kapcsolatra (mp)
+    UPSTREAM_BATCH_ENABLED = os.getenv("UPSTREAM_BATCH_ENABLED", "true").lower() in ("1", "true", "yes")
+    UPSTREAM_BATCH_SIZE = min(int(os.getenv("UPSTREAM_BATCH_SIZE", 20)), 20)  # /group végpont: max. 20 város
+    
+    # Aktuális időjárás frissessége (stale-while-revalidate)
+    WEATHER_SERVE_STALE = os.getenv("WEATHER_SERVE_STALE", "true").lower() in ("1", "true", "yes")
+    WEATHER_SOFT_MAX_AGE = int(os.getenv("WEATHER_SOFT_MAX_AGE", 600))   # másodperc - efölött háttérfrissítés
+    WEATHER_HARD_MAX_AGE = int(os.getenv("WEATHER_HARD_MAX_AGE", 3600))  # másodperc - efölött blokkoló frissítés
+    WEATHER_BATCH_MAX_CITIES = int(os.getenv("WEATHER_BATCH_MAX_CITIES", 20))  # /api/weather/batch városlimit
+    
+    # Előrejelzés cache
+    FORECAST_CACHE_TTL = int(os.getenv("FORECAST_CACHE_TTL", 1800))  # másodperc
+    FORECAST_CACHE_SIZE = int(os.getenv("FORECAST_CACHE_SIZE", 256))
+    
+    # Adatmegőrzés
+    RETENTION_ENABLED = os.getenv("RETENTION_ENABLED", "true").lower() in ("1", "true", "yes")
+    RAW_RETENTION_DAYS = int(os.getenv("RAW_RETENTION_DAYS", 35))        # nyers mérések
+    HOURLY_RETENTION_DAYS = int(os.getenv("HOURLY_RETENTION_DAYS", 90))  # óránkénti összesítések
+    RETENTION_INTERVAL = int(os.getenv("RETENTION_INTERVAL", 60))        # perc
+    RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", 1000))
+    
+    # Előzmény export (streaming NDJSON / CSV)
+    EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 1000))  # sorok adatbázis körönként
+    
+    # Válasz tömörítés (brotli, ha telepítve van, egyébként gzip)
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))  # bájt - ez alatt nincs tömörítés
+    GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 6))          # 1-9
+    BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 4))  # 0-11
     
     # CORS beállítások
     FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:8501")
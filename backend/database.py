@@ -1,22 +1,138 @@
 """Adatbázis kapcsolat és session kezelés"""
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
-from .config import settings
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-# SQLite adatbázis létrehozása
-engine = create_engine(
-    settings.DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
+# Abszolút importok
+try:
+    from .config import config
+    from .models import Base
+except ImportError:
+    from config import config
+    from models import Base
+
+# SQLite PRAGMA profilok - minden új kapcsolatra lefutnak
+SQLITE_PROFILES = {
+    # Az SQLite gyári beállításai (rollback journal, synchronous=FULL)
+    "default": {},
+    # WAL: az olvasók nem várnak az íróra; NORMAL szinkron WAL mellett biztonságos
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,          # ms - zárolásnál várakozás hiba helyett
+        "cache_size": -65536,          # 64 MB lap cache (negatív = KiB)
+        "mmap_size": 268435456,        # 256 MB memóriába képzett olvasás
+        "temp_store": "MEMORY",
+    },
+}
+
+# Szinkron driver → async driver (a végpontok olvasási útvonalához)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """Adatbázis URL átírása az async driverre (sqlite → aiosqlite, postgresql → asyncpg)"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Nincs async driver ehhez az adatbázishoz: {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def _new_engine(database_url: str, use_async: bool, **kwargs):
+    if use_async:
+        return create_async_engine(to_async_url(database_url), **kwargs)
+    return create_engine(database_url, **kwargs)
+
+
+def create_db_engine(database_url: str, sqlite_profile: str = "performance", read_only: bool = False,
+                     use_async: bool = False, **kwargs):
+    """
+    Engine létrehozása; SQLite esetén a kiválasztott PRAGMA profillal.
+    `read_only` esetén az SQLite fájl csak olvasásra nyílik meg,
+    `use_async` esetén AsyncEngine jön létre (aiosqlite / asyncpg).
+    """
+    if "sqlite" not in database_url:
+        return _new_engine(database_url, use_async, **kwargs)
+
+    if sqlite_profile not in SQLITE_PROFILES:
+        raise ValueError(f"Ismeretlen SQLite profil: {sqlite_profile} ({', '.join(SQLITE_PROFILES)})")
+
+    pragmas = dict(SQLITE_PROFILES[sqlite_profile])
+    if read_only:
+        # A naplózási módot az író kapcsolat állítja; az olvasó csak lekérdezhet
+        pragmas.pop("journal_mode", None)
+        pragmas["query_only"] = 1
+        database_url = f"sqlite:///file:{make_url(database_url).database}?mode=ro&uri=true"
+
+    path = make_url(database_url).database
+    if use_async and path and path != ":memory:":
+        # Az aiosqlite fájl adatbázisnál alapból nem poolol (minden session új
+        # kapcsolat és szál), ezért a kapcsolatokat itt is újrahasznosítjuk
+        kwargs.setdefault("poolclass", AsyncAdaptedQueuePool)
+
+    engine = _new_engine(
+        database_url,
+        use_async,
+        connect_args={"check_same_thread": False},
+        **kwargs
+    )
+
+    if pragmas:
+        @event.listens_for(engine.sync_engine if use_async else engine, "connect")
+        def apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for name, value in pragmas.items():
+                    cursor.execute(f"PRAGMA {name}={value}")
+            finally:
+                cursor.close()
+
+    return engine
+
+
+def create_read_engine(database_url: str, read_database_url: str = "", sqlite_profile: str = "performance",
+                       **kwargs):
+    """
+    Külön async kapcsolat-pool az olvasó végpontokhoz.
+    SQLite fájlnál csak olvasható kapcsolatok (WAL mellett nem várnak az íróra),
+    egyébként a megadott replika vagy ugyanaz az adatbázis külön poollal.
+    Memóriabeli SQLite (sqlite:///:memory:) nem támogatott: azt csak az író kapcsolat látná.
+    """
+    if read_database_url:
+        return create_db_engine(read_database_url, sqlite_profile, use_async=True, **kwargs)
+
+    if "sqlite" in database_url:
+        path = make_url(database_url).database
+        if not path or path == ":memory:":
+            raise ValueError("Memóriabeli SQLite adatbázishoz nincs külön async olvasó kapcsolat")
+        return create_db_engine(database_url, sqlite_profile, read_only=True, use_async=True, **kwargs)
+
+    return create_db_engine(database_url, use_async=True, **kwargs)
+
+
+engine = create_db_engine(config.DATABASE_URL, config.SQLITE_PROFILE)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
 
-def get_db():
-    """Dependency injection az adatbázis sessionhez"""
-    db = SessionLocal()
-    try:
+# Async olvasó útvonal: a végpontok nem foglalnak szálat az adatbázis várakozás idejére
+async_read_engine = create_read_engine(
+    config.DATABASE_URL,
+    config.READ_DATABASE_URL,
+    config.SQLITE_PROFILE,
+    pool_size=config.ASYNC_POOL_SIZE,
+    max_overflow=config.ASYNC_POOL_SIZE
+)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_read_db():
+    """Dependency injection az async, csak olvasó sessionhöz"""
+    async with AsyncReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
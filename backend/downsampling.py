@@ -0,0 +1,96 @@
+"""
+📉 Idősor ritkítás diagramokhoz
+
+Mindkét módszer a bemenet sorindexeit adja vissza (valódi mérések maradnak,
+nem számolt átlagok), így a hőmérséklet és a páratartalom ugyanazokból a
+pontokból rajzolható:
+
+- "minmax": időrekeszenként a minimum és a maximum pont - a szélsőértékek
+  garantáltan megmaradnak, teljesen vektorizált.
+- "lttb": Largest-Triangle-Three-Buckets - a görbe alakját tartja meg;
+  rekeszenként vektorizált, a rekeszek között szekvenciális.
+"""
+import numpy as np
+
+METHODS = ("minmax", "lttb")
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Időalapú rekeszelés `points // 2` egyenlő hosszú időrekeszbe, rekeszenként
+    a legkisebb és a legnagyobb `y` értékű pont indexe, időrendben.
+    """
+    n = len(x)
+    if n <= points:
+        return np.arange(n)
+
+    buckets = max(1, points // 2)
+    span = x[-1] - x[0]
+    if span <= 0:
+        bucket_of = np.zeros(n, dtype=np.int64)
+    else:
+        bucket_of = np.minimum(((x - x[0]) / span * buckets).astype(np.int64), buckets - 1)
+
+    # Rekesz, azon belül y szerint rendezve: minden rekesz első eleme a minimum, utolsó a maximum
+    order = np.lexsort((y, bucket_of))
+    sorted_buckets = bucket_of[order]
+    starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+
+    return np.unique(np.concatenate((order[starts], order[ends])))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: az első és utolsó pont mellett rekeszenként egy pont"""
+    n = len(x)
+    if n <= points or points < 3:
+        return np.arange(n)
+
+    # A belső pontok `points - 2` közel egyenlő méretű rekeszben
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    selected = np.empty(points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for bucket in range(points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # A következő rekesz átlaga (az utolsónál maga az utolsó pont)
+        if bucket < points - 3:
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        # Háromszög területek a rekesz összes pontjára egyszerre
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def downsample(timestamps: np.ndarray, values: np.ndarray, points: int, method: str = "minmax") -> np.ndarray:
+    """
+    Kiválasztott sorindexek időrendben.
+    :param timestamps: Időpontok (datetime64 vagy szám), növekvő sorrendben
+    :param values: A ritkítás alapjául szolgáló értékek (pl. hőmérséklet)
+    :param points: Legfeljebb ennyi pont maradjon
+    :param method: "minmax" vagy "lttb"
+    """
+    if method not in METHODS:
+        raise ValueError(f"Ismeretlen ritkítási módszer: {method} ({', '.join(METHODS)})")
+
+    timestamps = np.asarray(timestamps)
+    if timestamps.dtype.kind == "M":
+        timestamps = timestamps.astype("datetime64[us]").astype(np.int64)
+    x = timestamps.astype(np.float64)
+    y = np.asarray(values, dtype=np.float64)
+
+    if method == "lttb":
+        return lttb_indices(x, y, points)
+    return minmax_indices(x, y, points)
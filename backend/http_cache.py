@@ -0,0 +1,78 @@
+"""
+🏷️ HTTP feltételes gyorsítótárazás (ETag / Last-Modified / Cache-Control)
+
+A validátorok olcsón előállítható adatokból (a város legfrissebb mérésének
+időbélyege, az előrejelzés `last_update` mezője) készülnek, így egy
+`If-None-Match` / `If-Modified-Since` kérésre a végpont a drága lekérdezés és
+a szerializálás előtt válaszolhat 304-gyel.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts) -> str:
+    """
+    Gyenge ETag a megadott részekből (pl. város, időbélyeg, paraméterek).
+    Gyenge, mert a tömörített és a tömörítetlen válasz ugyanazt jelenti.
+    """
+    digest = hashlib.blake2b("|".join(str(part) for part in parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def http_date(value: datetime) -> str:
+    """UTC (naiv) időpont HTTP dátum formátumban"""
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match összevetése gyenge összehasonlítással"""
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Feltételes kérés kiértékelése (RFC 9110): ha van If-None-Match, csak az
+    számít, egyébként az If-Modified-Since a másodperc pontosságú Last-Modified-hoz.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime] = None, max_age: float = 0) -> dict:
+    """Validátor és Cache-Control fejlécek; a max-age a hátralévő frissességhez igazodik"""
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max(0, int(max_age))}"
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def set_cache_headers(response: Response, etag: str, last_modified: Optional[datetime] = None, max_age: float = 0):
+    """Fejlécek beállítása egy (még el nem küldött) válaszon"""
+    response.headers.update(cache_headers(etag, last_modified, max_age))
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None, max_age: float = 0) -> Response:
+    """304 Not Modified válasz törzs nélkül, ugyanazokkal a fejlécekkel"""
+    return Response(status_code=304, headers=cache_headers(etag, last_modified, max_age))
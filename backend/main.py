@@ -1,26 +1,57 @@
 """
 🌤️ Weather Dashboard Backend
 """
-from fastapi import FastAPI, HTTPException, Query, Depends
+from fastapi import FastAPI, HTTPException, Query, Depends, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, func
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from datetime import datetime, timedelta
-import requests
+from datetime import date, datetime, timedelta, timezone
+import asyncio
+import base64
+from collections import Counter
+import csv
+import io
+import json
 import logging
-from typing import List, Optional, Dict
+from typing import AsyncIterator, List, Optional, Dict, Tuple
+from urllib.parse import quote
 import math
+import numpy as np
 import uvicorn
 
 # Abszolút importok
 try:
     from .config import config
     from .scheduler import WeatherScheduler 
+    from .upstream import upstream
+    from .cache import TTLCache, SingleFlight, normalize_city
+    from .http_cache import make_etag, is_not_modified, set_cache_headers, not_modified
+    from .compression import CompressionMiddleware
+    from .downsampling import downsample
+    from .migrations import run_migrations
+    from .database import engine, SessionLocal, AsyncReadSessionLocal, async_read_engine, get_async_read_db
+    from .writer import WeatherWriter
+    from .models import WeatherRecord, LatestWeatherRecord, CityIdRecord, dialect_insert
+    from .rollups import apply_rollups, weather_stats_stmt, weather_stats_matrix_stmt, window_stats
+    from .retention import RetentionJob
 except ImportError:
     from config import config
     from scheduler import WeatherScheduler
+    from upstream import upstream
+    from cache import TTLCache, SingleFlight, normalize_city
+    from http_cache import make_etag, is_not_modified, set_cache_headers, not_modified
+    from compression import CompressionMiddleware
+    from downsampling import downsample
+    from migrations import run_migrations
+    from database import engine, SessionLocal, AsyncReadSessionLocal, async_read_engine, get_async_read_db
+    from writer import WeatherWriter
+    from models import WeatherRecord, LatestWeatherRecord, CityIdRecord, dialect_insert
+    from rollups import apply_rollups, weather_stats_stmt, weather_stats_matrix_stmt, window_stats
+    from retention import RetentionJob
 
 # 1. Logging beállítás
 logging.basicConfig(
@@ -29,31 +60,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# 2. Adatbázis beállítás
-engine = create_engine(
-    config.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in config.DATABASE_URL else {}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
-
-# 3. Adatmodell
-class WeatherRecord(Base):
-    """Időjárás rekord modell"""
-    __tablename__ = "weather"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    city = Column(String, index=True)
-    temperature = Column(Float)
-    humidity = Column(Integer)
-    pressure = Column(Integer, nullable=True)
-    wind_speed = Column(Float, nullable=True)
-    description = Column(String)
-    icon = Column(String, nullable=True)
-    timestamp = Column(DateTime, default=datetime.utcnow)
-
-# Tábla létrehozása
-Base.metadata.create_all(bind=engine)
+# 2. Adatbázis beállítás (database.py - SQLite esetén PRAGMA profillal)
+
+# 3. Adatmodell (models.py)
+# Séma létrehozása / frissítése migrációkkal
+run_migrations(engine)
 
 # 4. Pydantic modellek
 class WeatherResponse(BaseModel):
@@ -70,6 +81,30 @@ class WeatherResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class CityWeatherResult(BaseModel):
+    """Egy város eredménye a csoportos lekérdezésben"""
+    city: str
+    status: str  # fresh | stale | refreshed | not_found
+    age_seconds: Optional[int] = None
+    weather: Optional[WeatherResponse] = None
+
+class WeatherBatchResponse(BaseModel):
+    """Csoportos aktuális időjárás válasz séma"""
+    results: List[CityWeatherResult]
+
+class SeriesPoint(BaseModel):
+    """Idősor pont (valódi mérés)"""
+    timestamp: datetime
+    temperature: float
+    humidity: int
+
+class WeatherSeries(BaseModel):
+    """Diagramhoz ritkított idősor séma"""
+    city: str
+    method: str
+    source_points: int  # a tartományban lévő összes mérés
+    points: List[SeriesPoint]
+
 class WeatherStats(BaseModel):
     """Statisztika séma"""
     city: str
@@ -80,6 +115,13 @@ class WeatherStats(BaseModel):
     record_count: int
     last_update: Optional[datetime] = None
 
+class WeatherStatsMatrix(BaseModel):
+    """Több város × több időablak statisztika séma"""
+    cities: List[str]
+    hours: List[int]
+    # város → időablak (óra, szövegként) → statisztika (None, ha nincs mérés)
+    stats: Dict[str, Dict[str, Optional[WeatherStats]]]
+
 class DailyForecast(BaseModel):
     """Napi előrejelzés séma"""
     date: str
@@ -109,42 +151,98 @@ def kelvin_to_celsius(kelvin: float) -> float:
     """Kelvin → Celsius konverzió"""
     return round(kelvin - 273.15, 2)
 
-def get_db():
-    """Adatbázis session dependency"""
-    db = SessionLocal()
+def mark_stale(response: Response, age: float):
+    """Elavult adat jelölése a válasz fejlécekben"""
+    response.headers["Age"] = str(int(age))
+    response.headers["Warning"] = '110 - "Response is Stale"'
+    response.headers["X-Data-Stale"] = "true"
+
+def weather_freshness(record, now: Optional[datetime] = None) -> tuple:
+    """
+    Tárolt rekord besorolása a soft/hard max-age alapján: (állapot, kor mp-ben).
+    "fresh": kiszolgálható, "stale": kiszolgálható háttérfrissítéssel,
+    "expired": nincs vagy túl régi adat, blokkoló frissítés kell.
+    """
+    if record is None:
+        return "expired", None
+    
+    age = ((now or datetime.utcnow()) - record.timestamp).total_seconds()
+    if age <= config.WEATHER_SOFT_MAX_AGE:
+        return "fresh", age
+    if config.WEATHER_SERVE_STALE and age <= config.WEATHER_HARD_MAX_AGE:
+        return "stale", age
+    return "expired", age
+
+def latest_validators(city: str, record, *params) -> tuple:
+    """ETag és Last-Modified a város legfrissebb mérése (latest_weather) és a kérés paraméterei alapján"""
+    timestamp = record.timestamp if record else None
+    return make_etag(city, timestamp.isoformat() if timestamp else "-", *params), timestamp
+
+def freshness_max_age(record, now: Optional[datetime] = None) -> float:
+    """Cache-Control max-age: a soft max-age-ből hátralévő idő (elavult adatnál 0)"""
+    if record is None:
+        return 0
+    age = ((now or datetime.utcnow()) - record.timestamp).total_seconds()
+    return max(0, config.WEATHER_SOFT_MAX_AGE - age)
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Időzónás időpont átváltása az adatbázisban tárolt naiv UTC-re"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def encode_cursor(record) -> str:
+    """Lapozási kurzor a (timestamp, id) kulcsból"""
+    raw = f"{record.timestamp.isoformat()}|{record.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    """Kurzor visszafejtése (timestamp, id) párrá; hibás kurzornál 400"""
     try:
-        yield db
-    finally:
-        db.close()
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, record_id = raw.split("|")
+        return datetime.fromisoformat(timestamp), int(record_id)
+    except ValueError:
+        raise HTTPException(400, "Érvénytelen lapozási kurzor")
+
+def parse_hours_list(hours: str) -> List[int]:
+    """Vesszővel elválasztott időablak lista (óra), ismétlődések nélkül"""
+    try:
+        return list(dict.fromkeys(int(value) for value in hours.split(",") if value.strip()))
+    except ValueError:
+        raise HTTPException(400, f"Érvénytelen időablak lista: {hours}")
+
+def parse_city_list(cities: str) -> List[str]:
+    """Vesszővel elválasztott városlista: üres elemek és ismétlődések nélkül, sorrendtartóan"""
+    result = {}
+    for city in cities.split(","):
+        city = city.strip()
+        if city and normalize_city(city) not in result:
+            result[normalize_city(city)] = city
+    return list(result.values())
+
+def parse_weather_payload(data: dict) -> dict:
+    """OpenWeather aktuális időjárás válasz átalakítása mentendő adattá"""
+    return {
+        "city": data["name"],
+        "temperature": data["main"]["temp"],
+        "humidity": data["main"]["humidity"],
+        "pressure": data["main"]["pressure"],
+        "wind_speed": data["wind"]["speed"],
+        "description": data["weather"][0]["description"],
+        "icon": data["weather"][0]["icon"],
+        "timestamp": datetime.utcnow()
+    }
 
 def fetch_weather_from_api(city: str):
     """Időjárás lekérdezése OpenWeather API-ról"""
     try:
         logger.info(f"API hívás: {city}")
         
-        response = requests.get(
-            "https://api.openweathermap.org/data/2.5/weather",
-            params={
-                "q": city,
-                "appid": config.OPENWEATHER_API_KEY,
-                "lang": "hu",
-                "units": "metric"
-            },
-            timeout=10
-        )
+        response = upstream.get("/weather", params={"q": city}, timeout=10)
         
         if response.status_code == 200:
-            data = response.json()
-            return {
-                "city": data["name"],
-                "temperature": data["main"]["temp"],
-                "humidity": data["main"]["humidity"],
-                "pressure": data["main"]["pressure"],
-                "wind_speed": data["wind"]["speed"],
-                "description": data["weather"][0]["description"],
-                "icon": data["weather"][0]["icon"],
-                "timestamp": datetime.utcnow()
-            }
+            return parse_weather_payload(response.json())
         else:
             logger.error(f"API hiba ({response.status_code}): {city}")
             
@@ -153,19 +251,112 @@ def fetch_weather_from_api(city: str):
     
     return None
 
+def save_city_ids(records: List[dict]) -> int:
+    """Feloldott város azonosítók mentése egy tranzakcióban (az író szálon fut)"""
+    db = SessionLocal()
+    try:
+        for record in records:
+            db.merge(CityIdRecord(**record))
+        db.commit()
+        return len(records)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def resolve_city_ids(cities: List[str]) -> Tuple[Dict[str, int], Dict[str, dict]]:
+    """
+    Városnevek feloldása OpenWeather város azonosítókká.
+    Az ismert azonosítók az adatbázisból jönnek, az ismeretleneket egy
+    egyszeri /weather hívással oldjuk fel, és az író szálon keresztül mentjük.
+    A feloldó hívások mérései is visszajönnek (város → adat), hogy ezeket
+    a városokat ebben a ciklusban ne kérjük le újra.
+    """
+    keys = {city: normalize_city(city) for city in cities}
+    db = SessionLocal()
+    try:
+        known = {
+            row.name: row.city_id
+            for row in db.query(CityIdRecord).filter(CityIdRecord.name.in_(set(keys.values())))
+        }
+    finally:
+        db.close()
+    
+    resolved = []
+    payloads = {}
+    for city, key in keys.items():
+        if key in known:
+            continue
+        try:
+            response = upstream.get("/weather", params={"q": city}, timeout=10)
+            if response.status_code != 200:
+                logger.error(f"Város azonosító nem oldható fel ({response.status_code}): {city}")
+                continue
+            data = response.json()
+            known[key] = data["id"]
+            resolved.append({"name": key, "city_id": data["id"], "resolved_name": data["name"]})
+            payloads[city] = parse_weather_payload(data)
+        except Exception as e:
+            logger.error(f"Hiba város azonosító feloldásakor ({city}): {e}")
+    
+    if resolved:
+        try:
+            writer.run(lambda: save_city_ids(resolved))
+        except Exception as e:
+            # A feloldott azonosítók ebben a körben így is használhatók
+            logger.error(f"Hiba város azonosítók mentésekor: {e}")
+    
+    return {city: known[key] for city, key in keys.items() if key in known}, payloads
+
+def fetch_weather_batch_from_api(cities: List[str]) -> Dict[str, Optional[dict]]:
+    """
+    Több város aktuális időjárása egyetlen /group hívással (max. 20 azonosító).
+    Az éppen feloldott városok a feloldó hívás mérését kapják. None az
+    értéke a fel nem oldható városoknak és - ha a /group hívás egészében
+    sikertelen - a csoport városainak: ezeket ebben a ciklusban nem kérjük
+    le újra. A sikeres /group válaszból kimaradt városok hiányoznak.
+    """
+    city_ids, payloads = resolve_city_ids(cities)
+    result = {city: payloads.get(city) for city in cities if city not in city_ids or city in payloads}
+    pending = {city: city_id for city, city_id in city_ids.items() if city not in payloads}
+    if not pending:
+        return result
+    
+    try:
+        logger.info(f"Csoportos API hívás: {len(pending)} város")
+        response = upstream.get(
+            "/group",
+            params={"id": ",".join(str(city_id) for city_id in pending.values())},
+            timeout=15
+        )
+        
+        if response.status_code != 200:
+            logger.error(f"Csoportos API hiba ({response.status_code}): {', '.join(pending)}")
+            return {**result, **dict.fromkeys(pending)}
+        
+        by_id = {item["id"]: item for item in response.json().get("list", [])}
+        result.update({
+            city: parse_weather_payload(by_id[city_id])
+            for city, city_id in pending.items()
+            if city_id in by_id
+        })
+        return result
+    
+    except Exception as e:
+        logger.error(f"Hiba csoportos API hívásnál: {e}")
+        return {**result, **dict.fromkeys(pending)}
+
 def fetch_forecast_from_api(city: str):
     """7 napos előrejelzés lekérdezése OpenWeather API-ról"""
     try:
         logger.info(f"Előrejelzés API hívás: {city}")
         
         # OpenWeather 5 napos/3 órás előrejelzés
-        response = requests.get(
-            "https://api.openweathermap.org/data/2.5/forecast",
+        response = upstream.get(
+            "/forecast",
             params={
                 "q": city,
-                "appid": config.OPENWEATHER_API_KEY,
-                "lang": "hu",
-                "units": "metric",
                 "cnt": 40  # 5 nap * 8 mérés/nap = 40
             },
             timeout=15
@@ -182,162 +373,444 @@ def fetch_forecast_from_api(city: str):
     
     return None
 
-def process_forecast_data(data: dict):
-    """API adatok feldolgozása napi előrejelzésekké (7 napra)"""
+class _DayAccumulator:
+    """Egy nap futó összesítése (slotokkal - nincs napi listaépítés)"""
+    __slots__ = (
+        "count", "temp_sum", "temp_min", "temp_max", "day_sum", "day_count", "night_sum", "night_count",
+        "humidity_sum", "pressure_sum", "wind_sum", "pop_max", "descriptions", "icons"
+    )
+
+    def __init__(self, temp, pop):
+        self.count = 0
+        self.temp_sum = 0
+        self.temp_min = temp
+        self.temp_max = temp
+        self.day_sum = 0      # 9-18 óra
+        self.day_count = 0
+        self.night_sum = 0    # 21-6 óra
+        self.night_count = 0
+        self.humidity_sum = 0
+        self.pressure_sum = 0
+        self.wind_sum = 0
+        self.pop_max = pop
+        self.descriptions = Counter()
+        self.icons = Counter()
+
+
+def _reduce_forecast_slots(slots: list) -> dict:
+    """
+    Egy menetes összesítés dátumonként: futó összegek, min/max és Counter a
+    leírásokra/ikonokra - nincs mérésenkénti listaépítés és strftime.
+    """
+    daily = {}
+
+    for forecast in slots:
+        dt = datetime.fromtimestamp(forecast["dt"])
+        main = forecast["main"]
+        temp = main["temp"]
+        weather = forecast["weather"][0]
+        pop = forecast.get("pop", 0)
+
+        date_key = dt.date()
+        day = daily.get(date_key)
+        if day is None:
+            day = daily[date_key] = _DayAccumulator(temp, pop)
+
+        day.count += 1
+        day.temp_sum += temp
+        if temp < day.temp_min:
+            day.temp_min = temp
+        elif temp > day.temp_max:
+            day.temp_max = temp
+        day.humidity_sum += main["humidity"]
+        day.pressure_sum += main["pressure"]
+        day.wind_sum += forecast["wind"]["speed"]
+        if pop > day.pop_max:
+            day.pop_max = pop
+        day.descriptions[weather["description"]] += 1
+        day.icons[weather["icon"]] += 1
+
+        # Nappali/éjszakai hőmérséklet elkülönítése
+        hour = dt.hour
+        if 9 <= hour <= 18:
+            day.day_sum += temp
+            day.day_count += 1
+        elif hour <= 6 or hour >= 21:
+            day.night_sum += temp
+            day.night_count += 1
+
+    return daily
+
+
+def _daily_forecast(date_key: date, day: _DayAccumulator) -> DailyForecast:
+    """Összesített nap → DailyForecast (a mezők már típushelyesek, validálás nélkül)"""
+    avg_temp = day.temp_sum / day.count
+    # Ha nincs nappali/éjszakai adat, használjuk az átlagot
+    avg_day_temp = day.day_sum / day.day_count if day.day_count else avg_temp
+    avg_night_temp = day.night_sum / day.night_count if day.night_count else avg_temp
+
+    # Leggyakoribb leírás és ikon (holtversenynél az elsőként előforduló)
+    descriptions, icons = day.descriptions, day.icons
+
+    return DailyForecast.model_construct(
+        date=date_key.isoformat(),
+        day_temp=float(round(avg_day_temp, 1)),
+        night_temp=float(round(avg_night_temp, 1)),
+        min_temp=float(round(day.temp_min, 1)),
+        max_temp=float(round(day.temp_max, 1)),
+        humidity=round(day.humidity_sum / day.count),
+        pressure=round(day.pressure_sum / day.count),
+        wind_speed=float(round(day.wind_sum / day.count, 1)),
+        description=max(descriptions, key=descriptions.__getitem__),
+        icon=max(icons, key=icons.__getitem__),
+        pop=float(round(day.pop_max * 100))  # Százalékban
+    )
+
+
+def process_forecast_data(data: dict, today: Optional[date] = None):
+    """
+    API adatok feldolgozása napi előrejelzésekké (7 napra).
+    :param today: A szűrés alapja (alapból a helyi mai nap); kötegelt feldolgozásnál egyszer számolva
+    """
     try:
         city = data["city"]["name"]
         country = data["city"]["country"]
-        
-        # Csoportosítás dátum szerint
-        daily_data = {}
-        
-        for forecast in data["list"]:
-            # Konvertálás UTC időből
-            dt = datetime.fromtimestamp(forecast["dt"])
-            date_str = dt.strftime("%Y-%m-%d")
-            hour = dt.hour
-            
-            if date_str not in daily_data:
-                daily_data[date_str] = {
-                    "day_temps": [],   # 9-18 óra
-                    "night_temps": [], # 21-6 óra
-                    "temps": [],
-                    "humidities": [],
-                    "pressures": [],
-                    "wind_speeds": [],
-                    "descriptions": [],
-                    "icons": [],
-                    "pops": []
-                }
-            
-            daily_data[date_str]["temps"].append(forecast["main"]["temp"])
-            daily_data[date_str]["humidities"].append(forecast["main"]["humidity"])
-            daily_data[date_str]["pressures"].append(forecast["main"]["pressure"])
-            daily_data[date_str]["wind_speeds"].append(forecast["wind"]["speed"])
-            daily_data[date_str]["descriptions"].append(forecast["weather"][0]["description"])
-            daily_data[date_str]["icons"].append(forecast["weather"][0]["icon"])
-            daily_data[date_str]["pops"].append(forecast.get("pop", 0))
-            
-            # Nappali/éjszakai hőmérséklet elkülönítése
-            if 9 <= hour <= 18:
-                daily_data[date_str]["day_temps"].append(forecast["main"]["temp"])
-            elif hour <= 6 or hour >= 21:
-                daily_data[date_str]["night_temps"].append(forecast["main"]["temp"])
-        
-        # Napi előrejelzések létrehozása
-        forecasts = []
-        today = datetime.now().strftime("%Y-%m-%d")
-        
-        # Csak jövőbeli napok (ma és utána)
-        future_dates = [date for date in daily_data.keys() if date >= today]
-        future_dates.sort()
-        
-        for date_str in future_dates[:7]:  # Maximum 7 nap
-            values = daily_data[date_str]
-            
-            # Ha nincs nappali/éjszakai adat, használjuk az átlagot
-            avg_day_temp = sum(values["day_temps"])/len(values["day_temps"]) if values["day_temps"] else sum(values["temps"])/len(values["temps"])
-            avg_night_temp = sum(values["night_temps"])/len(values["night_temps"]) if values["night_temps"] else sum(values["temps"])/len(values["temps"])
-            
-            # Leggyakorbbi leírás és ikon
-            most_common_desc = max(set(values["descriptions"]), key=values["descriptions"].count)
-            most_common_icon = max(set(values["icons"]), key=values["icons"].count)
-            
-            forecasts.append(DailyForecast(
-                date=date_str,
-                day_temp=round(avg_day_temp, 1),
-                night_temp=round(avg_night_temp, 1),
-                min_temp=round(min(values["temps"]), 1),
-                max_temp=round(max(values["temps"]), 1),
-                humidity=round(sum(values["humidities"])/len(values["humidities"])),
-                pressure=round(sum(values["pressures"])/len(values["pressures"])),
-                wind_speed=round(sum(values["wind_speeds"])/len(values["wind_speeds"]), 1),
-                description=most_common_desc,
-                icon=most_common_icon,
-                pop=round(max(values["pops"]) * 100)  # Százalékban
-            ))
-        
+
+        daily = _reduce_forecast_slots(data["list"])
+        if today is None:
+            today = datetime.now().date()
+
+        # Csak jövőbeli napok (ma és utána), maximum 7 nap
+        future_dates = sorted(date_key for date_key in daily if date_key >= today)[:7]
+
         return ForecastResponse(
             city=city,
             country=country,
-            forecasts=forecasts,
+            forecasts=[_daily_forecast(date_key, daily[date_key]) for date_key in future_dates],
             last_update=datetime.utcnow()
         )
-        
+
     except Exception as e:
         logger.error(f"Hiba előrejelzés feldolgozásánál: {e}")
         return None
 
-def save_weather_to_db(weather_data: dict):
-    """Időjárás adat mentése adatbázisba"""
+
+def process_forecast_batch(payloads: List[dict]) -> List[Optional[ForecastResponse]]:
+    """Több város előrejelzésének feldolgozása egy menetben (a hibás elemek helyén None)"""
+    today = datetime.now().date()
+    return [process_forecast_data(data, today) for data in payloads]
+
+def upsert_latest_weather(db: Session, weather_list: List[dict]):
+    """latest_weather frissítése: városonként a legújabb adat, régebbi nem írja felül"""
+    newest = {}
+    for weather_data in weather_list:
+        current = newest.get(weather_data["city"])
+        if current is None or weather_data["timestamp"] >= current["timestamp"]:
+            newest[weather_data["city"]] = weather_data
+    
+    columns = [column.name for column in LatestWeatherRecord.__table__.columns]
+    rows = [{name: data.get(name) for name in columns} for data in newest.values()]
+    upsert_insert = dialect_insert(db.get_bind())
+    
+    if upsert_insert is not None:
+        stmt = upsert_insert(LatestWeatherRecord)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[LatestWeatherRecord.city],
+                set_={name: stmt.excluded[name] for name in columns if name != "city"},
+                where=stmt.excluded.timestamp >= LatestWeatherRecord.timestamp
+            ),
+            rows
+        )
+        return
+    
+    # Egyéb adatbázisok: ORM alapú frissítés
+    for row in rows:
+        record = db.get(LatestWeatherRecord, row["city"])
+        if record is None:
+            db.add(LatestWeatherRecord(**row))
+        elif row["timestamp"] >= record.timestamp:
+            for name, value in row.items():
+                setattr(record, name, value)
+
+def save_weather_batch_to_db(weather_list: List[dict]) -> int:
+    """Több időjárás adat mentése egyetlen tranzakcióban, a mentett rekordok számával"""
+    if not weather_list:
+        return 0
+    
     db = SessionLocal()
     try:
-        record = WeatherRecord(**weather_data)
-        db.add(record)
+        db.execute(insert(WeatherRecord), weather_list)
+        upsert_latest_weather(db, weather_list)
+        apply_rollups(db, weather_list)
         db.commit()
-        db.refresh(record)
-        return True
+        return len(weather_list)
     except Exception as e:
-        logger.error(f"Hiba mentéskor: {e}")
-        return False
+        db.rollback()
+        logger.error(f"Hiba csoportos mentéskor: {e}")
+        return 0
     finally:
         db.close()
 
+def save_weather_to_db(weather_data: dict):
+    """Időjárás adat mentése adatbázisba"""
+    return save_weather_batch_to_db([weather_data]) == 1
+
+# Egyetlen író szál: minden mérés ezen keresztül, kötegelve kerül az adatbázisba
+writer = WeatherWriter(
+    save_weather_batch_to_db,
+    max_queue=config.WRITER_QUEUE_SIZE,
+    batch_size=config.WRITER_BATCH_SIZE,
+    flush_interval=config.WRITER_FLUSH_INTERVAL
+)
+
 # 6. Scheduler létrehozása és konfigurálása
 scheduler = WeatherScheduler(
     fetch_weather_func=fetch_weather_from_api,
-    save_weather_func=save_weather_to_db
+    save_weather_batch_func=writer.save_batch,
+    fetch_weather_batch_func=fetch_weather_batch_from_api if config.UPSTREAM_BATCH_ENABLED else None
 )
 
-# 7. CRUD műveletek
-def get_latest_weather(db: Session, city: str):
-    """Legfrissebb időjárás adat"""
-    return db.query(WeatherRecord)\
-             .filter(WeatherRecord.city == city)\
-             .order_by(WeatherRecord.timestamp.desc())\
-             .first()
-
-def get_weather_history(db: Session, city: str, limit: int = 10):
-    """Időjárás előzmények"""
-    return db.query(WeatherRecord)\
-             .filter(WeatherRecord.city == city)\
-             .order_by(WeatherRecord.timestamp.desc())\
-             .limit(limit)\
-             .all()
+# Adatmegőrzés: régi nyers mérések és óránkénti összesítések törlése háttérben
+retention_job = RetentionJob(
+    SessionLocal,
+    raw_days=config.RAW_RETENTION_DAYS,
+    hourly_days=config.HOURLY_RETENTION_DAYS,
+    batch_size=config.RETENTION_BATCH_SIZE,
+    write_func=writer.run
+)
+if config.RETENTION_ENABLED:
+    scheduler.add_maintenance_job(retention_job.start_background, config.RETENTION_INTERVAL)
 
-def get_weather_stats(db: Session, city: str, hours: int = 24):
-    """Statisztikák számítása"""
-    time_limit = datetime.utcnow() - timedelta(hours=hours)
+# Előrejelzés cache (normalizált városnév → teljes, 7 napos ForecastResponse)
+forecast_cache = TTLCache(
+    maxsize=config.FORECAST_CACHE_SIZE,
+    ttl=config.FORECAST_CACHE_TTL
+)
+
+# Párhuzamos upstream hívások összevonása városonként
+upstream_flights = SingleFlight()
+
+def refresh_current_weather(city: str):
+    """Aktuális időjárás lekérése és mentése - városonként egyszerre egy hívás"""
+    def fetch_and_save():
+        weather_data = fetch_weather_from_api(city)
+        if weather_data:
+            # Az író szál kötegébe kerül; megvárjuk a commitot, hogy a
+            # következő olvasás már az új adatot lássa
+            writer.submit([weather_data]).result(timeout=10)
+        return weather_data
+    
+    return upstream_flights.do(("weather", normalize_city(city)), fetch_and_save)
+
+def revalidate_weather(city: str):
+    """Háttérfrissítés - ha a városra már fut frissítés, nem indítunk újat"""
+    if upstream_flights.active(("weather", normalize_city(city))):
+        return
+    refresh_current_weather(city)
+
+def refresh_forecast(city: str):
+    """Előrejelzés lekérése és cache-elése - városonként egyszerre egy hívás"""
+    cache_key = normalize_city(city)
+    
+    def fetch_and_cache():
+        forecast_data = fetch_forecast_from_api(city)
+        if forecast_data:
+            forecast_cache.set(cache_key, forecast_data)
+        return forecast_data
     
-    result = db.query(
-        func.count(WeatherRecord.id).label('count'),
-        func.avg(WeatherRecord.temperature).label('avg_temp'),
-        func.min(WeatherRecord.temperature).label('min_temp'),
-        func.max(WeatherRecord.temperature).label('max_temp'),
-        func.avg(WeatherRecord.humidity).label('avg_humidity'),
-        func.max(WeatherRecord.timestamp).label('last_update')
-    ).filter(
-        WeatherRecord.city == city,
-        WeatherRecord.timestamp >= time_limit
-    ).first()
-    
-    if not result or result.count == 0:
+    return upstream_flights.do(("forecast", cache_key), fetch_and_cache)
+
+# 7. CRUD műveletek
+# A lekérdezések közösek; a szinkron változatot a scheduler, a benchmarkok és a
+# háttérfeladatok, az async változatot az API végpontok használják
+def weather_history_stmt(city: str, limit: int = 10, since: Optional[datetime] = None,
+                         until: Optional[datetime] = None, after: Optional[tuple] = None):
+    """
+    Időjárás előzmények lekérdezés (legújabb elöl), opcionális [since, until)
+    időtartománnyal. `after` egy (timestamp, id) kurzor: az utána következő
+    sorok jönnek (keyset lapozás - a mély oldalak is indexből, OFFSET nélkül).
+    """
+    stmt = select(WeatherRecord).where(WeatherRecord.city == city)
+    if since is not None:
+        stmt = stmt.where(WeatherRecord.timestamp >= since)
+    if until is not None:
+        stmt = stmt.where(WeatherRecord.timestamp < until)
+    if after is not None:
+        timestamp, record_id = after
+        stmt = stmt.where(
+            WeatherRecord.timestamp <= timestamp,
+            or_(WeatherRecord.timestamp < timestamp, WeatherRecord.id < record_id)
+        )
+    return stmt.order_by(WeatherRecord.timestamp.desc(), WeatherRecord.id.desc()).limit(limit)
+
+# Exportált oszlopok, ebben a sorrendben
+EXPORT_COLUMNS = ("timestamp", "temperature", "humidity", "pressure", "wind_speed", "description", "icon")
+
+def weather_export_stmt(city: str, since: Optional[datetime] = None, until: Optional[datetime] = None):
+    """Export lekérdezés: csak a szükséges oszlopok, időrendben"""
+    stmt = select(*(getattr(WeatherRecord, name) for name in EXPORT_COLUMNS)).where(WeatherRecord.city == city)
+    if since is not None:
+        stmt = stmt.where(WeatherRecord.timestamp >= since)
+    if until is not None:
+        stmt = stmt.where(WeatherRecord.timestamp < until)
+    return stmt.order_by(WeatherRecord.timestamp)
+
+def weather_series_stmt(city: str, since: datetime, until: datetime):
+    """Idősor lekérdezés a ritkításhoz: csak időpont, hőmérséklet, páratartalom, időrendben"""
+    return select(WeatherRecord.timestamp, WeatherRecord.temperature, WeatherRecord.humidity)\
+        .where(WeatherRecord.city == city, WeatherRecord.timestamp >= since, WeatherRecord.timestamp < until)\
+        .order_by(WeatherRecord.timestamp)
+
+def latest_weather_many_stmt(cities: List[str]):
+    """Több város legfrissebb adata egyetlen lekérdezéssel (latest_weather elsődleges kulcs)"""
+    return select(LatestWeatherRecord).where(LatestWeatherRecord.city.in_(cities))
+
+def cities_stmt():
+    """Ismert városok lekérdezés (latest_weather táblából)"""
+    return select(LatestWeatherRecord.city).order_by(LatestWeatherRecord.city)
+
+def stats_from_row(city: str, result) -> Optional[WeatherStats]:
+    """Összesítő sor átalakítása WeatherStats-szá (None, ha nincs mérés)"""
+    # A driver a darabszámot Decimalként is adhatja (PostgreSQL SUM), a float összegekkel nem osztható
+    count = int(result.count or 0)
+    if not count:
         return None
     
     return WeatherStats(
         city=city,
-        avg_temperature=round(result.avg_temp, 1),
-        min_temperature=result.min_temp,
-        max_temperature=result.max_temp,
-        avg_humidity=round(result.avg_humidity, 1),
-        record_count=result.count,
+        avg_temperature=round(float(result.temp_sum) / count, 1),
+        min_temperature=result.temp_min,
+        max_temperature=result.temp_max,
+        avg_humidity=round(float(result.humidity_sum) / count, 1),
+        record_count=count,
         last_update=result.last_update
     )
 
+def get_latest_weather(db: Session, city: str):
+    """Legfrissebb időjárás adat (latest_weather táblából, elsődleges kulcs alapján)"""
+    return db.get(LatestWeatherRecord, city)
+
+def get_latest_weather_many(db: Session, cities: List[str]) -> Dict[str, LatestWeatherRecord]:
+    """Több város legfrissebb adata (város → rekord, a hiányzók kimaradnak)"""
+    return {record.city: record for record in db.scalars(latest_weather_many_stmt(cities))}
+
+def get_weather_history(db: Session, city: str, limit: int = 10, since: Optional[datetime] = None,
+                        until: Optional[datetime] = None, after: Optional[tuple] = None):
+    """Időjárás előzmények (időtartománnyal és kurzorral, lásd weather_history_stmt)"""
+    return db.scalars(weather_history_stmt(city, limit, since, until, after)).all()
+
+def get_weather_stats(db: Session, city: str, hours: int = 24):
+    """Statisztikák számítása (napi/óránkénti összesítésekből + nyers adat a töredék órára)"""
+    time_limit = datetime.utcnow() - timedelta(hours=hours)
+    return stats_from_row(city, db.execute(weather_stats_stmt(city, time_limit)).one())
+
+def stats_matrix_from_rows(cities: List[str], hours_list: List[int], rows) -> WeatherStatsMatrix:
+    """Matrix lekérdezés sorainak átalakítása (a mérés nélküli cellák None-ok)"""
+    by_city = {row.city: row for row in rows}
+    stats = {}
+    for city in cities:
+        row = by_city.get(city)
+        stats[city] = {
+            str(hours): stats_from_row(city, window_stats(row, index)) if row is not None else None
+            for index, hours in enumerate(hours_list)
+        }
+    return WeatherStatsMatrix(cities=cities, hours=hours_list, stats=stats)
+
+def weather_stats_matrix_query(cities: List[str], hours_list: List[int]):
+    """Matrix lekérdezés a jelenhez képest, minden ablakra ugyanazzal a "most"-tal"""
+    now = datetime.utcnow()
+    return weather_stats_matrix_stmt(cities, [now - timedelta(hours=hours) for hours in hours_list])
+
+def get_weather_stats_matrix(db: Session, cities: List[str], hours_list: List[int]) -> WeatherStatsMatrix:
+    """Több város × több időablak statisztikája egyetlen lekérdezéssel"""
+    rows = db.execute(weather_stats_matrix_query(cities, hours_list)).all()
+    return stats_matrix_from_rows(cities, hours_list, rows)
+
 def get_all_cities(db: Session):
     """Összes város listázása"""
-    cities = db.query(WeatherRecord.city).distinct().all()
-    return [city[0] for city in cities]
+    return list(db.scalars(cities_stmt()))
+
+async def get_latest_weather_async(db: AsyncSession, city: str):
+    """Legfrissebb időjárás adat - async"""
+    return await db.get(LatestWeatherRecord, city)
+
+async def get_latest_weather_many_async(db: AsyncSession, cities: List[str]) -> Dict[str, LatestWeatherRecord]:
+    """Több város legfrissebb adata - async"""
+    return {record.city: record for record in await db.scalars(latest_weather_many_stmt(cities))}
+
+async def get_weather_history_async(db: AsyncSession, city: str, limit: int = 10, since: Optional[datetime] = None,
+                                    until: Optional[datetime] = None, after: Optional[tuple] = None):
+    """Időjárás előzmények - async"""
+    return (await db.scalars(weather_history_stmt(city, limit, since, until, after))).all()
+
+async def get_weather_stats_async(db: AsyncSession, city: str, hours: int = 24):
+    """Statisztikák számítása - async"""
+    time_limit = datetime.utcnow() - timedelta(hours=hours)
+    return stats_from_row(city, (await db.execute(weather_stats_stmt(city, time_limit))).one())
+
+async def get_weather_stats_matrix_async(db: AsyncSession, cities: List[str], hours_list: List[int]) -> WeatherStatsMatrix:
+    """Több város × több időablak statisztikája - async"""
+    rows = (await db.execute(weather_stats_matrix_query(cities, hours_list))).all()
+    return stats_matrix_from_rows(cities, hours_list, rows)
+
+def series_from_rows(city: str, rows, points: int, method: str) -> WeatherSeries:
+    """Sorok ritkítása numpy tömbökön; a kiválasztott pontok valódi mérések"""
+    if not rows:
+        return WeatherSeries(city=city, method=method, source_points=0, points=[])
+    
+    timestamps, temperatures, humidities = zip(*rows)
+    selected = downsample(np.array(timestamps, dtype="datetime64[us]"), np.array(temperatures), points, method)
+    return WeatherSeries(
+        city=city,
+        method=method,
+        source_points=len(rows),
+        points=[
+            SeriesPoint(timestamp=timestamps[i], temperature=temperatures[i], humidity=humidities[i])
+            for i in selected.tolist()
+        ]
+    )
+
+async def get_weather_series_async(db: AsyncSession, city: str, since: datetime, until: datetime,
+                                   points: int = 300, method: str = "minmax") -> WeatherSeries:
+    """Ritkított idősor a [since, until) tartományra"""
+    rows = (await db.execute(weather_series_stmt(city, since, until))).all()
+    return series_from_rows(city, rows, points, method)
+
+async def stream_weather_export(city: str, since: Optional[datetime], until: Optional[datetime],
+                                fmt: str, chunk_size: int) -> AsyncIterator[str]:
+    """
+    Export sorok előállítása darabonként szerveroldali kurzorból.
+    Saját sessiont nyit, mert a válasz a végpont visszatérése után folyik;
+    egyszerre csak `chunk_size` sor van a memóriában.
+    """
+    async with AsyncReadSessionLocal() as db:
+        result = await db.stream(
+            weather_export_stmt(city, since, until).execution_options(yield_per=chunk_size)
+        )
+        
+        if fmt == "csv":
+            buffer = io.StringIO()
+            csv_out = csv.writer(buffer)
+            csv_out.writerow(("city",) + EXPORT_COLUMNS)
+            yield buffer.getvalue()
+        
+        async for rows in result.partitions():
+            if fmt == "csv":
+                buffer = io.StringIO()
+                csv_out = csv.writer(buffer)
+                csv_out.writerows((city, row.timestamp.isoformat(), *row[1:]) for row in rows)
+                yield buffer.getvalue()
+            else:
+                yield "".join(
+                    json.dumps({"city": city, **row._asdict(), "timestamp": row.timestamp.isoformat()},
+                               ensure_ascii=False) + "\n"
+                    for row in rows
+                )
+
+async def get_all_cities_async(db: AsyncSession):
+    """Összes város listázása - async"""
+    return list(await db.scalars(cities_stmt()))
 
 # 8. FastAPI alkalmazás
 app = FastAPI(
@@ -360,9 +833,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Tömörítés (a nagy JSON válaszok - előzmények, előrejelzés, csoportos végpontok - miatt)
+if config.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=config.COMPRESSION_MIN_SIZE,
+        gzip_level=config.GZIP_LEVEL,
+        brotli_quality=config.BROTLI_QUALITY
+    )
+
 # 9. API végpontok
 @app.get("/")
-def root():
+async def root():
     """Főoldal"""
     return {
         "service": "Weather Dashboard API",
@@ -374,74 +856,253 @@ def root():
             "docs": "/docs",
             "health": "/health",
             "weather": "/api/weather?city=Budapest",
+            "weather_batch": "/api/weather/batch?cities=Budapest,Szeged",
             "history": "/api/weather/history?city=Budapest",
+            "export": "/api/weather/export?city=Budapest&format=csv",
+            "series": "/api/weather/series?city=Budapest&points=300",
             "stats": "/api/weather/stats?city=Budapest",
+            "stats_batch": "/api/weather/stats/batch?cities=Budapest,Szeged&hours=1,24,168",
             "forecast": "/api/forecast?city=Budapest&days=7",
             "cities": "/api/cities"
         }
     }
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow(),
         "database": "connected",
         "scheduler": scheduler.is_running,
+        "forecast_cache": forecast_cache.stats(),
+        "writer": {"running": writer.is_running, "queued": writer.queue.qsize(), **writer.stats},
         "openweather_api": "configured" if config.OPENWEATHER_API_KEY and config.OPENWEATHER_API_KEY != "your_api_key_here" else "not_configured"
     }
 
 @app.get("/api/weather", response_model=WeatherResponse)
-def get_current_weather(
+async def get_current_weather(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    response: Response,
     city: str = Query("Budapest", description="Város neve"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Aktuális időjárás"""
     # Ellenőrizzük, van-e friss adat
-    record = get_latest_weather(db, city)
+    record = await get_latest_weather_async(db, city)
+    freshness, age = weather_freshness(record)
     
-    # Ha nincs vagy régi (>10 perc), frissítünk
-    if not record or (datetime.utcnow() - record.timestamp).seconds > 600:
-        logger.info(f"Friss adat szükséges: {city}")
-        weather_data = fetch_weather_from_api(city)
+    if freshness != "expired":
+        etag, last_modified = latest_validators(city, record)
+        max_age = freshness_max_age(record)
+        
+        # Elavult, de még kiszolgálható (< hard max-age): azonnal visszaadjuk, háttérben frissítünk
+        if freshness == "stale":
+            logger.info(f"Elavult adat kiszolgálása, háttérfrissítés: {city}")
+            background_tasks.add_task(revalidate_weather, city)
+            mark_stale(response, age)
         
-        if not weather_data:
-            if record:
-                return WeatherResponse.from_orm(record)
-            raise HTTPException(404, f"Nem található időjárás adat: {city}")
+        # A kliensnél lévő példány még aktuális: törzs nélküli 304 (az elavultság jelölésével)
+        if is_not_modified(request, etag, last_modified):
+            cached = not_modified(etag, last_modified, max_age)
+            if freshness == "stale":
+                mark_stale(cached, age)
+            return cached
         
-        # Új rekord mentése
-        save_weather_to_db(weather_data)
-        # Újra lekérjük
-        record = get_latest_weather(db, city)
+        set_cache_headers(response, etag, last_modified, max_age)
+        return WeatherResponse.from_orm(record)
     
-    return WeatherResponse.from_orm(record)
+    # Nincs adat vagy túl régi: frissítés (az upstream hívás szálon fut, az event loop szabad)
+    logger.info(f"Friss adat szükséges: {city}")
+    weather_data = await run_in_threadpool(refresh_current_weather, city)
+    
+    if not weather_data:
+        if record:
+            mark_stale(response, age)
+            set_cache_headers(response, *latest_validators(city, record))
+            return WeatherResponse.from_orm(record)
+        raise HTTPException(404, f"Nem található időjárás adat: {city}")
+    
+    # Az elmentett friss adatot adjuk vissza, nem kérdezzük le újra
+    weather = WeatherResponse(**weather_data)
+    set_cache_headers(response, *latest_validators(city, weather), config.WEATHER_SOFT_MAX_AGE)
+    return weather
+
+@app.get("/api/weather/batch", response_model=WeatherBatchResponse)
+async def get_current_weather_batch(
+    background_tasks: BackgroundTasks,
+    cities: str = Query(..., description="Városok vesszővel elválasztva, pl. Budapest,Szeged"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Több város aktuális időjárása egy kérésben, városonkénti állapottal"""
+    city_list = parse_city_list(cities)
+    if not city_list:
+        raise HTTPException(400, "Legalább egy várost meg kell adni")
+    if len(city_list) > config.WEATHER_BATCH_MAX_CITIES:
+        raise HTTPException(400, f"Legfeljebb {config.WEATHER_BATCH_MAX_CITIES} város kérhető egyszerre")
+    
+    records = await get_latest_weather_many_async(db, city_list)
+    now = datetime.utcnow()
+    results = {}
+    expired = []
+    
+    for city in city_list:
+        record = records.get(city)
+        freshness, age = weather_freshness(record, now)
+        if freshness == "expired":
+            expired.append(city)
+            continue
+        if freshness == "stale":
+            background_tasks.add_task(revalidate_weather, city)
+        results[city] = CityWeatherResult(
+            city=city, status=freshness, age_seconds=int(age), weather=WeatherResponse.from_orm(record)
+        )
+    
+    # Hiányzó vagy túl régi városok párhuzamos frissítése
+    if expired:
+        logger.info(f"Csoportos frissítés: {', '.join(expired)}")
+        refreshed = await asyncio.gather(
+            *(run_in_threadpool(refresh_current_weather, city) for city in expired)
+        )
+        for city, weather_data in zip(expired, refreshed):
+            record = records.get(city)
+            if weather_data:
+                results[city] = CityWeatherResult(city=city, status="refreshed", age_seconds=0,
+                                                  weather=WeatherResponse(**weather_data))
+            elif record:
+                # Frissítés sikertelen: a régi adat jobb a semminél
+                results[city] = CityWeatherResult(city=city, status="stale",
+                                                  age_seconds=int((now - record.timestamp).total_seconds()),
+                                                  weather=WeatherResponse.from_orm(record))
+            else:
+                results[city] = CityWeatherResult(city=city, status="not_found")
+    
+    return WeatherBatchResponse(results=[results[city] for city in city_list])
 
 @app.get("/api/weather/history", response_model=List[WeatherResponse])
-def get_history(
+async def get_history(
+    request: Request,
+    response: Response,
     city: str = Query("Budapest"),
-    limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    limit: int = Query(10, ge=1, le=100, description="Rekordok száma oldalanként"),
+    since: Optional[datetime] = Query(None, alias="from", description="Időtartomány kezdete (ISO 8601, UTC)"),
+    until: Optional[datetime] = Query(None, alias="to", description="Időtartomány vége, kizárólagos (ISO 8601, UTC)"),
+    cursor: Optional[str] = Query(None, description="Következő oldal kurzora (X-Next-Cursor fejlécből)"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """Időjárás előzmények"""
-    records = get_weather_history(db, city, limit)
+    """
+    Időjárás előzmények, legújabb elöl.
+    Ha van további oldal, a kurzora az X-Next-Cursor és a Link fejlécben jön.
+    """
+    since, until = to_naive_utc(since), to_naive_utc(until)
+    if since and until and since >= until:
+        raise HTTPException(400, "A 'from' időpontnak korábbinak kell lennie a 'to'-nál")
+    after = decode_cursor(cursor) if cursor else None
+    
+    # Validátor a legfrissebb mérésből: 304 esetén az előzmény lekérdezés el sem indul
+    latest = await get_latest_weather_async(db, city)
+    etag, last_modified = latest_validators(city, latest, "history", limit, since, until, cursor)
+    max_age = freshness_max_age(latest)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified, max_age)
+    
+    # Egy sorral többet kérünk le, így kiderül, van-e következő oldal
+    records = await get_weather_history_async(db, city, limit + 1, since, until, after)
+    if len(records) > limit:
+        records = records[:limit]
+        next_cursor = encode_cursor(records[-1])
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    
+    set_cache_headers(response, etag, last_modified, max_age)
     return [WeatherResponse.from_orm(record) for record in records]
 
+@app.get("/api/weather/export")
+async def export_history(
+    city: str = Query("Budapest"),
+    since: Optional[datetime] = Query(None, alias="from", description="Időtartomány kezdete (ISO 8601, UTC)"),
+    until: Optional[datetime] = Query(None, alias="to", description="Időtartomány vége, kizárólagos (ISO 8601, UTC)"),
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="Formátum: ndjson vagy csv")
+):
+    """Előzmények exportja időrendben, streamelve (a memóriahasználat nem függ a tartomány méretétől)"""
+    since, until = to_naive_utc(since), to_naive_utc(until)
+    if since and until and since >= until:
+        raise HTTPException(400, "A 'from' időpontnak korábbinak kell lennie a 'to'-nál")
+    
+    media_type = "text/csv; charset=utf-8" if fmt == "csv" else "application/x-ndjson"
+    filename = "_".join(
+        [city] + [value.strftime("%Y%m%d%H%M") for value in (since, until) if value]
+    ) + f".{fmt}"
+    return StreamingResponse(
+        stream_weather_export(city, since, until, fmt, config.EXPORT_CHUNK_SIZE),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"}
+    )
+
+@app.get("/api/weather/series", response_model=WeatherSeries)
+async def get_series(
+    city: str = Query("Budapest"),
+    since: Optional[datetime] = Query(None, alias="from", description="Időtartomány kezdete (alapból 24 órája)"),
+    until: Optional[datetime] = Query(None, alias="to", description="Időtartomány vége, kizárólagos (alapból most)"),
+    points: int = Query(300, ge=10, le=2000, description="Legfeljebb ennyi pont"),
+    method: str = Query("minmax", pattern="^(minmax|lttb)$", description="minmax: szélsőértékek / lttb: görbe alak"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Diagramhoz ritkított idősor: hosszú tartományon is csak néhány száz pont"""
+    until = to_naive_utc(until) or datetime.utcnow()
+    since = to_naive_utc(since) or until - timedelta(hours=24)
+    if since >= until:
+        raise HTTPException(400, "A 'from' időpontnak korábbinak kell lennie a 'to'-nál")
+    
+    return await get_weather_series_async(db, city, since, until, points, method)
+
 @app.get("/api/weather/stats", response_model=WeatherStats)
-def get_stats(
+async def get_stats(
+    request: Request,
+    response: Response,
     city: str = Query("Budapest"),
     hours: int = Query(24, ge=1, le=720),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Statisztikák"""
-    stats = get_weather_stats(db, city, hours)
+    # Az időablak csúszik, ezért a validátor a legfrissebb mérés mellett a percet is tartalmazza.
+    # Last-Modified nincs: a legfrissebb mérés ideje nem jelzi az ablakból kieső mérések miatti változást
+    now = datetime.utcnow()
+    latest = await get_latest_weather_async(db, city)
+    etag, _ = latest_validators(city, latest, "stats", hours, now.strftime("%Y%m%d%H%M"))
+    max_age = min(freshness_max_age(latest, now), 60 - now.second)
+    if latest is not None and is_not_modified(request, etag):
+        return not_modified(etag, max_age=max_age)
+    
+    stats = await get_weather_stats_async(db, city, hours)
     if not stats:
         raise HTTPException(404, f"Nincs elég adat {city} városhoz az elmúlt {hours} órában")
+    set_cache_headers(response, etag, max_age=max_age)
     return stats
 
+@app.get("/api/weather/stats/batch", response_model=WeatherStatsMatrix)
+async def get_stats_batch(
+    cities: str = Query(..., description="Városok vesszővel elválasztva, pl. Budapest,Szeged"),
+    hours: str = Query("1,24,168", description="Időablakok órában, vesszővel elválasztva (1-720)"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Statisztikák több városra és több időablakra egy lekérdezéssel (város × időablak mátrix)"""
+    city_list = parse_city_list(cities)
+    hours_list = parse_hours_list(hours)
+    if not city_list or not hours_list:
+        raise HTTPException(400, "Legalább egy várost és egy időablakot meg kell adni")
+    if len(city_list) > config.WEATHER_BATCH_MAX_CITIES:
+        raise HTTPException(400, f"Legfeljebb {config.WEATHER_BATCH_MAX_CITIES} város kérhető egyszerre")
+    if len(hours_list) > 8 or not all(1 <= value <= 720 for value in hours_list):
+        raise HTTPException(400, "Legfeljebb 8 időablak kérhető, egyenként 1 és 720 óra között")
+    
+    return await get_weather_stats_matrix_async(db, city_list, hours_list)
+
 @app.get("/api/forecast", response_model=ForecastResponse)
-def get_weather_forecast(
+async def get_weather_forecast(
+    request: Request,
+    response: Response,
     city: str = Query("Budapest", description="Város neve"),
     days: int = Query(7, ge=1, le=7, description="Napok száma (1-7)")
 ):
@@ -450,21 +1111,39 @@ def get_weather_forecast(
     if not config.OPENWEATHER_API_KEY or config.OPENWEATHER_API_KEY == "your_api_key_here":
         raise HTTPException(500, "OpenWeather API kulcs nincs beállítva")
     
-    forecast_data = fetch_forecast_from_api(city)
+    cache_key = normalize_city(city)
+    forecast_data = forecast_cache.get(cache_key)
+    
+    if forecast_data is None:
+        forecast_data = await run_in_threadpool(refresh_forecast, city)
+        
+        if not forecast_data:
+            raise HTTPException(404, f"Nem található előrejelzés: {city}")
     
-    if not forecast_data:
-        raise HTTPException(404, f"Nem található előrejelzés: {city}")
+    # Validátor az előrejelzés frissítési idejéből, max-age a cache-ből hátralévő idő
+    etag = make_etag(cache_key, forecast_data.last_update.isoformat(), days)
+    max_age = forecast_cache.expires_in(cache_key) or 0
+    if is_not_modified(request, etag, forecast_data.last_update):
+        return not_modified(etag, forecast_data.last_update, max_age)
+    set_cache_headers(response, etag, forecast_data.last_update, max_age)
     
-    # Limitáljuk a napok számát
+    # Limitáljuk a napok számát (a cache-elt objektumot nem módosítjuk)
     if days < len(forecast_data.forecasts):
-        forecast_data.forecasts = forecast_data.forecasts[:days]
+        forecast_data = forecast_data.model_copy(
+            update={"forecasts": forecast_data.forecasts[:days]}
+        )
     
     return forecast_data
 
 @app.get("/api/cities")
-def get_cities(db: Session = Depends(get_db)):
+async def get_cities(request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
     """Összes város"""
-    return {"cities": get_all_cities(db)}
+    cities = await get_all_cities_async(db)
+    etag = make_etag("cities", *cities)
+    if is_not_modified(request, etag):
+        return not_modified(etag, max_age=config.WEATHER_SOFT_MAX_AGE)
+    set_cache_headers(response, etag, max_age=config.WEATHER_SOFT_MAX_AGE)
+    return {"cities": cities}
 
 @app.post("/api/refresh")
 def refresh_weather():
@@ -472,13 +1151,32 @@ def refresh_weather():
     scheduler.manual_refresh()
     return {"message": "Manuális frissítés elindítva"}
 
+@app.get("/api/maintenance/retention")
+async def get_retention_status():
+    """Adatmegőrzés állapota"""
+    return {
+        "enabled": config.RETENTION_ENABLED,
+        "raw_retention_days": config.RAW_RETENTION_DAYS,
+        "hourly_retention_days": config.HOURLY_RETENTION_DAYS,
+        "running": retention_job.is_running,
+        "progress": retention_job.progress
+    }
+
+@app.post("/api/maintenance/retention")
+async def run_retention():
+    """Adatmegőrzés indítása kézzel (háttérben)"""
+    started = retention_job.start_background()
+    return {"message": "Adatmegőrzés elindítva" if started else "Adatmegőrzés már fut"}
+
 @app.get("/api/config")
-def get_config():
+async def get_config():
     """Konfiguráció lekérdezése"""
     return {
         "schedule_interval": config.SCHEDULE_INTERVAL,
         "default_cities": config.DEFAULT_CITIES,
         "scheduler_status": "active" if scheduler.is_running else "inactive",
+        "scheduler_max_workers": scheduler.max_workers,
+        "last_cycle": scheduler.last_cycle,
         "openweather_configured": config.OPENWEATHER_API_KEY != "your_api_key_here"
     }
 
@@ -488,6 +1186,8 @@ def startup_event():
     """Alkalmazás indításakor"""
     logger.info("🚀 Weather API elindul...")
     
+    writer.start()
+    
     # Konfiguráció validálása
     if config.validate():
         logger.info("✅ Konfiguráció OK")
@@ -504,6 +1204,13 @@ def shutdown_event():
     logger.info("🛑 Alkalmazás leállítása...")
     scheduler.stop()
     logger.info("✅ Scheduler leállítva")
+    writer.stop()
+    upstream.close()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    """Async olvasó kapcsolatok lezárása"""
+    await async_read_engine.dispose()
 
 # 11. Futtatás
 if __name__ == "__main__":
@@ -0,0 +1,199 @@
+"""
+🧱 Adatbázis séma migrációk
+
+Verziózott, sorrendben lefutó migrációk a `Base.metadata.create_all` helyett.
+A lefutott verziókat a `schema_migrations` tábla tartja nyilván, így a
+meglévő adatbázisok induláskor helyben frissülnek.
+
+Minden migráció önálló DDL pillanatkép: nem a mindenkori ORM modellekből
+dolgozik, hogy egy későbbi modellváltozás ne írja át a korábbi lépéseket.
+
+Kézi futtatás:  python migrations.py  (a backend mappából)
+"""
+import logging
+from datetime import datetime
+from typing import Callable, List
+
+from sqlalchemy import (
+    Column, DateTime, Float, Integer, MetaData, String, Table,
+    create_engine, insert, select, text
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+schema_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations", schema_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False)
+)
+
+MIGRATIONS = []
+
+
+def migration(version: int, name: str):
+    """Migrációs lépés regisztrálása"""
+    def register(func: Callable[[Connection], None]):
+        MIGRATIONS.append((version, name, func))
+        return func
+    return register
+
+
+@migration(1, "initial_schema")
+def initial_schema(conn: Connection):
+    """Kiinduló séma (a korábbi create_all eredménye)"""
+    metadata = MetaData()
+    weather = Table(
+        "weather", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("city", String, index=True),
+        Column("temperature", Float),
+        Column("humidity", Integer),
+        Column("pressure", Integer, nullable=True),
+        Column("wind_speed", Float, nullable=True),
+        Column("description", String),
+        Column("icon", String, nullable=True),
+        Column("timestamp", DateTime)
+    )
+    city_ids = Table(
+        "city_ids", metadata,
+        Column("name", String, primary_key=True),
+        Column("city_id", Integer, nullable=False),
+        Column("resolved_name", String),
+        Column("resolved_at", DateTime)
+    )
+    weather.create(conn, checkfirst=True)
+    city_ids.create(conn, checkfirst=True)
+
+
+@migration(2, "weather_city_timestamp_index")
+def weather_city_timestamp_index(conn: Connection):
+    """
+    Összetett (city, timestamp DESC) index a legfrissebb/előzmény/statisztika
+    lekérdezésekhez. A hőmérséklet és páratartalom oszlopokkal a statisztika
+    lekérdezés csak az indexből dolgozik. A városra és az elsődleges kulcsra
+    tett külön indexek ezzel feleslegessé válnak.
+    """
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_weather_city_timestamp "
+        "ON weather (city, timestamp DESC, temperature, humidity)"
+    ))
+    conn.execute(text("DROP INDEX IF EXISTS ix_weather_city"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_weather_id"))
+
+
+@migration(3, "latest_weather_table")
+def latest_weather_table(conn: Connection):
+    """Városonkénti legfrissebb mérés táblája, feltöltve a meglévő adatokból"""
+    metadata = MetaData()
+    latest_weather = Table(
+        "latest_weather", metadata,
+        Column("city", String, primary_key=True),
+        Column("temperature", Float),
+        Column("humidity", Integer),
+        Column("pressure", Integer, nullable=True),
+        Column("wind_speed", Float, nullable=True),
+        Column("description", String),
+        Column("icon", String, nullable=True),
+        Column("timestamp", DateTime)
+    )
+    latest_weather.create(conn, checkfirst=True)
+
+    # Városonként egy indexes keresés a (city, timestamp DESC) indexen
+    cities = [row.city for row in conn.execute(text("SELECT DISTINCT city FROM weather WHERE city IS NOT NULL"))]
+    for city in cities:
+        conn.execute(text(
+            "INSERT INTO latest_weather "
+            "(city, temperature, humidity, pressure, wind_speed, description, icon, timestamp) "
+            "SELECT city, temperature, humidity, pressure, wind_speed, description, icon, timestamp "
+            "FROM weather WHERE city = :city ORDER BY timestamp DESC, id DESC LIMIT 1"
+        ), {"city": city})
+
+
+@migration(4, "weather_rollup_tables")
+def weather_rollup_tables(conn: Connection):
+    """Óránkénti és napi összesítő táblák, feltöltve a meglévő mérésekből"""
+    metadata = MetaData()
+    for name in ("weather_hourly", "weather_daily"):
+        Table(
+            name, metadata,
+            Column("city", String, primary_key=True),
+            Column("bucket_start", DateTime, primary_key=True),
+            Column("count", Integer, nullable=False),
+            Column("temp_sum", Float, nullable=False),
+            Column("temp_min", Float),
+            Column("temp_max", Float),
+            Column("humidity_sum", Float, nullable=False),
+            Column("last_update", DateTime)
+        ).create(conn, checkfirst=True)
+
+    # SQLite-on a DateTime szövegként, a SQLAlchemy formátumában tárolódik
+    if conn.dialect.name == "sqlite":
+        buckets = {
+            "weather_hourly": "strftime('%Y-%m-%d %H:00:00.000000', timestamp)",
+            "weather_daily": "strftime('%Y-%m-%d 00:00:00.000000', timestamp)"
+        }
+    else:
+        buckets = {
+            "weather_hourly": "date_trunc('hour', timestamp)",
+            "weather_daily": "date_trunc('day', timestamp)"
+        }
+
+    for table, bucket in buckets.items():
+        conn.execute(text(
+            f"INSERT INTO {table} "
+            "(city, bucket_start, count, temp_sum, temp_min, temp_max, humidity_sum, last_update) "
+            f"SELECT city, {bucket}, COUNT(*), SUM(temperature), MIN(temperature), MAX(temperature), "
+            "SUM(humidity), MAX(timestamp) "
+            "FROM weather WHERE city IS NOT NULL AND timestamp IS NOT NULL AND temperature IS NOT NULL "
+            f"GROUP BY city, {bucket}"
+        ))
+
+
+def applied_versions(engine: Engine) -> List[int]:
+    """Már lefutott migrációk verziói"""
+    with engine.begin() as conn:
+        schema_migrations.create(conn, checkfirst=True)
+        return [row.version for row in conn.execute(select(schema_migrations.c.version))]
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """Hiányzó migrációk futtatása sorrendben, a most lefutott verziókkal"""
+    applied = set(applied_versions(engine))
+    ran = []
+
+    for version, name, func in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in applied:
+            continue
+
+        logger.info(f"🧱 Migráció futtatása: {version:03d}_{name}")
+        try:
+            with engine.begin() as conn:
+                func(conn)
+                conn.execute(insert(schema_migrations), {
+                    "version": version,
+                    "name": name,
+                    "applied_at": datetime.utcnow()
+                })
+        except IntegrityError:
+            # Egy párhuzamosan induló másik worker már lefuttatta
+            logger.info(f"   Migráció már lefutott: {version:03d}_{name}")
+            continue
+        ran.append(version)
+
+    return ran
+
+
+if __name__ == "__main__":
+    try:
+        from .config import config
+    except ImportError:
+        from config import config
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    migrated = run_migrations(create_engine(config.DATABASE_URL))
+    print(f"✅ Séma naprakész ({len(migrated)} új migráció)")
@@ -0,0 +1,83 @@
+"""
+🗄️ Adatbázis modellek
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
+from sqlalchemy.ext.declarative import declarative_base
+
+Base = declarative_base()
+
+class WeatherRecord(Base):
+    """Időjárás rekord modell"""
+    __tablename__ = "weather"
+    
+    id = Column(Integer, primary_key=True)
+    city = Column(String)
+    temperature = Column(Float)
+    humidity = Column(Integer)
+    pressure = Column(Integer, nullable=True)
+    wind_speed = Column(Float, nullable=True)
+    description = Column(String)
+    icon = Column(String, nullable=True)
+    timestamp = Column(DateTime, default=datetime.utcnow)
+
+# Összetett index: város szerinti szűrés + időrendezés/-tartomány, a statisztika oszlopokkal
+Index(
+    "ix_weather_city_timestamp",
+    WeatherRecord.city,
+    WeatherRecord.timestamp.desc(),
+    WeatherRecord.temperature,
+    WeatherRecord.humidity
+)
+
+class LatestWeatherRecord(Base):
+    """Városonként a legfrissebb mérés - minden mentéssel azonos tranzakcióban frissül"""
+    __tablename__ = "latest_weather"
+    
+    city = Column(String, primary_key=True)
+    temperature = Column(Float)
+    humidity = Column(Integer)
+    pressure = Column(Integer, nullable=True)
+    wind_speed = Column(Float, nullable=True)
+    description = Column(String)
+    icon = Column(String, nullable=True)
+    timestamp = Column(DateTime, default=datetime.utcnow)
+
+class CityIdRecord(Base):
+    """Városnév → OpenWeather város azonosító (perzisztens cache)"""
+    __tablename__ = "city_ids"
+    
+    name = Column(String, primary_key=True)  # normalizált városnév
+    city_id = Column(Integer, nullable=False)
+    resolved_name = Column(String)
+    resolved_at = Column(DateTime, default=datetime.utcnow)
+
+class WeatherRollupMixin:
+    """Időszakos összesítő oszlopok (óránkénti / napi rollup)"""
+    city = Column(String, primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)  # az időszak kezdete (UTC)
+    count = Column(Integer, nullable=False, default=0)
+    temp_sum = Column(Float, nullable=False, default=0)
+    temp_min = Column(Float)
+    temp_max = Column(Float)
+    humidity_sum = Column(Float, nullable=False, default=0)
+    last_update = Column(DateTime)
+
+class WeatherHourly(WeatherRollupMixin, Base):
+    """Óránkénti összesítés"""
+    __tablename__ = "weather_hourly"
+
+class WeatherDaily(WeatherRollupMixin, Base):
+    """Napi összesítés"""
+    __tablename__ = "weather_daily"
+
+def dialect_insert(bind):
+    """ON CONFLICT támogatású INSERT konstruktor az adatbázis dialektusához (ha van ilyen)"""
+    dialect = bind.dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    return None
@@ -0,0 +1,144 @@
+"""
+🧹 Adatmegőrzés - régi nyers mérések és óránkénti összesítések törlése
+
+A nyers mérések mentéskor azonnal bekerülnek az óránkénti és napi
+összesítésekbe (rollups.py), így a megőrzési idő után a nyers sorok
+törölhetők: a régebbi időszakokat az óránkénti, a még régebbieket a napi
+tábla őrzi. A törlés városonként, az összetett indexen, kis kötegekben és
+kötegenként külön tranzakcióban fut. A kötegek a write_func-on keresztül
+(a backendben az író szálon) futnak, így a mérések mentésével sorosítva,
+közöttük pedig a várakozó kötegek is sorra kerülnek.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+
+# Abszolút importok
+try:
+    from .models import WeatherRecord, WeatherHourly, LatestWeatherRecord
+except ImportError:
+    from models import WeatherRecord, WeatherHourly, LatestWeatherRecord
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionJob:
+    """Háttérben futó megőrzési karbantartás, lekérdezhető állapottal"""
+
+    def __init__(self, session_factory, raw_days: int = 35, hourly_days: int = 90,
+                 batch_size: int = 1000, pause: float = 0.05, write_func=None):
+        """
+        :param session_factory: Adatbázis session gyár (pl. SessionLocal)
+        :param raw_days: Nyers mérések megőrzése (nap)
+        :param hourly_days: Óránkénti összesítések megőrzése (nap), utána csak a napi marad
+        :param batch_size: Egy tranzakcióban törölt sorok maximuma
+        :param pause: Szünet kötegek között (mp), hogy az írók is sorra kerüljenek
+        :param write_func: Egy törlő köteget futtató függvény (pl. writer.run); alapból helyben fut
+        """
+        self.session_factory = session_factory
+        self.raw_days = raw_days
+        self.hourly_days = hourly_days
+        self.batch_size = batch_size
+        self.pause = pause
+        self.write_func = write_func or (lambda func: func())
+        self.progress = {"state": "idle"}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start_background(self) -> bool:
+        """Futtatás külön szálon; False, ha már fut egy korábbi"""
+        with self._lock:
+            if self.is_running:
+                logger.info("🧹 Adatmegőrzés már fut, kihagyva")
+                return False
+            self._thread = threading.Thread(target=self.run, name="weather-retention", daemon=True)
+            self._thread.start()
+            return True
+
+    def _delete_batch(self, stmt) -> int:
+        """Egy köteg törlése saját sessionben és tranzakcióban"""
+        db = self.session_factory()
+        try:
+            deleted = db.execute(stmt).rowcount
+            db.commit()
+            return deleted
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _purge(self, stage: str, cities: list, stmt_for_city) -> int:
+        """Egy tábla régi sorainak törlése városonként, kötegekben"""
+        self.progress["stage"] = stage
+        total = 0
+        for city in cities:
+            while True:
+                stmt = stmt_for_city(city)
+                deleted = self.write_func(lambda: self._delete_batch(stmt))
+                total += deleted
+                self.progress["deleted"][stage] = total
+                self.progress["batches"] += 1
+                if deleted < self.batch_size:
+                    break
+                time.sleep(self.pause)
+        return total
+
+    def run(self) -> dict:
+        """Megőrzési szabályok alkalmazása, az állapot visszaadásával"""
+        now = datetime.utcnow()
+        raw_cutoff = now - timedelta(days=self.raw_days)
+        hourly_cutoff = now - timedelta(days=self.hourly_days)
+        self.progress = {
+            "state": "running",
+            "started_at": now,
+            "finished_at": None,
+            "stage": None,
+            "cutoffs": {"weather": raw_cutoff, "weather_hourly": hourly_cutoff},
+            "deleted": {"weather": 0, "weather_hourly": 0},
+            "batches": 0,
+            "error": None
+        }
+        logger.info(f"🧹 Adatmegőrzés indul (nyers: {self.raw_days} nap, óránkénti: {self.hourly_days} nap)")
+
+        try:
+            db = self.session_factory()
+            try:
+                cities = [row[0] for row in db.execute(select(LatestWeatherRecord.city))]
+            finally:
+                db.close()
+
+            self._purge("weather", cities, lambda city: delete(WeatherRecord).where(
+                WeatherRecord.id.in_(
+                    select(WeatherRecord.id)
+                    .where(WeatherRecord.city == city, WeatherRecord.timestamp < raw_cutoff)
+                    .limit(self.batch_size)
+                )
+            ))
+            self._purge("weather_hourly", cities, lambda city: delete(WeatherHourly).where(
+                WeatherHourly.city == city,
+                WeatherHourly.bucket_start.in_(
+                    select(WeatherHourly.bucket_start)
+                    .where(WeatherHourly.city == city, WeatherHourly.bucket_start < hourly_cutoff)
+                    .limit(self.batch_size)
+                )
+            ))
+
+            self.progress["state"] = "done"
+            logger.info(f"✅ Adatmegőrzés kész: {self.progress['deleted']}")
+        except Exception as e:
+            self.progress["state"] = "failed"
+            self.progress["error"] = str(e)
+            logger.error(f"❌ Hiba adatmegőrzéskor: {e}")
+        finally:
+            self.progress["stage"] = None
+            self.progress["finished_at"] = datetime.utcnow()
+
+        return self.progress
@@ -0,0 +1,271 @@
+"""
+📊 Óránkénti és napi összesítések (rollup)
+
+A `weather_hourly` és `weather_daily` táblák minden mentéssel, azonos
+tranzakcióban, inkrementálisan frissülnek. A statisztika lekérdezés a teljes
+napokat a napi, a teljes órákat az óránkénti táblából veszi, és csak az
+időablak eleji töredék órát számolja a nyers mérésekből.
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import Integer, and_, case, cast, func, literal, or_, select, union_all
+from sqlalchemy.orm import Session
+
+# Abszolút importok
+try:
+    from .models import WeatherRecord, WeatherHourly, WeatherDaily, dialect_insert
+except ImportError:
+    from models import WeatherRecord, WeatherHourly, WeatherDaily, dialect_insert
+
+
+def hour_start(ts: datetime) -> datetime:
+    """Az óra kezdete"""
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def day_start(ts: datetime) -> datetime:
+    """A nap kezdete"""
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_hour(ts: datetime) -> datetime:
+    """Első óra-határ `ts` után (vagy maga `ts`, ha óra-határra esik)"""
+    start = hour_start(ts)
+    return start if start == ts else start + timedelta(hours=1)
+
+
+def next_day(ts: datetime) -> datetime:
+    """Első nap-határ `ts` után (vagy maga `ts`, ha nap-határra esik)"""
+    start = day_start(ts)
+    return start if start == ts else start + timedelta(days=1)
+
+
+ROLLUPS = (
+    (WeatherHourly, hour_start),
+    (WeatherDaily, day_start),
+)
+
+
+def aggregate(weather_list: List[dict], truncate: Callable[[datetime], datetime]) -> Dict[Tuple[str, datetime], dict]:
+    """Mérések összesítése (város, időszak) kulcsonként"""
+    buckets = {}
+    for data in weather_list:
+        key = (data["city"], truncate(data["timestamp"]))
+        bucket = buckets.get(key)
+        temperature = data["temperature"]
+        if bucket is None:
+            buckets[key] = {
+                "city": key[0],
+                "bucket_start": key[1],
+                "count": 1,
+                "temp_sum": temperature,
+                "temp_min": temperature,
+                "temp_max": temperature,
+                "humidity_sum": data["humidity"],
+                "last_update": data["timestamp"]
+            }
+            continue
+        bucket["count"] += 1
+        bucket["temp_sum"] += temperature
+        bucket["temp_min"] = min(bucket["temp_min"], temperature)
+        bucket["temp_max"] = max(bucket["temp_max"], temperature)
+        bucket["humidity_sum"] += data["humidity"]
+        bucket["last_update"] = max(bucket["last_update"], data["timestamp"])
+    return buckets
+
+
+def merge_rollup_rows(db: Session, model, rows: List[dict]):
+    """Összesített sorok hozzáadása a meglévő időszakokhoz"""
+    if not rows:
+        return
+
+    upsert_insert = dialect_insert(db.get_bind())
+    if upsert_insert is not None:
+        stmt = upsert_insert(model)
+        new = stmt.excluded
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[model.city, model.bucket_start],
+                set_={
+                    "count": model.count + new.count,
+                    "temp_sum": model.temp_sum + new.temp_sum,
+                    "temp_min": case((new.temp_min < model.temp_min, new.temp_min), else_=model.temp_min),
+                    "temp_max": case((new.temp_max > model.temp_max, new.temp_max), else_=model.temp_max),
+                    "humidity_sum": model.humidity_sum + new.humidity_sum,
+                    "last_update": case((new.last_update > model.last_update, new.last_update), else_=model.last_update)
+                }
+            ),
+            rows
+        )
+        return
+
+    # Egyéb adatbázisok: ORM alapú frissítés
+    for row in rows:
+        record = db.get(model, (row["city"], row["bucket_start"]))
+        if record is None:
+            db.add(model(**row))
+            continue
+        record.count += row["count"]
+        record.temp_sum += row["temp_sum"]
+        record.temp_min = min(record.temp_min, row["temp_min"])
+        record.temp_max = max(record.temp_max, row["temp_max"])
+        record.humidity_sum += row["humidity_sum"]
+        record.last_update = max(record.last_update, row["last_update"])
+
+
+def apply_rollups(db: Session, weather_list: List[dict]):
+    """Új mérések beszámítása az óránkénti és napi összesítésekbe (commit nélkül)"""
+    for model, truncate in ROLLUPS:
+        merge_rollup_rows(db, model, list(aggregate(weather_list, truncate).values()))
+
+
+def _rollup_part(model):
+    """Összesítő tábla részösszegei a statisztika lekérdezéshez"""
+    return select(
+        func.sum(model.count).label("count"),
+        func.sum(model.temp_sum).label("temp_sum"),
+        func.min(model.temp_min).label("temp_min"),
+        func.max(model.temp_max).label("temp_max"),
+        func.sum(model.humidity_sum).label("humidity_sum"),
+        func.max(model.last_update).label("last_update")
+    )
+
+
+def weather_stats_stmt(city: str, since: datetime):
+    """
+    Statisztika lekérdezés egyetlen utasításban:
+    nyers mérések [since, következő óra), óránkénti összesítés a következő
+    nap-határig, napi összesítés onnantól.
+    """
+    hour_edge = next_hour(since)
+    day_edge = next_day(since)
+
+    raw = select(
+        func.count(WeatherRecord.id).label("count"),
+        func.sum(WeatherRecord.temperature).label("temp_sum"),
+        func.min(WeatherRecord.temperature).label("temp_min"),
+        func.max(WeatherRecord.temperature).label("temp_max"),
+        func.sum(WeatherRecord.humidity).label("humidity_sum"),
+        func.max(WeatherRecord.timestamp).label("last_update")
+    ).where(
+        WeatherRecord.city == city,
+        WeatherRecord.timestamp >= since,
+        WeatherRecord.timestamp < hour_edge
+    )
+    hourly = _rollup_part(WeatherHourly).where(
+        WeatherHourly.city == city,
+        WeatherHourly.bucket_start >= hour_edge,
+        WeatherHourly.bucket_start < day_edge
+    )
+    daily = _rollup_part(WeatherDaily).where(
+        WeatherDaily.city == city,
+        WeatherDaily.bucket_start >= day_edge
+    )
+
+    parts = union_all(raw, hourly, daily).subquery()
+    return select(
+        # PostgreSQL-en a SUM(bigint) numeric (Decimal) lenne
+        cast(func.coalesce(func.sum(parts.c.count), 0), Integer).label("count"),
+        func.sum(parts.c.temp_sum).label("temp_sum"),
+        func.min(parts.c.temp_min).label("temp_min"),
+        func.max(parts.c.temp_max).label("temp_max"),
+        func.sum(parts.c.humidity_sum).label("humidity_sum"),
+        func.max(parts.c.last_update).label("last_update")
+    )
+
+
+# A statisztika lekérdezések kimeneti oszlopai (egy időablakra)
+STATS_COLUMNS = ("count", "temp_sum", "temp_min", "temp_max", "humidity_sum", "last_update")
+WindowStats = namedtuple("WindowStats", STATS_COLUMNS)
+
+_STATS_AGGREGATES = {
+    "count": func.sum,
+    "temp_sum": func.sum,
+    "temp_min": func.min,
+    "temp_max": func.max,
+    "humidity_sum": func.sum,
+    "last_update": func.max,
+}
+
+
+def _window_part(city_column, values: dict, conditions: list, where):
+    """
+    Egy forrás (nyers vagy összesítő tábla) városonkénti részösszegei,
+    időablakonként feltételes aggregálással (w{i}_count, w{i}_temp_sum, ...).
+    """
+    columns = [city_column.label("city")]
+    for index, condition in enumerate(conditions):
+        columns += [
+            _STATS_AGGREGATES[name](case((condition, values[name]))).label(f"w{index}_{name}")
+            for name in STATS_COLUMNS
+        ]
+    return select(*columns).where(where).group_by(city_column)
+
+
+def weather_stats_matrix_stmt(cities: List[str], sinces: List[datetime]):
+    """
+    Több város × több időablak statisztikája egyetlen utasításban.
+    Időablakonként ugyanaz a felbontás, mint `weather_stats_stmt`-nél, de a
+    nyers, óránkénti és napi táblát csak egyszer olvassuk: a sorok egy
+    GROUP BY city mellett feltételes aggregálással kerülnek az ablakokba.
+    """
+    edges = [(since, next_hour(since), next_day(since)) for since in sinces]
+
+    raw_conditions = [
+        and_(WeatherRecord.timestamp >= since, WeatherRecord.timestamp < hour_edge)
+        for since, hour_edge, _ in edges
+    ]
+    raw = _window_part(
+        WeatherRecord.city,
+        {
+            "count": literal(1),
+            "temp_sum": WeatherRecord.temperature,
+            "temp_min": WeatherRecord.temperature,
+            "temp_max": WeatherRecord.temperature,
+            "humidity_sum": WeatherRecord.humidity,
+            "last_update": WeatherRecord.timestamp,
+        },
+        raw_conditions,
+        # Ablakonként külön tartomány, hogy mindegyik az összetett indexet használja
+        or_(*(and_(WeatherRecord.city.in_(cities), condition) for condition in raw_conditions))
+    )
+
+    def rollup_values(model):
+        return {name: getattr(model, name) for name in STATS_COLUMNS}
+
+    hourly_conditions = [
+        and_(WeatherHourly.bucket_start >= hour_edge, WeatherHourly.bucket_start < day_edge)
+        for _, hour_edge, day_edge in edges
+    ]
+    hourly = _window_part(
+        WeatherHourly.city,
+        rollup_values(WeatherHourly),
+        hourly_conditions,
+        or_(*(and_(WeatherHourly.city.in_(cities), condition) for condition in hourly_conditions))
+    )
+
+    daily = _window_part(
+        WeatherDaily.city,
+        rollup_values(WeatherDaily),
+        [WeatherDaily.bucket_start >= day_edge for _, _, day_edge in edges],
+        and_(WeatherDaily.city.in_(cities), WeatherDaily.bucket_start >= min(edge[2] for edge in edges))
+    )
+
+    parts = union_all(raw, hourly, daily).subquery()
+    columns = [parts.c.city]
+    for index in range(len(sinces)):
+        for name in STATS_COLUMNS:
+            column = _STATS_AGGREGATES[name](parts.c[f"w{index}_{name}"])
+            if name == "count":
+                # Mint `weather_stats_stmt`-nél: PostgreSQL-en a SUM(bigint) numeric lenne
+                column = cast(func.coalesce(column, 0), Integer)
+            columns.append(column.label(f"w{index}_{name}"))
+    return select(*columns).group_by(parts.c.city)
+
+
+def window_stats(row, index: int) -> WindowStats:
+    """Egy időablak értékei a `weather_stats_matrix_stmt` eredménysorából"""
+    mapping = row._mapping
+    return WindowStats(*(mapping[f"w{index}_{name}"] for name in STATS_COLUMNS))
@@ -4,6 +4,7 @@
 import schedule
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import logging
 from sqlalchemy.orm import Session
@@ -19,54 +20,140 @@ logger = logging.getLogger(__name__)
 class WeatherScheduler:
     """Időzített feladatok"""
     
-    def __init__(self, fetch_weather_func=None, save_weather_func=None):
+    def __init__(self, fetch_weather_func=None, save_weather_batch_func=None, max_workers: int = None,
+                 fetch_weather_batch_func=None, batch_size: int = None):
         """
         Inicializálás függvényekkel
         :param fetch_weather_func: Függvény, ami város alapján lekéri az időjárást
-        :param save_weather_func: Függvény, ami elmenti az adatbázisba
+        :param save_weather_batch_func: Függvény, ami egy adatlistát egy tranzakcióban ment el
+                                        (a mentett rekordok számát adja vissza)
+        :param max_workers: Egyszerre futó frissítések maximális száma
+        :param fetch_weather_batch_func: Függvény, ami több várost kér le egy hívással
+                                         (város → adat szótárt ad vissza)
+        :param batch_size: Egy csoportos hívásban lekért városok száma
         """
         self.is_running = False
         self.thread = None
         self.fetch_weather = fetch_weather_func
-        self.save_weather = save_weather_func
-        
-    def update_weather_for_city(self, city: str):
-        """Időjárás frissítése egy városra"""
-        if not self.fetch_weather or not self.save_weather:
-            logger.warning(f"Scheduler nincs konfigurálva, nem frissítem: {city}")
-            return False
-            
-        logger.info(f"[Scheduler] Frissítés: {city}")
-        
-        # API hívás a megadott függvénnyel
-        weather_data = self.fetch_weather(city)
+        self.fetch_weather_batch = fetch_weather_batch_func
+        self.save_weather_batch = save_weather_batch_func
+        self.max_workers = max_workers or config.SCHEDULER_MAX_WORKERS
+        self.batch_size = batch_size or config.UPSTREAM_BATCH_SIZE
+        self.last_cycle = None
+        self.maintenance_jobs = []
+    
+    def add_maintenance_job(self, func, interval_minutes: int):
+        """Karbantartó feladat ütemezése (a scheduler indításakor lép életbe)"""
+        self.maintenance_jobs.append((func, interval_minutes))
+        
+    def fetch_weather_for_city(self, city: str):
+        """Időjárás lekérése egy városra (mentés nélkül)"""
+        logger.info(f"[Scheduler] Lekérés: {city}")
+        
+        try:
+            weather_data = self.fetch_weather(city)
+        except Exception as e:
+            logger.error(f"  ❌ Hiba lekéréskor ({city}): {e}")
+            return None
+        
         if not weather_data:
             logger.error(f"  ❌ Hiba: {city} adatai nem érhetők el")
-            return False
+            return None
+        return weather_data
+    
+    def fetch_weather_for_cities(self, cities: list) -> dict:
+        """Időjárás lekérése városonként egyenként"""
+        return {city: self.fetch_weather_for_city(city) for city in cities}
+    
+    def fetch_weather_for_batch(self, cities: list) -> dict:
+        """
+        Időjárás lekérése több városra egy csoportos hívással.
+        Csak a sikeres csoportos válaszból kimaradt városokat próbáljuk
+        egyenként újra; ha a csoportos hívás egészében sikertelen (pl. 429
+        vagy időtúllépés), a városok erre a ciklusra kimaradnak, hogy a
+        terhelt upstreamet ne árasszuk el egyedi hívásokkal.
+        """
+        logger.info(f"[Scheduler] Csoportos lekérés: {len(cities)} város")
         
-        # Adatbázis mentés a megadott függvénnyel
         try:
-            success = self.save_weather(weather_data)
-            if success:
-                logger.info(f"  ✅ {city} adatai mentve")
-                return True
-            else:
-                logger.error(f"  ❌ Hiba mentéskor: {city}")
-                return False
+            batch_data = self.fetch_weather_batch(cities)
         except Exception as e:
-            logger.error(f"  ❌ Hiba mentéskor: {e}")
-            return False
+            logger.error(f"  ❌ Csoportos lekérés hiba, a csomag kimarad: {e}")
+            return {city: None for city in cities}
+        
+        return {
+            city: batch_data[city] if city in batch_data else self.fetch_weather_for_city(city)
+            for city in cities
+        }
+    
+    def save_cycle(self, collected: dict) -> dict:
+        """Egy ciklus lekért adatainak mentése egyetlen tranzakcióban"""
+        available = {city: data for city, data in collected.items() if data}
+        results = {city: False for city in collected}
+        if not available:
+            return results
+        
+        if not self.save_weather_batch:
+            logger.warning(f"Scheduler nincs konfigurálva, nem mentem: {len(available)} város")
+            return results
+        
+        try:
+            saved = self.save_weather_batch(list(available.values()))
+        except Exception as e:
+            logger.error(f"  ❌ Hiba csoportos mentéskor: {e}")
+            saved = 0
+        
+        if saved:
+            results.update({city: True for city in available})
+        else:
+            logger.error(f"  ❌ Csoportos mentés sikertelen: {len(available)} város")
+        return results
     
     def scheduled_update(self):
-        """Időzített frissítés az összes városra"""
+        """Időzített frissítés az összes városra, korlátozott párhuzamossággal"""
         logger.info(f"[{datetime.now().strftime('%H:%M:%S')}] 🚀 Automatikus adatgyűjtés indult")
         
-        success_count = 0
-        for city in config.DEFAULT_CITIES:
-            if self.update_weather_for_city(city):
-                success_count += 1
+        cities = config.DEFAULT_CITIES
+        started_at = datetime.utcnow()
+        started = time.monotonic()
+        collected = {}
+        
+        # Csoportos módban városcsomagonként, egyébként városonként egy feladat
+        if self.fetch_weather_batch:
+            size, work = self.batch_size, self.fetch_weather_for_batch
+        else:
+            size, work = 1, self.fetch_weather_for_cities
+        chunks = [cities[i:i + size] for i in range(0, len(cities), size)]
+        
+        workers = max(1, min(self.max_workers, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="weather-update") as pool:
+            futures = {pool.submit(work, chunk): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    collected.update(future.result())
+                except Exception as e:
+                    logger.error(f"  ❌ Hiba lekéréskor ({', '.join(chunk)}): {e}")
+                    collected.update({city: None for city in chunk})
+        
+        # A teljes ciklus mentése egyben
+        fetch_duration = time.monotonic() - started
+        results = self.save_cycle(collected)
+        
+        duration = time.monotonic() - started
+        success_count = sum(1 for ok in results.values() if ok)
+        self.last_cycle = {
+            "started_at": started_at,
+            "duration_seconds": round(duration, 3),
+            "fetch_seconds": round(fetch_duration, 3),
+            "save_seconds": round(duration - fetch_duration, 3),
+            "success_count": success_count,
+            "city_count": len(cities),
+            "results": results
+        }
         
-        logger.info(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Adatgyűjtés kész: {success_count}/{len(config.DEFAULT_CITIES)} város")
+        logger.info(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Adatgyűjtés kész: {success_count}/{len(cities)} város ({duration:.2f} mp)")
+        return self.last_cycle
     
     def start(self, interval_minutes: int = 30):
         """Scheduler indítása"""
@@ -82,6 +169,8 @@ class WeatherScheduler:
         
         # Ütemezés beállítása
         schedule.every(interval_minutes).minutes.do(self.scheduled_update)
+        for func, job_interval in self.maintenance_jobs:
+            schedule.every(job_interval).minutes.do(func)
         
         logger.info(f"✅ Scheduler elindítva, frissítés {interval_minutes} percenként")
         
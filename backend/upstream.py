@@ -0,0 +1,165 @@
+"""
+🌐 OpenWeather upstream kliens - megosztott, kapcsolat-poolos HTTP session
+"""
+import logging
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import EmptyPoolError
+
+# Abszolút importok
+try:
+    from .config import config
+except ImportError:
+    from config import config
+
+logger = logging.getLogger(__name__)
+
+OPENWEATHER_BASE_URL = "https://api.openweathermap.org/data/2.5"
+
+
+class _PoolTimeoutMixin:
+    """urllib3 kapcsolat-pool, amely legfeljebb `pool_timeout` mp-ig vár szabad kapcsolatra"""
+    pool_timeout = None
+
+    def urlopen(self, method, url, *args, **kwargs):
+        if kwargs.get("pool_timeout") is None:
+            kwargs["pool_timeout"] = self.pool_timeout
+        return super().urlopen(method, url, *args, **kwargs)
+
+
+class BoundedPoolAdapter(HTTPAdapter):
+    """
+    Blokkoló pool korlátos várakozással. A requests nem adja tovább a
+    pool_timeout-ot, így pool_block=True mellett egy foglalt poolra a hívó
+    örökké várna - a kérésenkénti timeout ezt az időt nem fedi le.
+    """
+    __attrs__ = HTTPAdapter.__attrs__ + ["pool_timeout"]
+
+    def __init__(self, pool_timeout: float = 5, **kwargs):
+        self.pool_timeout = pool_timeout
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: type(f"Bounded{pool_class.__name__}", (_PoolTimeoutMixin, pool_class),
+                         {"pool_timeout": self.pool_timeout})
+            for scheme, pool_class in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+    def send(self, request, *args, **kwargs):
+        try:
+            return super().send(request, *args, **kwargs)
+        except EmptyPoolError as e:
+            raise requests.exceptions.ConnectionError(
+                f"Nincs szabad upstream kapcsolat {self.pool_timeout} mp alatt", request=request
+            ) from e
+
+
+class UpstreamClient:
+    """
+    Hosszú életű HTTP kliens az OpenWeather API-hoz.
+
+    Egyetlen requests.Session, keep-alive kapcsolatokkal és korlátos
+    kapcsolat-poollal, így a TCP+TLS kézfogás (és a DNS feloldás) csak új
+    kapcsolat nyitásakor történik meg, nem minden hívásnál.
+    """
+
+    def __init__(
+        self,
+        base_url: str = OPENWEATHER_BASE_URL,
+        api_key: str = "",
+        max_connections: int = 10,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10,
+        retries: int = 1,
+        pool_timeout: float = 5
+    ):
+        """
+        :param base_url: OpenWeather API alap URL
+        :param api_key: OpenWeather API kulcs
+        :param max_connections: Egyszerre nyitva tartott kapcsolatok maximuma
+        :param connect_timeout: Kapcsolódási időkorlát (mp)
+        :param read_timeout: Alapértelmezett olvasási időkorlát (mp)
+        :param retries: Újrapróbálkozások száma kapcsolódási hibánál
+        :param pool_timeout: Várakozás szabad kapcsolatra foglalt poolnál (mp)
+        """
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.pool_timeout = pool_timeout
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """Lustán létrehozott, szálak között megosztott session"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> requests.Session:
+        """Session létrehozása poolos adapterrel"""
+        session = requests.Session()
+        adapter = BoundedPoolAdapter(
+            pool_timeout=self.pool_timeout,
+            pool_connections=1,
+            pool_maxsize=self.max_connections,
+            pool_block=True,
+            max_retries=self.retries
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({
+            "Accept": "application/json",
+            "Connection": "keep-alive"
+        })
+        return session
+
+    def get(self, path: str, params: Optional[dict] = None, timeout: Optional[float] = None) -> requests.Response:
+        """
+        GET kérés az OpenWeather API felé
+        :param path: Végpont útvonala, pl. "/weather"
+        :param params: Lekérdezési paraméterek (az API kulcs automatikusan bekerül)
+        :param timeout: Hívásonkénti olvasási időkorlát (mp)
+        """
+        query = {
+            "appid": self.api_key,
+            "lang": "hu",
+            "units": "metric"
+        }
+        if params:
+            query.update(params)
+
+        return self.session.get(
+            f"{self.base_url}/{path.lstrip('/')}",
+            params=query,
+            timeout=(self.connect_timeout, timeout or self.read_timeout)
+        )
+
+    def close(self):
+        """Kapcsolatok lezárása"""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+                logger.info("🔌 Upstream kapcsolatok lezárva")
+
+
+# Globális upstream kliens példány
+upstream = UpstreamClient(
+    base_url=config.OPENWEATHER_BASE_URL,
+    api_key=config.OPENWEATHER_API_KEY,
+    max_connections=config.UPSTREAM_MAX_CONNECTIONS,
+    connect_timeout=config.UPSTREAM_CONNECT_TIMEOUT,
+    retries=config.UPSTREAM_RETRIES,
+    pool_timeout=config.UPSTREAM_POOL_TIMEOUT
+)
@@ -0,0 +1,182 @@
+"""
+✍️ Egyetlen író szál az időjárás mérések mentéséhez
+
+A scheduler és a kérés-kezelők nem írnak közvetlenül az adatbázisba, hanem
+egy korlátos sorba tesznek. Az író szál a sorból kötegeket gyűjt, és egy
+tranzakcióban menti őket, ha a köteg megtelt vagy a gyűjtési idő lejárt.
+Így SQLite-on egyszerre mindig csak egy író van, az olvasók nem várnak.
+Az egyéb írások (város azonosítók, adatmegőrzés) a run() metódussal
+ugyanezen a szálon, a kötegek között futnak.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class _Job:
+    """Az író szálon futtatandó egyedi írási feladat"""
+    __slots__ = ("func", "future")
+
+    def __init__(self, func: Callable[[], Any], future: Future):
+        self.func = func
+        self.future = future
+
+
+class WeatherWriter:
+    """Kötegelő, egyszálú író korlátos bemeneti sorral"""
+
+    def __init__(self, write_batch_func: Callable[[List[dict]], int], max_queue: int = 10000,
+                 batch_size: int = 500, flush_interval: float = 0.05):
+        """
+        :param write_batch_func: Egy adatlistát egy tranzakcióban mentő függvény (mentett sorok száma)
+        :param max_queue: A várakozó kérések maximális száma (efölött a beküldő vár)
+        :param batch_size: Egy tranzakcióba kerülő sorok maximuma (méret trigger)
+        :param flush_interval: Gyűjtési idő az első várakozó elem után (idő trigger, mp)
+        """
+        self.write_batch = write_batch_func
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.stats = {"batches": 0, "rows": 0, "failed_batches": 0}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Író szál indítása (ha még nem fut)"""
+        with self._lock:
+            if self.is_running:
+                return
+            self._thread = threading.Thread(target=self._run, name="weather-writer", daemon=True)
+            self._thread.start()
+            logger.info("✍️  Író szál elindítva")
+
+    def stop(self, timeout: float = 5):
+        """A sorban lévő elemek kiírása, majd az író szál leállítása"""
+        if not self.is_running:
+            return
+        self.queue.put(_STOP)
+        self._thread.join(timeout=timeout)
+        logger.info("🛑 Író szál leállítva")
+
+    def submit(self, weather_list: List[dict], timeout: float = 5) -> Future:
+        """
+        Adatok beküldése mentésre. A visszaadott Future a mentett sorok
+        számával teljesül, amikor a köteg tranzakciója lezárult.
+        """
+        future = Future()
+        if not weather_list:
+            future.set_result(0)
+            return future
+
+        self.start()
+        self.queue.put((list(weather_list), future), timeout=timeout)
+        return future
+
+    def save_batch(self, weather_list: List[dict], timeout: float = 30) -> int:
+        """Beküldés és várakozás a mentésre (a scheduler mentő függvénye)"""
+        return self.submit(weather_list).result(timeout=timeout)
+
+    def run(self, func: Callable[[], Any], timeout: float = 30) -> Any:
+        """
+        Egyedi írási feladat futtatása az író szálon (a kötegekkel sorosítva).
+        A függvény eredményét adja vissza, kivételét továbbdobja.
+        """
+        future = Future()
+        self.start()
+        self.queue.put(_Job(func, future), timeout=timeout)
+        return future.result(timeout=timeout)
+
+    def _run_job(self, job: _Job):
+        try:
+            job.future.set_result(job.func())
+        except Exception as e:
+            logger.error(f"❌ Hiba írási feladatnál: {e}")
+            job.future.set_exception(e)
+
+    def _collect(self, first) -> tuple:
+        """Köteg gyűjtése a méret vagy az idő trigger teljesüléséig (egy közbejövő feladatnál lezárva)"""
+        items = [first]
+        rows = len(first[0])
+        stopping = False
+        job = None
+        deadline = time.monotonic() + self.flush_interval
+
+        while rows < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stopping = True
+                break
+            if isinstance(item, _Job):
+                job = item
+                break
+            items.append(item)
+            rows += len(item[0])
+
+        return items, stopping, job
+
+    def _flush(self, items: list):
+        """Köteg mentése egy tranzakcióban és a Future-ök teljesítése"""
+        rows = [row for weather_list, _ in items for row in weather_list]
+        try:
+            saved = self.write_batch(rows)
+        except Exception as e:
+            logger.error(f"❌ Hiba kötegelt mentéskor: {e}")
+            saved = 0
+
+        self.stats["batches"] += 1
+        if saved:
+            self.stats["rows"] += saved
+        else:
+            self.stats["failed_batches"] += 1
+
+        for weather_list, future in items:
+            future.set_result(len(weather_list) if saved else 0)
+
+    def _run(self):
+        while True:
+            first = self.queue.get()
+            if first is _STOP:
+                break
+            if isinstance(first, _Job):
+                self._run_job(first)
+                continue
+            items, stopping, job = self._collect(first)
+            self._flush(items)
+            if job is not None:
+                self._run_job(job)
+            if stopping:
+                break
+
+        # Leállításkor a maradék kiírása, a beküldés sorrendjében
+        leftover = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _Job):
+                if leftover:
+                    self._flush(leftover)
+                    leftover = []
+                self._run_job(item)
+            elif item is not _STOP:
+                leftover.append(item)
+        if leftover:
+            self._flush(leftover)
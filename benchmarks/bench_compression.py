@@ -0,0 +1,137 @@
+"""
+📏 Tömörítés benchmark - átvitt bájtok és CPU költség végpontonként
+
+A nagy JSON válaszú végpontokat (előzmények, előrejelzés, csoportos
+aktuális időjárás és statisztika) szintetikus adatokon hívja meg, majd a
+tömörítetlen törzset a middleware kódolóival (gzip 1/6/9, brotli 1/4/11, ha
+telepítve van) tömöríti. Méri a tömörített méretet, a kódolás CPU idejét és a
+megadott sávszélességen becsült átviteli időt.
+
+Futtatás (a repó gyökeréből):
+    python benchmarks/bench_compression.py --bandwidth-mbps 20
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CITIES = ["Budapest", "Debrecen", "Szeged", "Pécs", "Győr", "Miskolc", "Nyíregyháza"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Válasz tömörítés benchmark")
+    parser.add_argument("--repeat", type=int, default=200, help="Kódolások száma beállításonként")
+    parser.add_argument("--bandwidth-mbps", type=float, default=20, help="Becsült sávszélesség (Mbit/s)")
+    parser.add_argument("--output", help="Eredmények mentése JSON fájlba")
+    return parser.parse_args()
+
+
+def seed(backend_main):
+    """Városonként 200 mérés az elmúlt napokból, friss legutolsó adattal, és egy előrejelzés a cache-ben"""
+    rng = random.Random(3)
+    now = datetime.utcnow()
+    readings = [
+        {
+            "city": city,
+            "temperature": round(rng.uniform(-10, 35), 2),
+            "humidity": rng.randint(20, 100),
+            "pressure": rng.randint(990, 1030),
+            "wind_speed": round(rng.uniform(0, 15), 1),
+            "description": rng.choice(["derült ég", "enyhén felhős", "borult égbolt", "gyenge eső"]),
+            "icon": rng.choice(["01d", "02d", "04d", "10d"]),
+            "timestamp": now - timedelta(minutes=30 * i)
+        }
+        for city in CITIES
+        for i in range(200)
+    ]
+    backend_main.save_weather_batch_to_db(readings)
+
+    forecasts = [
+        backend_main.DailyForecast(
+            date=(now + timedelta(days=i)).strftime("%Y-%m-%d"), day_temp=18.5, night_temp=9.1,
+            min_temp=7.4, max_temp=21.3, humidity=64, pressure=1016, wind_speed=3.4,
+            description="enyhén felhős", icon="02d", pop=20
+        )
+        for i in range(7)
+    ]
+    backend_main.forecast_cache.set(
+        "budapest",
+        backend_main.ForecastResponse(city="Budapest", country="HU", forecasts=forecasts, last_update=now)
+    )
+
+
+def encoders():
+    """(név, kódoló gyár) párok a middleware kódolóiból"""
+    from backend.compression import _GzipEncoder, _BrotliEncoder, brotli
+
+    result = [(f"gzip-{level}", lambda level=level: _GzipEncoder(level)) for level in (1, 6, 9)]
+    if brotli is not None:
+        result += [(f"br-{quality}", lambda quality=quality: _BrotliEncoder(quality)) for quality in (1, 4, 11)]
+    return result
+
+
+def measure(body: bytes, factory, repeat: int) -> dict:
+    """Tömörített méret és átlagos CPU idő (ms) egy válaszra"""
+    started = time.process_time()
+    for _ in range(repeat):
+        encoder = factory()
+        compressed = encoder.process(body) + encoder.finish()
+    cpu_ms = (time.process_time() - started) * 1000 / repeat
+    return {"bytes": len(compressed), "cpu_ms": round(cpu_ms, 4)}
+
+
+def main():
+    args = parse_args()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='weather-bench-'), 'bench.db')}"
+    os.environ.setdefault("OPENWEATHER_API_KEY", "bench-key")
+    sys.path.insert(0, ROOT)
+
+    from fastapi.testclient import TestClient
+    import backend.main as backend_main
+
+    seed(backend_main)
+    client = TestClient(backend_main.app)
+    endpoints = {
+        "history_100": ("/api/weather/history", {"city": "Budapest", "limit": 100}),
+        "forecast_7d": ("/api/forecast", {"city": "Budapest", "days": 7}),
+        "weather_batch_7": ("/api/weather/batch", {"cities": ",".join(CITIES)}),
+        "stats_batch_7x3": ("/api/weather/stats/batch", {"cities": ",".join(CITIES), "hours": "1,24,168"}),
+    }
+
+    bytes_per_ms = args.bandwidth_mbps * 1_000_000 / 8 / 1000
+    results = {}
+    for name, (path, params) in endpoints.items():
+        response = client.get(path, params=params, headers={"Accept-Encoding": "identity"})
+        response.raise_for_status()
+        body = response.content
+        row = {"identity": {"bytes": len(body), "cpu_ms": 0.0}}
+        for encoding, factory in encoders():
+            row[encoding] = measure(body, factory, args.repeat)
+        for values in row.values():
+            values["transfer_ms"] = round(values["bytes"] / bytes_per_ms, 3)
+        results[name] = row
+
+    print(f"Becsült átvitel {args.bandwidth_mbps:g} Mbit/s mellett\n")
+    for name, row in results.items():
+        print(f"{name}")
+        print(f"  {'kódolás':<10}{'bájt':>10}{'arány':>8}{'CPU (ms)':>11}{'átvitel (ms)':>15}")
+        identity = row["identity"]["bytes"]
+        for encoding, values in row.items():
+            ratio = values["bytes"] / identity
+            print(f"  {encoding:<10}{values['bytes']:>10}{ratio:>8.2f}{values['cpu_ms']:>11.3f}{values['transfer_ms']:>15.3f}")
+        print()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Eredmények: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+📏 SQLite profil benchmark - vegyes olvasás/írás terhelés
+
+Ugyanazt a terhelést futtatja a "default" (gyári) és a "performance"
+(WAL, synchronous=NORMAL, mmap, cache, busy_timeout, temp_store) profillal:
+több olvasó szál a végpontok lekérdezéseivel (legfrissebb adat, előzmények,
+statisztika), közben egy író szál a scheduler ciklusaihoz hasonló csoportos
+mentésekkel. Méri az áteresztőképességet, az olvasási késleltetést és a
+"database is locked" hibákat.
+
+Futtatás (a repó gyökeréből):
+    python benchmarks/bench_sqlite_profiles.py --duration 10 --readers 8
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="SQLite PRAGMA profilok összehasonlítása")
+    parser.add_argument("--duration", type=float, default=10, help="Mérés hossza profilonként (mp)")
+    parser.add_argument("--readers", type=int, default=8, help="Olvasó szálak száma")
+    parser.add_argument("--cities", type=int, default=50, help="Városok száma")
+    parser.add_argument("--seed-rows", type=int, default=100_000, help="Előre betöltött sorok")
+    parser.add_argument("--write-batch", type=int, default=50, help="Sorok száma írási tranzakciónként")
+    parser.add_argument("--output", help="Eredmények mentése JSON fájlba")
+    return parser.parse_args()
+
+
+def reading(rng, city, ts):
+    return {
+        "city": city,
+        "temperature": round(rng.uniform(-10, 35), 2),
+        "humidity": rng.randint(20, 100),
+        "pressure": rng.randint(990, 1030),
+        "wind_speed": round(rng.uniform(0, 15), 1),
+        "description": "szintetikus",
+        "icon": "01d",
+        "timestamp": ts
+    }
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_profile(profile: str, args) -> dict:
+    """Egy profil mérése saját, friss adatbázison"""
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.exc import OperationalError
+    import backend.main as backend_main
+    from backend.database import create_db_engine
+    from backend.migrations import run_migrations
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix=f"weather-{profile}-"), "bench.db")
+    engine = create_db_engine(f"sqlite:///{db_path}", profile)
+    run_migrations(engine)
+    Session = sessionmaker(bind=engine)
+
+    cities = [f"Profilváros{i:03d}" for i in range(args.cities)]
+    rng = random.Random(1)
+    now = datetime.utcnow()
+    seed_rows = [
+        reading(rng, cities[i % len(cities)], now - timedelta(minutes=i // len(cities)))
+        for i in range(args.seed_rows)
+    ]
+
+    def write(batch):
+        db = Session()
+        try:
+            db.execute(backend_main.insert(backend_main.WeatherRecord), batch)
+            backend_main.upsert_latest_weather(db, batch)
+            backend_main.apply_rollups(db, batch)
+            db.commit()
+        finally:
+            db.close()
+
+    for i in range(0, len(seed_rows), 5000):
+        write(seed_rows[i:i + 5000])
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = {"reads": 0, "writes": 0, "read_errors": 0, "write_errors": 0, "read_latencies": []}
+
+    def reader(seed):
+        local_rng = random.Random(seed)
+        latencies = []
+        reads = errors = 0
+        while not stop.is_set():
+            city = local_rng.choice(cities)
+            started = time.perf_counter()
+            db = Session()
+            try:
+                backend_main.get_latest_weather(db, city)
+                backend_main.get_weather_history(db, city, 20)
+                backend_main.get_weather_stats(db, city, 24)
+                reads += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+            except OperationalError:
+                errors += 1
+            finally:
+                db.close()
+        with lock:
+            stats["reads"] += reads
+            stats["read_errors"] += errors
+            stats["read_latencies"].extend(latencies)
+
+    def writer():
+        local_rng = random.Random(99)
+        while not stop.is_set():
+            batch = [reading(local_rng, local_rng.choice(cities), datetime.utcnow()) for _ in range(args.write_batch)]
+            try:
+                write(batch)
+                stats["writes"] += 1
+            except OperationalError:
+                stats["write_errors"] += 1
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    threads.append(threading.Thread(target=writer))
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+
+    latencies = stats.pop("read_latencies")
+    return {
+        **stats,
+        "reads_per_sec": round(stats["reads"] / elapsed, 1),
+        "write_tx_per_sec": round(stats["writes"] / elapsed, 1),
+        "rows_written_per_sec": round(stats["writes"] * args.write_batch / elapsed, 1),
+        "read_p50_ms": round(percentile(latencies, 50), 3),
+        "read_p99_ms": round(percentile(latencies, 99), 3)
+    }
+
+
+def main():
+    args = parse_args()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='weather-bench-'), 'main.db')}"
+    sys.path.insert(0, ROOT)
+
+    results = {}
+    for profile in ("default", "performance"):
+        print(f"⏳ Profil: {profile} ({args.duration:.0f} mp, {args.readers} olvasó + 1 író)...")
+        results[profile] = run_profile(profile, args)
+
+    keys = ["reads_per_sec", "read_p50_ms", "read_p99_ms", "read_errors",
+            "write_tx_per_sec", "rows_written_per_sec", "write_errors"]
+    print(f"\n{'mérőszám':<22}{'default':>14}{'performance':>14}")
+    for key in keys:
+        print(f"{key:<22}{results['default'][key]:>14}{results['performance'][key]:>14}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Eredmények: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+📏 Backend benchmark csomag - forró útvonalak mérése regresszió-összehasonlításhoz
+
+Adatméretenként friss, szintetikus adatokkal feltöltött SQLite adatbázison
+méri a backend forró útvonalait:
+
+- függvények: process_forecast_data, save_weather_to_db, get_latest_weather,
+  get_weather_history, get_weather_stats
+- végpontok TestClienttel: /api/weather, /api/weather/history,
+  /api/weather/stats, /api/forecast (meleg cache és hideg, upstream hívással)
+
+Az upstream a benchmarks/fake_upstream.py hamis OpenWeather adaptere, így
+nincs hálózat és API kulcs. Minden adatméret külön folyamatban fut (a
+backend az importáláskor kapcsolódik az adatbázishoz). A "memory" tárolás
+RAM-alapú fájlrendszeren (/dev/shm) lévő fájl - a backend külön író, olvasó
+és async olvasó kapcsolatai miatt valódi :memory: adatbázis nem használható.
+
+Futtatás (a repó gyökeréből):
+    python benchmarks/bench_suite.py --sizes 1000,100000 --output baseline.json
+    python benchmarks/bench_suite.py --sizes 1000,100000 --compare baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backend benchmark csomag")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Sorok száma a weather táblában, vesszővel")
+    parser.add_argument("--cities", type=int, default=10, help="Városok száma")
+    parser.add_argument("--storage", choices=["disk", "memory"], default="disk", help="Adatbázis fájl helye")
+    parser.add_argument("--repeat", type=int, default=200, help="Ismétlések száma esetenként")
+    parser.add_argument("--warmup", type=int, default=10, help="Nem mért bemelegítő futások esetenként")
+    parser.add_argument("--only", help="Csak a megadott esetek (vesszővel, pl. api_weather,get_weather_history_100)")
+    parser.add_argument("--output", help="Eredmények mentése JSON fájlba")
+    parser.add_argument("--compare", help="Korábbi JSON eredmény, amihez viszonyítunk")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Regresszió küszöb a mediánra (0.10 = +10%%)")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def measure(func, repeat: int, warmup: int) -> dict:
+    """Futásidő statisztika ms-ban"""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "repeat": repeat,
+        "median_ms": round(statistics.median(timings), 4),
+        "mean_ms": round(statistics.fmean(timings), 4),
+        "p95_ms": round(percentile(timings, 95), 4),
+        "min_ms": round(min(timings), 4),
+        "ops_per_sec": round(1000 / statistics.fmean(timings), 1)
+    }
+
+
+def reading(rng, city, ts):
+    return {
+        "city": city,
+        "temperature": round(rng.uniform(-10, 35), 2),
+        "humidity": rng.randint(20, 100),
+        "pressure": rng.randint(990, 1030),
+        "wind_speed": round(rng.uniform(0, 15), 1),
+        "description": "szintetikus",
+        "icon": "01d",
+        "timestamp": ts
+    }
+
+
+def seed(backend_main, rows: int, cities: list):
+    """Városonként egyenletes, percenkénti mérések a jelenből visszafelé (legfrissebb és összesítő táblákkal)"""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    batch = []
+    for i in range(rows):
+        batch.append(reading(rng, cities[i % len(cities)], now - timedelta(minutes=i // len(cities))))
+        if len(batch) >= 10_000:
+            backend_main.save_weather_batch_to_db(batch)
+            batch = []
+    backend_main.save_weather_batch_to_db(batch)
+
+
+def cases(backend_main, client, cities: list) -> tuple:
+    """Mért esetek: (olvasó session, {név → paraméter nélküli függvény})"""
+    from fake_upstream import forecast_payload
+
+    city = cities[len(cities) // 2]
+    rng = random.Random(7)
+    payload = forecast_payload(city)
+    db = backend_main.SessionLocal()
+
+    def save_one():
+        backend_main.save_weather_to_db(reading(rng, city, datetime.utcnow()))
+
+    def get(path, **params):
+        def call():
+            response = client.get(path, params=params)
+            if response.status_code != 200:
+                raise RuntimeError(f"{path}: HTTP {response.status_code}")
+        return call
+
+    def forecast_cold():
+        backend_main.forecast_cache.clear()
+        get("/api/forecast", city=city)()
+
+    return db, {
+        "process_forecast_data": lambda: backend_main.process_forecast_data(payload),
+        "save_weather_to_db": save_one,
+        "get_latest_weather": lambda: backend_main.get_latest_weather(db, city),
+        "get_weather_history_100": lambda: backend_main.get_weather_history(db, city, 100),
+        "get_weather_stats_24h": lambda: backend_main.get_weather_stats(db, city, 24),
+        "get_weather_stats_168h": lambda: backend_main.get_weather_stats(db, city, 168),
+        "api_weather": get("/api/weather", city=city),
+        "api_weather_history_100": get("/api/weather/history", city=city, limit=100),
+        "api_weather_stats_24h": get("/api/weather/stats", city=city, hours=24),
+        "api_forecast_cached": get("/api/forecast", city=city),
+        "api_forecast_upstream": forecast_cold,
+    }
+
+
+def run_worker(args) -> dict:
+    """Egy adatméret mérése (külön folyamatban)"""
+    import asyncio
+
+    rows = args.worker
+    parent = "/dev/shm" if args.storage == "memory" and os.path.isdir("/dev/shm") else None
+    workdir = tempfile.mkdtemp(prefix="weather-suite-", dir=parent)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["OPENWEATHER_API_KEY"] = "bench-key"
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    import logging
+    from fastapi.testclient import TestClient
+    import backend.main as backend_main
+    from fake_upstream import install
+
+    logging.disable(logging.INFO)
+    adapter = install(backend_main.upstream)
+    cities = [f"Benchváros{i:03d}" for i in range(args.cities)]
+
+    try:
+        started = time.perf_counter()
+        seed(backend_main, rows, cities)
+        seed_seconds = time.perf_counter() - started
+
+        # Startup esemény nélkül (nincs scheduler), az író szál a beküldéskor indul
+        client = TestClient(backend_main.app)
+        db, selected = cases(backend_main, client, cities)
+        if args.only:
+            wanted = set(args.only.split(","))
+            selected = {name: func for name, func in selected.items() if name in wanted}
+
+        results = {}
+        try:
+            for name, func in selected.items():
+                results[name] = measure(func, args.repeat, args.warmup)
+        finally:
+            db.close()
+            client.close()
+        return {"rows": rows, "seed_seconds": round(seed_seconds, 2), "upstream_calls": adapter.calls, "cases": results}
+    finally:
+        backend_main.writer.stop()
+        asyncio.run(backend_main.async_read_engine.dispose())
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Medián összevetése az alapmérésével; a küszöbnél lassabb esetek listája"""
+    regressions = []
+    print(f"\nÖsszevetés: {baseline['meta'].get('revision') or '?'} → {results['meta'].get('revision') or '?'}")
+    print(f"{'méret / eset':<40}{'előtte (ms)':>13}{'utána (ms)':>13}{'változás':>11}")
+    for size, run in results["sizes"].items():
+        previous = baseline["sizes"].get(size)
+        if not previous:
+            continue
+        for name, stats in run["cases"].items():
+            before = previous["cases"].get(name)
+            if not before:
+                continue
+            change = stats["median_ms"] / before["median_ms"] - 1 if before["median_ms"] else 0.0
+            flag = " ⚠️" if change > threshold else ""
+            if flag:
+                regressions.append(f"{size}/{name}")
+            print(f"{size + '/' + name:<40}{before['median_ms']:>13.3f}{stats['median_ms']:>13.3f}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main():
+    args = parse_args()
+    if args.worker is not None:
+        # Az utolsó sor az eredmény (a backend naplója elé kerülhet)
+        print("\n" + json.dumps(run_worker(args)))
+        return
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    results = {
+        "meta": {
+            "revision": git_revision(),
+            "created": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "storage": args.storage,
+            "cities": args.cities,
+            "repeat": args.repeat
+        },
+        "sizes": {}
+    }
+
+    for rows in sizes:
+        print(f"⏳ {rows:,} sor ({args.cities} város, {args.storage})...", flush=True)
+        command = [sys.executable, os.path.abspath(__file__), "--worker", str(rows),
+                   "--cities", str(args.cities), "--storage", args.storage,
+                   "--repeat", str(args.repeat), "--warmup", str(args.warmup)]
+        if args.only:
+            command += ["--only", args.only]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(completed.stderr, file=sys.stderr)
+            sys.exit(f"❌ A mérés nem sikerült: {rows} sor")
+        run = json.loads(completed.stdout.strip().splitlines()[-1])
+        results["sizes"][str(rows)] = run
+
+        print(f"   feltöltés: {run['seed_seconds']:.1f} mp")
+        print(f"   {'eset':<28}{'medián (ms)':>13}{'p95 (ms)':>11}{'művelet/mp':>13}")
+        for name, stats in run["cases"].items():
+            print(f"   {name:<28}{stats['median_ms']:>13.3f}{stats['p95_ms']:>11.3f}{stats['ops_per_sec']:>13.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Eredmények: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            sys.exit(f"\n⚠️  {len(regressions)} eset lassult {args.threshold:.0%}-nál többet: {', '.join(regressions)}")
+        print("\n✅ Nincs a küszöböt meghaladó lassulás")
+
+
+if __name__ == "__main__":
+    main()
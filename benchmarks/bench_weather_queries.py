@@ -0,0 +1,199 @@
+"""
+📏 Lekérdezés benchmark - legfrissebb adat / előzmények / statisztika
+
+Nagy (alapértelmezetten 10^6 soros) SQLite adatbázison méri a nyers
+`weather` táblán futó lekérdezéseket (legfrissebb mérés, előzmények,
+időablakos statisztika) a régi (külön city és id index) és az új, összetett
+(city, timestamp DESC, temperature, humidity) indexszel.
+
+A végpontok legfrissebb adata és statisztikája már a `latest_weather` és az
+összesítő táblákból jön, ezért ezek a nyers lekérdezések csak
+összehasonlításként, a backend CRUD függvényei (latest_weather + rollup
+olvasás) pedig külön sorban szerepelnek - azokra az index nincs hatással.
+
+Futtatás (a repó gyökeréből):
+    python benchmarks/bench_weather_queries.py --rows 1000000 --cities 20
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Időjárás lekérdezések benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Sorok száma a weather táblában")
+    parser.add_argument("--cities", type=int, default=20, help="Városok száma")
+    parser.add_argument("--repeat", type=int, default=50, help="Ismétlések száma lekérdezésenként")
+    parser.add_argument("--output", help="Eredmények mentése JSON fájlba")
+    return parser.parse_args()
+
+
+def seed(engine, rows: int, cities: list):
+    """Szintetikus mérések beszúrása, percenkénti lépéssel visszafelé a jelenből"""
+    from sqlalchemy import insert, text
+    from backend.models import WeatherRecord
+    from backend.migrations import latest_weather_table, weather_rollup_tables
+
+    now = datetime.utcnow()
+    per_city = rows // len(cities)
+    rng = random.Random(42)
+    batch = []
+
+    with engine.begin() as conn:
+        for i in range(per_city):
+            ts = now - timedelta(minutes=i)
+            for city in cities:
+                batch.append({
+                    "city": city,
+                    "temperature": round(rng.uniform(-10, 35), 2),
+                    "humidity": rng.randint(20, 100),
+                    "pressure": rng.randint(990, 1030),
+                    "wind_speed": round(rng.uniform(0, 15), 1),
+                    "description": "szintetikus",
+                    "icon": "01d",
+                    "timestamp": ts
+                })
+            if len(batch) >= 50_000:
+                conn.execute(insert(WeatherRecord.__table__), batch)
+                batch.clear()
+        if batch:
+            conn.execute(insert(WeatherRecord.__table__), batch)
+
+        # Legfrissebb és összesítő táblák újraépítése a migrációs feltöltéssel
+        for table in ("latest_weather", "weather_hourly", "weather_daily"):
+            conn.execute(text(f"DELETE FROM {table}"))
+        latest_weather_table(conn)
+        weather_rollup_tables(conn)
+
+
+def measure(func, repeat: int) -> dict:
+    """Futásidő mérése ms-ban (medián és p95)"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3)
+    }
+
+
+def raw_statements(city: str):
+    """A nyers weather táblán futó lekérdezések (az index összehasonlításhoz)"""
+    from sqlalchemy import func, select
+    from backend.models import WeatherRecord
+
+    def stats(hours):
+        return select(
+            func.count(WeatherRecord.id),
+            func.avg(WeatherRecord.temperature),
+            func.min(WeatherRecord.temperature),
+            func.max(WeatherRecord.temperature),
+            func.avg(WeatherRecord.humidity),
+            func.max(WeatherRecord.timestamp)
+        ).where(
+            WeatherRecord.city == city,
+            WeatherRecord.timestamp >= datetime.utcnow() - timedelta(hours=hours)
+        )
+
+    return {
+        "raw_latest": lambda: select(WeatherRecord).where(WeatherRecord.city == city)
+        .order_by(WeatherRecord.timestamp.desc()).limit(1),
+        "raw_stats_24h": lambda: stats(24),
+        "raw_stats_720h": lambda: stats(720),
+    }
+
+
+def run_queries(backend_main, cities: list, repeat: int) -> dict:
+    """A nyers táblás lekérdezések egy adott index-konfigurációval"""
+    city = cities[len(cities) // 2]
+    db = backend_main.SessionLocal()
+    try:
+        results = {}
+        for name, stmt in raw_statements(city).items():
+            runs = max(3, repeat // 10) if name.endswith("720h") else repeat
+            results[name] = measure(lambda stmt=stmt: db.execute(stmt()).all(), runs)
+        # Az előzmények továbbra is a nyers táblából jönnek
+        results["history_100"] = measure(lambda: backend_main.get_weather_history(db, city, 100), repeat)
+        return results
+    finally:
+        db.close()
+
+
+def run_backend_reads(backend_main, cities: list, repeat: int) -> dict:
+    """A végpontok által használt olvasások (latest_weather és összesítő táblák)"""
+    city = cities[len(cities) // 2]
+    db = backend_main.SessionLocal()
+    try:
+        return {
+            "latest (latest_weather)": measure(lambda: backend_main.get_latest_weather(db, city), repeat),
+            "stats_24h (rollup)": measure(lambda: backend_main.get_weather_stats(db, city, 24), repeat),
+            "stats_720h (rollup)": measure(lambda: backend_main.get_weather_stats(db, city, 720), repeat),
+        }
+    finally:
+        db.close()
+
+
+def main():
+    args = parse_args()
+    db_path = os.path.join(tempfile.mkdtemp(prefix="weather-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    sys.path.insert(0, ROOT)
+
+    from sqlalchemy import text
+    import backend.main as backend_main
+    from backend.migrations import weather_city_timestamp_index
+
+    cities = [f"Benchváros{i:03d}" for i in range(args.cities)]
+    engine = backend_main.engine
+
+    # Régi index-konfiguráció visszaállítása
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX IF EXISTS ix_weather_city_timestamp"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_weather_city ON weather (city)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_weather_id ON weather (id)"))
+
+    print(f"⏳ {args.rows:,} sor beszúrása ({args.cities} város)...")
+    started = time.perf_counter()
+    seed(engine, args.rows, cities)
+    print(f"   kész: {time.perf_counter() - started:.1f} mp")
+
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    results = {"rows": args.rows, "cities": args.cities, "legacy_indexes": run_queries(backend_main, cities, args.repeat)}
+
+    with engine.begin() as conn:
+        weather_city_timestamp_index(conn)
+        conn.execute(text("ANALYZE"))
+    results["composite_index"] = run_queries(backend_main, cities, args.repeat)
+
+    results["backend_reads"] = run_backend_reads(backend_main, cities, args.repeat)
+
+    print(f"\n{'nyers lekérdezés':<16}{'régi (ms)':>14}{'összetett (ms)':>18}{'gyorsulás':>12}")
+    for name, legacy in results["legacy_indexes"].items():
+        new = results["composite_index"][name]
+        speedup = legacy["median_ms"] / new["median_ms"] if new["median_ms"] else float("inf")
+        print(f"{name:<16}{legacy['median_ms']:>14.3f}{new['median_ms']:>18.3f}{speedup:>11.1f}x")
+
+    print(f"\n{'backend olvasás':<26}{'medián (ms)':>14}{'p95 (ms)':>12}")
+    for name, stats in results["backend_reads"].items():
+        print(f"{name:<26}{stats['median_ms']:>14.3f}{stats['p95_ms']:>12.3f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Eredmények: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""
+🎭 Hamis OpenWeather upstream a benchmarkokhoz és terheléses tesztekhez
+
+Valósághű /weather, /forecast és /group válaszok szintetikus városokra,
+hálózat és API kulcs nélkül. A város adatai a névből determinisztikusan
+jönnek (azonos név → azonos azonosító és koordináták), a mért értékek
+10 percenként változnak.
+
+Két használati mód, közös hibainjektálással (FaultModel - késleltetés
+eloszlás, 5xx hibák, 429 válaszok, időtúllépések):
+
+- `install(upstream)` egy requests adaptert csatol a backend upstream
+  kliensének sessionjére, így a `fetch_*_from_api` függvények folyamaton
+  belül kapják a válaszokat (benchmarks/bench_suite.py).
+- Önálló ASGI szerverként (`FakeOpenWeather`), amire a backend az
+  OPENWEATHER_BASE_URL beállítással irányítható:
+
+    python benchmarks/fake_upstream.py --port 8090 --latency lognormal \\
+        --latency-ms 80 --latency-spread 0.6 --error-rate 0.01 --throttle-rate 0.02
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8090/data/2.5 uvicorn backend.main:app
+
+  A `GET /_fake/stats` végpont a kiszolgált kérések számát adja
+  végpontonként és státuszonként.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "lognormal", "exponential")
+
+DESCRIPTIONS = [
+    ("derült ég", "01", 800, "Clear"),
+    ("kevés felhő", "02", 801, "Clouds"),
+    ("szórványos felhőzet", "03", 802, "Clouds"),
+    ("borult égbolt", "04", 804, "Clouds"),
+    ("gyenge eső", "10", 500, "Rain"),
+    ("zivatar", "11", 211, "Thunderstorm"),
+    ("havazás", "13", 601, "Snow"),
+]
+
+# Az azonosító → név visszakereséshez (/group); a /weather hívás tölti
+_names_by_id = {}
+
+
+def city_id(name: str) -> int:
+    """Névből képzett, stabil OpenWeather-szerű város azonosító"""
+    city = name.strip()
+    cid = 1_000_000 + zlib.crc32(city.lower().encode("utf-8")) % 9_000_000
+    _names_by_id.setdefault(cid, city)
+    return cid
+
+
+def _condition(rng: random.Random, hour: int) -> dict:
+    description, icon, code, main = rng.choice(DESCRIPTIONS)
+    return {
+        "id": code,
+        "main": main,
+        "description": description,
+        "icon": f"{icon}{'d' if 6 <= hour < 20 else 'n'}"
+    }
+
+
+def _measurement(rng: random.Random, base_temp: float, hour: int) -> dict:
+    # Napi menet: délután a legmelegebb
+    temp = round(base_temp + 6 * (1 - abs(hour - 15) / 12) + rng.uniform(-1.5, 1.5), 2)
+    return {
+        "main": {
+            "temp": temp,
+            "feels_like": round(temp - rng.uniform(0, 3), 2),
+            "temp_min": round(temp - rng.uniform(0, 2), 2),
+            "temp_max": round(temp + rng.uniform(0, 2), 2),
+            "pressure": rng.randint(995, 1030),
+            "humidity": rng.randint(25, 98)
+        },
+        "wind": {"speed": round(rng.uniform(0, 12), 2), "deg": rng.randint(0, 359)},
+        "clouds": {"all": rng.randint(0, 100)},
+        "weather": [_condition(rng, hour)]
+    }
+
+
+def _base_temp(cid: int) -> float:
+    return random.Random(cid).uniform(-5, 22)
+
+
+def weather_payload(name: str, now: float = None) -> dict:
+    """/weather válasz (aktuális időjárás)"""
+    now = time.time() if now is None else now
+    cid = city_id(name)
+    rng = random.Random(cid * 1_000_003 + int(now // 600))
+    hour = time.gmtime(now).tm_hour
+    payload = {
+        "coord": {"lon": round(random.Random(cid).uniform(-180, 180), 4),
+                  "lat": round(random.Random(cid + 1).uniform(-60, 70), 4)},
+        **_measurement(rng, _base_temp(cid), hour),
+        "visibility": 10000,
+        "dt": int(now),
+        "sys": {"country": "HU", "sunrise": int(now // 86400 * 86400 + 5 * 3600),
+                "sunset": int(now // 86400 * 86400 + 18 * 3600)},
+        "timezone": 0,
+        "id": cid,
+        "name": _names_by_id[cid],
+        "cod": 200
+    }
+    return payload
+
+
+def forecast_payload(name: str, cnt: int = 40, now: float = None) -> dict:
+    """/forecast válasz (5 nap, 3 órás mérések)"""
+    now = time.time() if now is None else now
+    cid = city_id(name)
+    base_temp = _base_temp(cid)
+    start = int(now // 10800 + 1) * 10800
+    entries = []
+    for i in range(cnt):
+        dt = start + i * 10800
+        rng = random.Random(cid * 1_000_003 + dt // 10800)
+        hour = time.gmtime(dt).tm_hour
+        entry = _measurement(rng, base_temp, hour)
+        entry.update({
+            "dt": dt,
+            "visibility": 10000,
+            "pop": round(rng.choice([0, 0, 0, rng.random()]), 2),
+            "sys": {"pod": "d" if 6 <= hour < 20 else "n"},
+            "dt_txt": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(dt))
+        })
+        entries.append(entry)
+
+    return {
+        "cod": "200",
+        "message": 0,
+        "cnt": cnt,
+        "list": entries,
+        "city": {
+            "id": cid,
+            "name": _names_by_id[cid],
+            "country": "HU",
+            "timezone": 0,
+            "population": random.Random(cid).randint(5_000, 2_000_000)
+        }
+    }
+
+
+def group_payload(ids: list, now: float = None) -> dict:
+    """/group válasz - csak a korábban látott azonosítók szerepelnek (mint az ismeretlen id-k az API-nál)"""
+    items = [weather_payload(_names_by_id[cid], now) for cid in ids if cid in _names_by_id]
+    return {"cnt": len(items), "list": items}
+
+
+def handle(path: str, query: dict) -> tuple:
+    """Útvonal + lekérdezés → (státusz, JSON törzs)"""
+    endpoint = path.rstrip("/").rsplit("/", 1)[-1]
+    if endpoint == "weather" and query.get("q"):
+        return 200, weather_payload(query["q"])
+    if endpoint == "forecast" and query.get("q"):
+        return 200, forecast_payload(query["q"], min(int(query.get("cnt", 40)), 40))
+    if endpoint == "group" and query.get("id"):
+        ids = [int(cid) for cid in query["id"].split(",") if cid.strip().isdigit()]
+        if len(ids) > 20:
+            return 400, {"cod": "400", "message": "Too many ids"}
+        return 200, group_payload(ids)
+    return 404, {"cod": "404", "message": "Internal error"}
+
+
+class FaultModel:
+    """Késleltetés és hibák kérésenként, reprodukálható véletlen sorozattal"""
+
+    def __init__(self, latency: str = "constant", latency_ms: float = 0, latency_spread: float = 0,
+                 error_rate: float = 0, throttle_rate: float = 0, rate_limit: float = 0,
+                 timeout_rate: float = 0, timeout_seconds: float = 30, seed: int = 0):
+        """
+        :param latency: Késleltetés eloszlása: constant, uniform, lognormal vagy exponential
+        :param latency_ms: constant/uniform: átlag, lognormal: medián, exponential: átlag (ms)
+        :param latency_spread: uniform: ± szélesség (ms), lognormal: szigma (0.5 körül valósághű farok)
+        :param error_rate: 500/502/503 válaszok aránya
+        :param throttle_rate: Véletlenszerű 429 válaszok aránya
+        :param rate_limit: Kérés/mp korlát (token bucket), felette 429; 0 = nincs korlát
+        :param timeout_rate: Megakadó kérések aránya (a válasz `timeout_seconds` után érkezik)
+        :param seed: A véletlen sorozat magja
+        """
+        if latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Ismeretlen késleltetés eloszlás: {latency} ({', '.join(LATENCY_DISTRIBUTIONS)})")
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.latency_spread = latency_spread
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.timeout_rate = timeout_rate
+        self.timeout_seconds = timeout_seconds
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = rate_limit
+        self._refilled = time.monotonic()
+
+    def sample_latency(self) -> float:
+        """Egy késleltetés (mp) a beállított eloszlásból"""
+        rng = self._rng
+        if self.latency_ms <= 0:
+            return 0.0
+        if self.latency == "uniform":
+            ms = rng.uniform(self.latency_ms - self.latency_spread, self.latency_ms + self.latency_spread)
+        elif self.latency == "lognormal":
+            ms = self.latency_ms * math.exp(rng.gauss(0, self.latency_spread))
+        elif self.latency == "exponential":
+            ms = rng.expovariate(1 / self.latency_ms)
+        else:
+            ms = self.latency_ms
+        return max(0.0, ms) / 1000
+
+    def _rate_limited(self) -> bool:
+        if self.rate_limit <= 0:
+            return False
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+        self._refilled = now
+        if self._tokens < 1:
+            return True
+        self._tokens -= 1
+        return False
+
+    def decide(self) -> tuple:
+        """(késleltetés mp, hibás státusz vagy None) a következő kérésre"""
+        with self._lock:
+            delay = self.sample_latency()
+            if self._rate_limited():
+                return delay, 429
+            roll = self._rng.random()
+            if roll < self.timeout_rate:
+                return self.timeout_seconds, None
+            roll -= self.timeout_rate
+            if roll < self.throttle_rate:
+                return delay, 429
+            roll -= self.throttle_rate
+            if roll < self.error_rate:
+                return delay, self._rng.choice((500, 502, 503))
+            return delay, None
+
+
+def _error_body(status: int) -> dict:
+    if status == 429:
+        return {"cod": 429, "message": "Your account is temporary blocked due to exceeding of requests limitation"}
+    return {"cod": str(status), "message": "Internal error"}
+
+
+def respond(path: str, query: dict, faults: Optional[FaultModel]) -> tuple:
+    """(késleltetés mp, státusz, JSON törzs) - a hibainjektálás után a valódi kezelő"""
+    delay, status = faults.decide() if faults else (0.0, None)
+    if status is not None:
+        return delay, status, _error_body(status)
+    status, body = handle(path, query)
+    return delay, status, body
+
+
+class FakeUpstreamAdapter(BaseAdapter):
+    """requests adapter, amely a kéréseket a hamis upstreamből szolgálja ki"""
+
+    def __init__(self, faults: Optional[FaultModel] = None):
+        super().__init__()
+        self.faults = faults
+        self.calls = 0
+
+    def send(self, request, timeout=None, **kwargs):
+        self.calls += 1
+        url = urlsplit(request.url)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        delay, status, body = respond(url.path, query, self.faults)
+
+        # A kliens olvasási időkorlátja után nem várunk tovább, mint a valódi socket
+        read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+        if read_timeout is not None and delay >= read_timeout:
+            time.sleep(read_timeout)
+            raise requests.exceptions.ReadTimeout(f"Hamis upstream: nincs válasz {read_timeout} mp alatt", request=request)
+        if delay:
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json; charset=utf-8"})
+        response._content = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def install(upstream, faults: Optional[FaultModel] = None) -> FakeUpstreamAdapter:
+    """Hamis adapter csatolása a backend upstream kliensére (a base URL minden kérésére)"""
+    adapter = FakeUpstreamAdapter(faults)
+    upstream.session.mount(upstream.base_url, adapter)
+    return adapter
+
+
+class FakeOpenWeather:
+    """Önálló ASGI alkalmazás a hamis upstreamhez"""
+
+    def __init__(self, faults: Optional[FaultModel] = None):
+        self.faults = faults
+        self.stats = Counter()
+
+    async def _send_json(self, send, status: int, body: dict, headers: list = ()):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json; charset=utf-8"),
+                (b"content-length", str(len(payload)).encode()),
+                *headers
+            ]
+        })
+        await send({"type": "http.response.body", "body": payload})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        path = scope["path"]
+        if path == "/_fake/stats":
+            await self._send_json(send, 200, {f"{key[0]} {key[1]}": count for key, count in sorted(self.stats.items())})
+            return
+
+        query = {key: values[-1] for key, values in parse_qs(scope.get("query_string", b"").decode("latin-1")).items()}
+        delay, status, body = respond(path, query, self.faults)
+        if delay:
+            await asyncio.sleep(delay)
+
+        self.stats[(path.rstrip("/").rsplit("/", 1)[-1], status)] += 1
+        headers = [(b"retry-after", b"1")] if status == 429 else []
+        await self._send_json(send, status, body, headers)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Hamis OpenWeather szerver hibainjektálással")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal", help="Késleltetés eloszlása")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Késleltetés medián/átlag (ms)")
+    parser.add_argument("--latency-spread", type=float, default=0.5, help="uniform: ± ms, lognormal: szigma")
+    parser.add_argument("--error-rate", type=float, default=0, help="5xx válaszok aránya (0-1)")
+    parser.add_argument("--throttle-rate", type=float, default=0, help="Véletlen 429 válaszok aránya (0-1)")
+    parser.add_argument("--rate-limit", type=float, default=0, help="Kérés/mp korlát, felette 429 (0 = nincs)")
+    parser.add_argument("--timeout-rate", type=float, default=0, help="Megakadó kérések aránya (0-1)")
+    parser.add_argument("--timeout-seconds", type=float, default=30, help="Megakadó kérés válaszideje (mp)")
+    parser.add_argument("--seed", type=int, default=0, help="A véletlen sorozat magja")
+    return parser.parse_args()
+
+
+def main():
+    import uvicorn
+
+    args = parse_args()
+    faults = FaultModel(
+        latency=args.latency, latency_ms=args.latency_ms, latency_spread=args.latency_spread,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate, rate_limit=args.rate_limit,
+        timeout_rate=args.timeout_rate, timeout_seconds=args.timeout_seconds, seed=args.seed
+    )
+    print(f"🎭 Hamis OpenWeather: http://{args.host}:{args.port}/data/2.5")
+    uvicorn.run(FakeOpenWeather(faults), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
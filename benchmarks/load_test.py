@@ -0,0 +1,361 @@
+"""
+🚦 Terheléses teszt - áteresztőképesség és késleltetés egy backend workerre
+
+asyncio alapú terhelésgenerátor (httpx): `--users` virtuális felhasználó
+zárt hurokban futtatja a választott forgalmi mixet, és végpontonként,
+valamint összesítve jelenti a p50/p95/p99 késleltetést, az
+áteresztőképességet (kérés/mp) és a hibaarányt. A bemelegítés alatti
+kérések nem számítanak bele. A mixek és a városválasztás a `--seed` magból
+determinisztikusak, az eredmény JSON-ként menthető és egy korábbi futással
+összevethető.
+
+Forgalmi mixek:
+- dashboard: a Streamlit nézetek oldalbetöltései (aktuális, előrejelzés,
+  előzmények, statisztika, összehasonlítás) a nézetek valódi kéréseivel
+- core: /api/weather, /api/weather/history és /api/forecast egyenlő arányban
+- weather, history, forecast: egyetlen végpont
+
+`--spawn` esetén a teszt maga indítja a hamis OpenWeather upstreamet
+(benchmarks/fake_upstream.py) és egy egyworkeres backendet friss, feltöltött
+SQLite adatbázissal; egyébként a `--base-url` címen futó backendet terheli.
+
+Futtatás (a repó gyökeréből):
+    python benchmarks/load_test.py --spawn --mix dashboard --users 32 --duration 30 --output run.json
+    python benchmarks/load_test.py --spawn --mix core --users 32 --duration 30 --compare run.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CITIES = ["Budapest", "Debrecen", "Szeged", "Pécs", "Győr", "Miskolc", "Nyíregyháza"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Terheléses teszt a backend ellen")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="A terhelt backend címe")
+    parser.add_argument("--spawn", action="store_true", help="Hamis upstream + backend indítása a teszthez")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="dashboard", help="Forgalmi mix")
+    parser.add_argument("--users", type=int, default=32, help="Párhuzamos virtuális felhasználók")
+    parser.add_argument("--duration", type=float, default=30, help="Mérés hossza (mp)")
+    parser.add_argument("--warmup", type=float, default=5, help="Bemelegítés a mérés előtt (mp)")
+    parser.add_argument("--think-ms", type=float, default=0, help="Várakozás oldalbetöltések között (ms)")
+    parser.add_argument("--conditional", action="store_true",
+                        help="ETag cache felhasználónként, If-None-Match fejléccel (mint a frontend kliens)")
+    parser.add_argument("--timeout", type=float, default=30, help="Kérésenkénti időkorlát (mp)")
+    parser.add_argument("--seed", type=int, default=1, help="A forgalom véletlen magja")
+    parser.add_argument("--seed-rows", type=int, default=100_000, help="--spawn: előre betöltött mérések")
+    parser.add_argument("--upstream-args", default="--latency lognormal --latency-ms 80 --latency-spread 0.5",
+                        help="--spawn: a hamis upstream kapcsolói")
+    parser.add_argument("--port", type=int, default=8765, help="--spawn: backend port (upstream: port+1)")
+    parser.add_argument("--output", help="Eredmények mentése JSON fájlba")
+    parser.add_argument("--compare", help="Korábbi JSON eredmény, amihez viszonyítunk")
+    parser.add_argument("--seed-database", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+# Oldalak: (címke, útvonal, paraméterek) kérések sorrendben; a {city} a felhasználó városa
+def _series_params(city):
+    start = datetime.utcnow() - timedelta(hours=24)
+    return {"city": city, "from": start.replace(second=0, microsecond=0).isoformat(), "points": 300, "method": "minmax"}
+
+
+PAGES = {
+    "current": lambda city: [
+        ("health", "/health", {}),
+        ("weather", "/api/weather", {"city": city}),
+        ("forecast_3d", "/api/forecast", {"city": city, "days": 3}),
+    ],
+    "forecast": lambda city: [
+        ("health", "/health", {}),
+        ("forecast_7d", "/api/forecast", {"city": city, "days": 7}),
+    ],
+    "history": lambda city: [
+        ("health", "/health", {}),
+        ("history_20", "/api/weather/history", {"city": city, "limit": 20}),
+    ],
+    "stats": lambda city: [
+        ("health", "/health", {}),
+        ("stats_24h", "/api/weather/stats", {"city": city, "hours": 24}),
+        ("series_24h", "/api/weather/series", _series_params(city)),
+        ("stats_batch", "/api/weather/stats/batch", {"cities": ",".join(CITIES), "hours": "1,24,168"}),
+    ],
+    "comparison": lambda city: [
+        ("health", "/health", {}),
+        ("weather_batch", "/api/weather/batch", {"cities": ",".join(CITIES)}),
+    ],
+    "weather": lambda city: [("weather", "/api/weather", {"city": city})],
+    "history_only": lambda city: [("history_20", "/api/weather/history", {"city": city, "limit": 20})],
+    "forecast_only": lambda city: [("forecast_7d", "/api/forecast", {"city": city, "days": 7})],
+}
+
+# Mix: oldal → súly
+MIXES = {
+    "dashboard": {"current": 40, "forecast": 20, "history": 15, "stats": 15, "comparison": 10},
+    "core": {"weather": 1, "history_only": 1, "forecast_only": 1},
+    "weather": {"weather": 1},
+    "history": {"history_only": 1},
+    "forecast": {"forecast_only": 1},
+}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class Recorder:
+    """Késleltetések és státuszok címkénként, csak a mérési ablakban"""
+
+    def __init__(self, measure_from: float, measure_until: float):
+        self.measure_from = measure_from
+        self.measure_until = measure_until
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def add(self, label: str, started: float, elapsed: float, status):
+        if self.measure_from <= started < self.measure_until:
+            self.latencies[label].append(elapsed * 1000)
+            self.statuses[label][status] += 1
+
+    def summary(self, duration: float) -> dict:
+        def stats(latencies, statuses):
+            errors = sum(count for status, count in statuses.items() if not isinstance(status, int) or status >= 400)
+            return {
+                "requests": len(latencies),
+                "throughput_rps": round(len(latencies) / duration, 1),
+                "errors": errors,
+                "error_rate": round(errors / len(latencies), 4) if latencies else 0.0,
+                "p50_ms": round(percentile(latencies, 50), 2),
+                "p95_ms": round(percentile(latencies, 95), 2),
+                "p99_ms": round(percentile(latencies, 99), 2),
+                "max_ms": round(max(latencies), 2) if latencies else 0.0,
+                "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)}
+            }
+
+        total_latencies = [value for values in self.latencies.values() for value in values]
+        total_statuses = sum(self.statuses.values(), Counter())
+        return {
+            "total": stats(total_latencies, total_statuses),
+            "endpoints": {label: stats(self.latencies[label], self.statuses[label]) for label in sorted(self.latencies)}
+        }
+
+
+async def virtual_user(client: httpx.AsyncClient, recorder: Recorder, user_id: int, args, deadline: float):
+    """Oldalbetöltések zárt hurokban a mix súlyai szerint"""
+    rng = random.Random(args.seed * 100_003 + user_id)
+    mix = MIXES[args.mix]
+    pages, weights = list(mix), list(mix.values())
+    etags = {}
+
+    while time.perf_counter() < deadline:
+        page = rng.choices(pages, weights)[0]
+        city = rng.choice(CITIES)
+        for label, path, params in PAGES[page](city):
+            headers = {}
+            key = (path, tuple(sorted(params.items())))
+            if args.conditional and key in etags:
+                headers["If-None-Match"] = etags[key]
+
+            started = time.perf_counter()
+            try:
+                response = await client.get(path, params=params, headers=headers)
+                await response.aread()
+                status = response.status_code
+                if args.conditional and "etag" in response.headers:
+                    etags[key] = response.headers["etag"]
+            except httpx.TimeoutException:
+                status = "timeout"
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            recorder.add(label, started, time.perf_counter() - started, status)
+
+        if args.think_ms:
+            await asyncio.sleep(args.think_ms / 1000)
+
+
+async def run_load(args, base_url: str) -> dict:
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        started = time.perf_counter()
+        measure_from = started + args.warmup
+        deadline = measure_from + args.duration
+        recorder = Recorder(measure_from, deadline)
+        await asyncio.gather(*(virtual_user(client, recorder, i, args, deadline) for i in range(args.users)))
+    return recorder.summary(args.duration)
+
+
+def seed_database(database_url: str, rows: int):
+    """Szintetikus előzmények a --spawn backendhez (külön folyamatban fut)"""
+    os.environ["DATABASE_URL"] = database_url
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, BENCH_DIR)
+
+    from bench_suite import seed
+    import backend.main as backend_main
+
+    try:
+        seed(backend_main, rows, CITIES)
+    finally:
+        asyncio.run(backend_main.async_read_engine.dispose())
+
+
+def wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"❌ A folyamat leállt indulás közben: {' '.join(process.args)}")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    sys.exit(f"❌ Nem indult el időben: {url}")
+
+
+def spawn_stack(args, workdir: str) -> tuple:
+    """Hamis upstream + egyworkeres backend indítása; (backend URL, folyamatok)"""
+    upstream_port = args.port + 1
+    database_url = f"sqlite:///{os.path.join(workdir, 'load.db')}"
+    subprocess.run([sys.executable, os.path.abspath(__file__), "--seed-database", database_url,
+                    "--seed-rows", str(args.seed_rows)], check=True, capture_output=True)
+
+    log = open(os.path.join(workdir, "stack.log"), "w")
+    upstream = subprocess.Popen(
+        [sys.executable, os.path.join(BENCH_DIR, "fake_upstream.py"), "--port", str(upstream_port),
+         "--seed", str(args.seed), *args.upstream_args.split()],
+        stdout=log, stderr=subprocess.STDOUT
+    )
+    wait_until_ready(f"http://127.0.0.1:{upstream_port}/_fake/stats", upstream)
+
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "OPENWEATHER_API_KEY": "load-test-key",
+        "OPENWEATHER_BASE_URL": f"http://127.0.0.1:{upstream_port}/data/2.5",
+        "DEFAULT_CITIES": ",".join(CITIES),
+    }
+    backend = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(args.port),
+         "--workers", "1", "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    wait_until_ready(f"{base_url}/health", backend)
+    return base_url, [backend, upstream]
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def print_report(results: dict):
+    print(f"\n{'végpont':<16}{'kérés':>9}{'kérés/mp':>11}{'hiba%':>8}{'p50 (ms)':>11}{'p95 (ms)':>11}{'p99 (ms)':>11}")
+    rows = list(results["endpoints"].items()) + [("ÖSSZESEN", results["total"])]
+    for label, stats in rows:
+        print(f"{label:<16}{stats['requests']:>9}{stats['throughput_rps']:>11.1f}{stats['error_rate'] * 100:>8.2f}"
+              f"{stats['p50_ms']:>11.2f}{stats['p95_ms']:>11.2f}{stats['p99_ms']:>11.2f}")
+
+
+def compare(results: dict, baseline: dict):
+    """Áteresztőképesség és késleltetés változása az alapméréshez képest"""
+    print(f"\nÖsszevetés: {baseline['meta'].get('revision') or '?'} → {results['meta'].get('revision') or '?'}")
+    if baseline["meta"].get("mix") != results["meta"].get("mix") or baseline["meta"].get("users") != results["meta"].get("users"):
+        print("⚠️  Eltérő mix vagy felhasználószám - az összevetés nem egyenértékű")
+    print(f"{'végpont':<16}{'kérés/mp':>12}{'p50':>10}{'p95':>10}{'p99':>10}{'hiba%':>10}")
+    rows = list(results["endpoints"].items()) + [("ÖSSZESEN", results["total"])]
+    for label, stats in rows:
+        before = baseline["total"] if label == "ÖSSZESEN" else baseline["endpoints"].get(label)
+        if not before:
+            continue
+
+        def change(key):
+            return f"{stats[key] / before[key] - 1:+.1%}" if before[key] else "-"
+
+        error_delta = (stats["error_rate"] - before["error_rate"]) * 100
+        print(f"{label:<16}{change('throughput_rps'):>12}{change('p50_ms'):>10}{change('p95_ms'):>10}"
+              f"{change('p99_ms'):>10}{error_delta:>+10.2f}")
+
+
+def main():
+    args = parse_args()
+    if args.seed_database:
+        seed_database(args.seed_database, args.seed_rows)
+        return
+
+    processes = []
+    workdir = tempfile.mkdtemp(prefix="weather-load-")
+    try:
+        base_url = args.base_url
+        if args.spawn:
+            print(f"⏳ Hamis upstream és backend indítása ({args.seed_rows:,} előre betöltött mérés)...")
+            base_url, processes = spawn_stack(args, workdir)
+
+        print(f"🚦 {args.mix} mix, {args.users} felhasználó, {args.warmup:g}+{args.duration:g} mp → {base_url}")
+        results = asyncio.run(run_load(args, base_url))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        "meta": {
+            "revision": git_revision(),
+            "created": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "base_url": base_url,
+            "spawned": args.spawn,
+            "mix": args.mix,
+            "users": args.users,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "think_ms": args.think_ms,
+            "conditional": args.conditional,
+            "seed": args.seed,
+            "upstream_args": args.upstream_args if args.spawn else None
+        },
+        **results
+    }
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Eredmények: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
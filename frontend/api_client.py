@@ -2,14 +2,20 @@
 import requests
 import streamlit as st
 import time
+from datetime import datetime, timedelta
 
 class WeatherAPIClient:
     """Weather API kliens"""
     
+    # Megjegyzett GET válaszok száma (ETag alapú újravalidáláshoz)
+    ETAG_CACHE_SIZE = 256
+    
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url
         self.session = requests.Session()
         self.session.timeout = 10
+        # (URL, paraméterek) → (ETag, utolsó válasz); a kliens a session state-ben él (app.get_api_client)
+        self.etag_cache = {}
         
     def fetch_data(self, endpoint: str, params: dict = None, method: str = "GET"):
         """API hívás a backendhez"""
@@ -17,7 +23,22 @@ class WeatherAPIClient:
             url = f"{self.base_url}{endpoint}"
             
             if method == "GET":
-                response = self.session.get(url, params=params, timeout=10)
+                cache_key = (url, tuple(sorted((params or {}).items())))
+                cached = self.etag_cache.get(cache_key)
+                headers = {"If-None-Match": cached[0]} if cached else None
+                response = self.session.get(url, params=params, headers=headers, timeout=10)
+                
+                # Nem változott: a korábbi választ használjuk, törzs nem jött át
+                if response.status_code == 304 and cached:
+                    return cached[1]
+                etag = response.headers.get("ETag")
+                if response.status_code == 200 and etag:
+                    data = response.json()
+                    self.etag_cache.pop(cache_key, None)
+                    self.etag_cache[cache_key] = (etag, data)
+                    if len(self.etag_cache) > self.ETAG_CACHE_SIZE:
+                        self.etag_cache.pop(next(iter(self.etag_cache)))
+                    return data
             elif method == "POST":
                 response = self.session.post(url, json=params, timeout=10)
             else:
@@ -50,14 +71,45 @@ class WeatherAPIClient:
         """Aktuális időjárás"""
         return self.fetch_data("/api/weather", {"city": city})
     
+    def get_current_weather_batch(self, cities: list):
+        """Több város aktuális időjárása egy kérésben (városonkénti állapottal)"""
+        data = self.fetch_data("/api/weather/batch", {"cities": ",".join(cities)})
+        return data.get('results', []) if data else []
+    
     def get_weather_history(self, city: str, limit: int = 10):
         """Időjárás előzmények"""
         return self.fetch_data("/api/weather/history", {"city": city, "limit": limit})
     
+    def get_weather_series(self, city: str, hours: int = 24, points: int = 300, method: str = "minmax"):
+        """Diagramhoz ritkított idősor az elmúlt `hours` órára (szélsőértékekkel)"""
+        start = datetime.utcnow() - timedelta(hours=hours)
+        return self.fetch_data("/api/weather/series", {
+            "city": city,
+            "from": start.replace(second=0, microsecond=0).isoformat(),
+            "points": points,
+            "method": method
+        })
+    
+    def get_export_url(self, city: str, start=None, end=None, fmt: str = "csv") -> str:
+        """Streamelt előzmény export URL-je (a böngésző közvetlenül a backendről tölti le)"""
+        params = {"city": city, "format": fmt}
+        if start is not None:
+            params["from"] = start.isoformat()
+        if end is not None:
+            params["to"] = end.isoformat()
+        return requests.Request("GET", f"{self.base_url}/api/weather/export", params=params).prepare().url
+    
     def get_weather_stats(self, city: str, hours: int = 24):
         """Statisztikák"""
         return self.fetch_data("/api/weather/stats", {"city": city, "hours": hours})
     
+    def get_weather_stats_batch(self, cities: list, hours: list = (1, 24, 168)):
+        """Statisztika mátrix: több város × több időablak egy kérésben"""
+        return self.fetch_data("/api/weather/stats/batch", {
+            "cities": ",".join(cities),
+            "hours": ",".join(str(h) for h in hours)
+        })
+    
     def get_weather_forecast(self, city: str, days: int = 7):
         """Előrejelzés"""
         return self.fetch_data("/api/forecast", {"city": city, "days": days})
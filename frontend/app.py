@@ -179,6 +179,20 @@ def init_session_state():
         if key not in st.session_state:
             st.session_state[key] = value
 
+def get_api_client():
+    """
+    Munkamenethez kötött API kliens: a Streamlit minden interakciónál újrafuttatja
+    a szkriptet, így az ETag cache és a keep-alive kapcsolatok csak a session
+    state-ben élik túl az újrafuttatást.
+    """
+    client = st.session_state.get('api_client')
+    if client is None:
+        client = WeatherAPIClient(st.session_state.api_url)
+        st.session_state.api_client = client
+    elif client.base_url != st.session_state.api_url:
+        client.base_url = st.session_state.api_url
+    return client
+
 # ============================================
 # 4. OLDALSÁV KOMPONENS (inline, nem importáljuk)
 # ============================================
@@ -355,9 +369,9 @@ def main():
     # Inicializálás
     init_session_state()
     
-    # API kliens létrehozása
+    # API kliens (munkamenetenként egy, az újrafuttatások között megmarad)
     try:
-        api_client = WeatherAPIClient(st.session_state.api_url)
+        api_client = get_api_client()
     except:
         st.error("Nem sikerült létrehozni az API klienst")
         return
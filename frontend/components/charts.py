@@ -27,7 +27,7 @@ def create_temperature_chart(data: list, chart_type: str = "Vonal"):
             fig.add_trace(go.Scatter(
                 x=df['timestamp'],
                 y=df['temperature'],
-                mode='lines+markers',
+                mode='lines+markers' if len(df) <= 100 else 'lines',  # sok pontnál a jelölők csak takarnak
                 name='Hőmérséklet',
                 line=dict(color='#FF6B6B', width=3),
                 marker=dict(size=8, color='#FF6B6B'),
@@ -44,16 +44,12 @@ def display(api_client, cities):
             cities_data = []
             failed_cities = []
             
-            for city in selected_cities:
-                data = api_client.get_current_weather(city)
-                if data:
-                    cities_data.append(data)
+            # Egyetlen csoportos kérés az összes kiválasztott városra
+            for result in api_client.get_current_weather_batch(selected_cities):
+                if result['weather']:
+                    cities_data.append(result['weather'])
                 else:
-                    failed_cities.append(city)
-                    # Próbáljuk meg az előzményekből
-                    history = api_client.get_weather_history(city, 1)
-                    if history and len(history) > 0:
-                        cities_data.append(history[0])
+                    failed_cities.append(result['city'])
             
             if failed_cities:
                 st.warning(f"⚠️ Néhány város adatai nem elérhetők: {', '.join(failed_cities)}")
@@ -1,6 +1,7 @@
 """Időjárás előzmények oldal - Javított"""
 import streamlit as st
 import pandas as pd
+from datetime import datetime, time, timedelta
 
 def display(api_client, cities):
     """Időjárás előzmények megjelenítése"""
@@ -116,6 +117,27 @@ def display(api_client, cities):
             st.error(f"Hiba történt az adatok feldolgozásánál: {str(e)}")
             st.info("Próbáld újra vagy válassz másik várost.")
     
+        # Export - a backend streameli, a Streamlit folyamat nem tartja memóriában
+        with st.expander("📥 Export (CSV / NDJSON)", expanded=False):
+            exp_col1, exp_col2, exp_col3 = st.columns(3)
+            with exp_col1:
+                start_date = st.date_input("Kezdete:", datetime.utcnow().date() - timedelta(days=30), key="export_start")
+            with exp_col2:
+                end_date = st.date_input("Vége:", datetime.utcnow().date(), key="export_end")
+            with exp_col3:
+                export_format = st.selectbox("Formátum:", ["csv", "ndjson"], key="export_format")
+            
+            if start_date > end_date:
+                st.warning("⚠️ A kezdő dátum nem lehet későbbi a záró dátumnál")
+            else:
+                export_url = api_client.get_export_url(
+                    city,
+                    datetime.combine(start_date, time.min),
+                    datetime.combine(end_date + timedelta(days=1), time.min),
+                    export_format
+                )
+                st.link_button("📥 Letöltés", export_url, use_container_width=True)
+    
     else:
         st.warning(f"⚠️ Nincs elég adat {city} városhoz")
         st.info("Használd a '🔄 Frissítés' gombot az oldalsávban több adat gyűjtéséhez.")
\ No newline at end of file
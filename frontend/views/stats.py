@@ -100,9 +100,13 @@ def display(api_client, cities):
         
         # Időbeli változás diagram
         if show_chart:
-            history_data = api_client.get_weather_history(city, min(48, hours*2))
+            # A teljes időablak, a backend által néhány száz pontra ritkítva
+            series = api_client.get_weather_series(city, hours)
+            history_data = series['points'] if series else []
             if history_data and len(history_data) > 1:
                 st.subheader("📈 Időbeli változás")
+                if series['source_points'] > len(history_data):
+                    st.caption(f"{series['source_points']} mérésből {len(history_data)} pont (szélsőértékek megtartva)")
                 
                 df = pd.DataFrame(history_data)
                 df['timestamp'] = pd.to_datetime(df['timestamp'])
@@ -112,7 +116,7 @@ def display(api_client, cities):
                 fig.add_trace(go.Scatter(
                     x=df['timestamp'],
                     y=df['temperature'],
-                    mode='lines+markers',
+                    mode='lines+markers' if len(df) <= 100 else 'lines',
                     name='Hőmérséklet',
                     line=dict(color='#FF6B6B', width=2)
                 ))
@@ -143,4 +147,29 @@ def display(api_client, cities):
     
     else:
         st.error(f"❌ Nincs elég adat {city} városhoz az elmúlt {hours} órában")
-        st.info("Várj, hogy a scheduler gyűjtsön több adatot.")
\ No newline at end of file
+        st.info("Várj, hogy a scheduler gyűjtsön több adatot.")
+    
+    # Összes város, több időablak - egyetlen kérés
+    st.subheader("🏙️ Városok összesítve")
+    windows = [1, 24, 168]
+    matrix_cities = cities[:20]  # a backend egy kérésben legfeljebb 20 várost fogad
+    
+    # Minden megjelenítéskor lekérjük, hogy friss maradjon (egyetlen összesítő lekérdezés)
+    matrix = None
+    if matrix_cities:
+        with st.spinner("Összesített statisztikák betöltése..."):
+            matrix = api_client.get_weather_stats_batch(matrix_cities, windows)
+    
+    if matrix:
+        rows = []
+        for matrix_city in matrix['cities']:
+            row = {'🏙️ Város': matrix_city}
+            for window in matrix['hours']:
+                cell = matrix['stats'][matrix_city].get(str(window))
+                label = f"{window} óra" if window < 24 else f"{window // 24} nap"
+                row[f"🌡️ Átlag ({label})"] = f"{cell['avg_temperature']:.1f}°C" if cell else "N/A"
+                row[f"↕️ Min/Max ({label})"] = (
+                    f"{cell['min_temperature']:.1f} / {cell['max_temperature']:.1f}°C" if cell else "N/A"
+                )
+            rows.append(row)
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
@@ -0,0 +1,13 @@
+"""
+Közös teszt beállítások
+"""
+import os
+import tempfile
+
+# A backend modulok importálásakor jön létre az adatbázis, ezért a teszteknél
+# ideiglenes fájlt használunk a munkakönyvtárbeli weather.db helyett
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='weather-tests-'), 'weather.db')}"
+)
+os.environ.setdefault("OPENWEATHER_API_KEY", "test-key")
@@ -42,4 +42,19 @@ def test_fetch_data_failure(mock_get):
     client = WeatherAPIClient("http://test.api")
     result = client.fetch_data("/test")
     
-    assert result is None
\ No newline at end of file
+    assert result is None
+@patch('requests.Session.get')
+def test_fetch_data_revalidates_with_etag(mock_get):
+    """Második kérésnél If-None-Match megy, 304-re a korábbi törzs jön vissza"""
+    first = Mock(status_code=200, headers={"ETag": 'W/"abc"'})
+    first.json.return_value = {"city": "Budapest", "temperature": 21.5}
+    not_modified = Mock(status_code=304, headers={"ETag": 'W/"abc"'})
+    mock_get.side_effect = [first, not_modified]
+    
+    client = WeatherAPIClient("http://test.api")
+    assert client.fetch_data("/api/weather", {"city": "Budapest"}) == {"city": "Budapest", "temperature": 21.5}
+    assert mock_get.call_args.kwargs["headers"] is None
+    
+    assert client.fetch_data("/api/weather", {"city": "Budapest"}) == {"city": "Budapest", "temperature": 21.5}
+    assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": 'W/"abc"'}
+    not_modified.json.assert_not_called()
@@ -0,0 +1,117 @@
+"""
+Csoportos (/group) adatgyűjtés tesztelése hamis upstreammel
+"""
+import json
+from unittest.mock import patch
+from urllib.parse import urlparse, parse_qs
+
+import requests
+from requests.adapters import BaseAdapter
+
+import backend.main as backend_main
+from backend.scheduler import WeatherScheduler
+from backend.upstream import UpstreamClient
+
+CITIES = [f"Csoportváros{i}" for i in range(25)]
+
+
+class FakeOpenWeatherAdapter(BaseAdapter):
+    """Helyi hamis OpenWeather: /weather és /group végpontok szintetikus városokkal"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+        self.group_status = 200
+        self.group_omit = set()
+
+    def _city_payload(self, city_id: int) -> dict:
+        return {
+            "id": city_id,
+            "name": CITIES[city_id - 1000],
+            "main": {"temp": 15.0 + city_id % 7, "humidity": 55, "pressure": 1012},
+            "wind": {"speed": 3.1},
+            "weather": [{"description": "szórványos felhőzet", "icon": "03d"}]
+        }
+
+    def send(self, request, **kwargs):
+        url = urlparse(request.url)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        endpoint = url.path.rsplit("/", 1)[-1]
+        self.calls.append(endpoint)
+
+        if endpoint == "weather":
+            body = self._city_payload(1000 + CITIES.index(params["q"]))
+        elif endpoint == "group":
+            ids = [int(i) for i in params["id"].split(",")]
+            assert len(ids) <= 20
+            items = [self._city_payload(i) for i in ids if CITIES[i - 1000] not in self.group_omit]
+            body = {"cnt": len(items), "list": items}
+        else:
+            body = {}
+
+        response = requests.Response()
+        response.status_code = (self.group_status if endpoint == "group" else 200) if body else 404
+        response._content = json.dumps(body).encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def _setup(saved: list):
+    adapter = FakeOpenWeatherAdapter()
+    client = UpstreamClient(base_url="http://fake-openweather/data/2.5", api_key="test")
+    client.session.mount("http://", adapter)
+    scheduler = WeatherScheduler(
+        fetch_weather_func=backend_main.fetch_weather_from_api,
+        save_weather_batch_func=lambda rows: saved.extend(rows) or len(rows),
+        fetch_weather_batch_func=backend_main.fetch_weather_batch_from_api,
+        batch_size=20,
+        max_workers=2
+    )
+    return adapter, client, scheduler
+
+
+def test_batched_scheduler_cycle_uses_group_endpoint():
+    """25 város → első ciklusban a feloldó hívások mérései, utána 2 csoportos hívás"""
+    saved = []
+    adapter, client, scheduler = _setup(saved)
+
+    with patch.object(backend_main, "upstream", client), \
+            patch("backend.scheduler.config.DEFAULT_CITIES", CITIES):
+        first = scheduler.scheduled_update()
+        # Első ciklus: azonosítók feloldása, a mérést nem kérjük le újra csoportosan
+        assert adapter.calls == ["weather"] * len(CITIES)
+
+        adapter.calls.clear()
+        second = scheduler.scheduled_update()
+
+    assert adapter.calls == ["group", "group"]
+    assert first["success_count"] == second["success_count"] == len(CITIES)
+    assert {data["city"] for data in saved} == set(CITIES)
+
+
+def test_failed_group_call_does_not_fan_out():
+    """Sikertelen csoportos hívásnál nincs városonkénti újrapróbálás; a kimaradt városok igen"""
+    saved = []
+    adapter, client, scheduler = _setup(saved)
+
+    with patch.object(backend_main, "upstream", client), \
+            patch("backend.scheduler.config.DEFAULT_CITIES", CITIES):
+        scheduler.scheduled_update()  # azonosítók feloldása
+
+        adapter.calls.clear()
+        adapter.group_status = 429
+        cycle = scheduler.scheduled_update()
+        assert adapter.calls == ["group", "group"]
+        assert cycle["success_count"] == 0
+
+        adapter.calls.clear()
+        adapter.group_status = 200
+        adapter.group_omit = {CITIES[0], CITIES[21]}
+        cycle = scheduler.scheduled_update()
+
+    assert sorted(adapter.calls) == ["group", "group", "weather", "weather"]
+    assert cycle["success_count"] == len(CITIES)
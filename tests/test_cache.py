@@ -0,0 +1,95 @@
+"""
+Gyorsítótárak tesztelése
+"""
+from datetime import datetime
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+from backend.cache import TTLCache, normalize_city
+import backend.main as backend_main
+
+
+def test_ttl_cache_expiry_and_counters():
+    """Lejárat és találat/hiány számlálók"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+    with patch("backend.cache.time.monotonic", return_value=10 ** 9):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_lru_eviction():
+    """A legrégebben használt bejegyzés esik ki"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_normalize_city():
+    """Kis/nagybetű és szóközök nem számítanak"""
+    assert normalize_city("  New   York ") == normalize_city("new york")
+
+
+def _forecast(days: int = 5):
+    daily = [
+        backend_main.DailyForecast(
+            date=f"2024-01-0{i + 1}", day_temp=5, night_temp=1, min_temp=0, max_temp=6,
+            humidity=70, pressure=1010, wind_speed=3, description="felhős", icon="04d", pop=10
+        )
+        for i in range(days)
+    ]
+    return backend_main.ForecastResponse(
+        city="Budapest", country="HU", forecasts=daily, last_update=datetime.utcnow()
+    )
+
+
+def test_forecast_endpoint_uses_cache():
+    """Különböző `days` értékek ugyanabból a cache bejegyzésből szeletelnek"""
+    backend_main.forecast_cache.clear()
+    client = TestClient(backend_main.app)
+
+    with patch.object(backend_main, "fetch_forecast_from_api", return_value=_forecast()) as fetch:
+        three = client.get("/api/forecast", params={"city": "Budapest", "days": 3})
+        full = client.get("/api/forecast", params={"city": "budapest", "days": 7})
+
+    assert fetch.call_count == 1
+    assert len(three.json()["forecasts"]) == 3
+    assert len(full.json()["forecasts"]) == 5
+    assert backend_main.forecast_cache.stats()["hits"] == 1
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    """Párhuzamos hívásokból egyetlen futás lesz, mindenki ugyanazt kapja"""
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from backend.cache import SingleFlight
+
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"city": "Budapest"}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(flights.do, "budapest", slow_fetch) for _ in range(8)]
+        while flights.in_flight() == 0:
+            pass
+        threading.Timer(0.2, release.set).start()
+        results = [f.result(timeout=5) for f in futures]
+
+    assert len(calls) == 1
+    assert all(r == {"city": "Budapest"} for r in results)
+    assert flights.in_flight() == 0
@@ -0,0 +1,71 @@
+"""
+Válasz tömörítés tesztelése
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend.compression import CompressionMiddleware, parse_accept_encoding, brotli
+
+PAYLOAD = [{"city": "Budapest", "temperature": 20.5 + i, "description": "derült ég"} for i in range(200)]
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+
+@app.get("/big")
+def big():
+    return PAYLOAD
+
+
+@app.get("/small")
+def small():
+    return {"ok": True}
+
+
+@app.get("/png")
+def png():
+    return PlainTextResponse("x" * 5000, media_type="image/png")
+
+
+@app.get("/stream")
+def stream():
+    return StreamingResponse((f'{{"n": {i}}}\n' for i in range(500)), media_type="application/x-ndjson")
+
+
+client = TestClient(app)
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip;q=0.5, br, identity;q=0") == {"gzip": 0.5, "br": 1.0, "identity": 0.0}
+
+
+def test_gzip_above_threshold():
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == PAYLOAD
+
+
+@pytest.mark.skipif(brotli is None, reason="brotli nincs telepítve")
+def test_brotli_preferred_when_accepted():
+    response = client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.json() == PAYLOAD
+
+
+def test_no_compression_below_threshold_or_for_binary_or_identity():
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/png", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "gzip;q=0"}).headers
+
+
+def test_streaming_response_compressed_incrementally():
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    lines = response.text.splitlines()
+    assert len(lines) == 500 and lines[-1] == '{"n": 499}'
@@ -0,0 +1,63 @@
+"""
+Adatbázis engine és SQLite profilok tesztelése
+"""
+import pytest
+from sqlalchemy import text
+
+from backend.database import create_db_engine
+
+
+def _pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_performance_profile_applies_pragmas(tmp_path):
+    """A performance profil WAL módot és NORMAL szinkront állít be"""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'perf.db'}", "performance")
+    assert _pragma(engine, "journal_mode") == "wal"
+    assert _pragma(engine, "synchronous") == 1  # NORMAL
+    assert _pragma(engine, "busy_timeout") == 5000
+
+
+def test_default_profile_keeps_sqlite_defaults(tmp_path):
+    """A default profil nem módosít semmit"""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'default.db'}", "default")
+    assert _pragma(engine, "journal_mode") == "delete"
+
+
+def test_unknown_profile_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        create_db_engine(f"sqlite:///{tmp_path / 'x.db'}", "turbo")
+
+
+def test_async_url_conversion():
+    from backend.database import to_async_url
+    assert to_async_url("sqlite:///./weather.db") == "sqlite+aiosqlite:///./weather.db"
+    assert to_async_url("postgres://u:p@host/db") == "postgresql+asyncpg://u:p@host/db"
+    with pytest.raises(ValueError):
+        to_async_url("mysql://u:p@host/db")
+
+
+def test_async_read_only_engine(tmp_path):
+    """Az async olvasó engine a profil PRAGMA-it kapja, és nem írhat"""
+    import asyncio
+    from sqlalchemy.exc import OperationalError
+
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    with create_db_engine(url).begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+
+    async def check():
+        engine = create_db_engine(url, read_only=True, use_async=True)
+        try:
+            async with engine.connect() as conn:
+                assert (await conn.execute(text("SELECT x FROM t"))).scalar() == 1
+                assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar() == 5000
+                with pytest.raises(OperationalError):
+                    await conn.execute(text("INSERT INTO t VALUES (2)"))
+        finally:
+            await engine.dispose()
+
+    asyncio.run(check())
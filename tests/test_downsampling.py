@@ -0,0 +1,45 @@
+"""
+Idősor ritkítás tesztelése
+"""
+import numpy as np
+import pytest
+
+from backend.downsampling import downsample
+
+
+@pytest.fixture
+def series():
+    n = 20_000
+    rng = np.random.default_rng(5)
+    timestamps = np.datetime64("2024-01-01T00:00") + np.arange(n).astype("timedelta64[m]")
+    values = np.sin(np.arange(n) / 400) * 10 + rng.normal(0, 0.5, n)
+    values[4321] = 40    # kiugró maximum
+    values[15000] = -30  # kiugró minimum
+    return timestamps, values
+
+
+@pytest.mark.parametrize("method", ["minmax", "lttb"])
+def test_downsample_keeps_extremes_and_order(series, method):
+    timestamps, values = series
+    selected = downsample(timestamps, values, 300, method)
+
+    assert len(selected) <= 300
+    assert np.all(np.diff(selected) > 0)
+    assert 4321 in selected and 15000 in selected
+
+
+def test_minmax_bucket_extremes(series):
+    """Minden időrekesz minimuma és maximuma benne van"""
+    timestamps, values = series
+    selected = set(downsample(timestamps, values, 200, "minmax").tolist())
+    # Egyenletes mintavételnél az időrekeszek azonos elemszámúak
+    for bucket in np.array_split(np.arange(len(values)), 100):
+        assert int(bucket[np.argmax(values[bucket])]) in selected
+        assert int(bucket[np.argmin(values[bucket])]) in selected
+
+
+def test_short_series_returned_unchanged():
+    timestamps = np.array(["2024-01-01T00:00", "2024-01-01T01:00"], dtype="datetime64[m]")
+    assert downsample(timestamps, [1.0, 2.0], 300).tolist() == [0, 1]
+    with pytest.raises(ValueError):
+        downsample(timestamps, [1.0, 2.0], 300, "average")
@@ -0,0 +1,260 @@
+"""
+API végpontok tesztelése
+"""
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import pytest
+from fastapi.testclient import TestClient
+
+import backend.main as backend_main
+
+SOFT_MAX_AGE = backend_main.config.WEATHER_SOFT_MAX_AGE
+
+
+def _weather(city: str, age_seconds: float = 0, temperature: float = 20.0):
+    return {
+        "city": city,
+        "temperature": temperature,
+        "humidity": 60,
+        "pressure": 1013,
+        "wind_speed": 2.5,
+        "description": "derült ég",
+        "icon": "01d",
+        "timestamp": datetime.utcnow() - timedelta(seconds=age_seconds)
+    }
+
+
+@pytest.fixture
+def client():
+    return TestClient(backend_main.app)
+
+
+def test_fresh_record_served_without_upstream(client):
+    """Friss rekordnál nincs upstream hívás"""
+    backend_main.save_weather_to_db(_weather("Frisstelep"))
+
+    with patch.object(backend_main, "fetch_weather_from_api") as fetch:
+        response = client.get("/api/weather", params={"city": "Frisstelep"})
+
+    assert response.status_code == 200
+    assert "X-Data-Stale" not in response.headers
+    fetch.assert_not_called()
+
+
+def test_stale_record_served_and_revalidated(client):
+    """Soft és hard max-age között az elavult rekord jön vissza, háttérfrissítéssel"""
+    backend_main.save_weather_to_db(_weather("Elavultfalva", age_seconds=SOFT_MAX_AGE + 60, temperature=10))
+
+    with patch.object(backend_main, "fetch_weather_from_api",
+                      return_value=_weather("Elavultfalva", temperature=25)) as fetch:
+        response = client.get("/api/weather", params={"city": "Elavultfalva"})
+
+    assert response.status_code == 200
+    assert response.json()["temperature"] == 10
+    assert response.headers["X-Data-Stale"] == "true"
+    assert int(response.headers["Age"]) >= SOFT_MAX_AGE
+    fetch.assert_called_once_with("Elavultfalva")
+
+    # A háttérfrissítés után már a friss adat jön
+    response = client.get("/api/weather", params={"city": "Elavultfalva"})
+    assert response.json()["temperature"] == 25
+    assert "X-Data-Stale" not in response.headers
+
+
+def test_too_old_record_blocks_on_refresh(client):
+    """Hard max-age felett blokkoló frissítés történik"""
+    backend_main.save_weather_to_db(
+        _weather("Reghaza", age_seconds=backend_main.config.WEATHER_HARD_MAX_AGE + 60, temperature=10)
+    )
+
+    with patch.object(backend_main, "fetch_weather_from_api",
+                      return_value=_weather("Reghaza", temperature=30)):
+        response = client.get("/api/weather", params={"city": "Reghaza"})
+
+    assert response.json()["temperature"] == 30
+    assert "X-Data-Stale" not in response.headers
+
+
+def test_cache_miss_fetches_and_refresh_endpoint_intact(client):
+    """Ismeretlen városnál upstream frissítés, és a /api/refresh kezelőt nem takarja el a segédfüggvény"""
+    with patch.object(backend_main, "fetch_weather_from_api",
+                      return_value=_weather("Hianyzofalu", temperature=17)) as fetch:
+        response = client.get("/api/weather", params={"city": "Hianyzofalu"})
+
+    assert response.status_code == 200
+    assert response.json()["temperature"] == 17
+    fetch.assert_called_once_with("Hianyzofalu")
+
+    with patch.object(backend_main.scheduler, "manual_refresh") as manual_refresh:
+        assert client.post("/api/refresh").status_code == 200
+    manual_refresh.assert_called_once_with()
+
+
+def test_latest_weather_table_keeps_newest(client):
+    """A latest_weather táblát régebbi mérés nem írja felül, a városlista onnan jön"""
+    backend_main.save_weather_batch_to_db([
+        _weather("Legujabbvar", age_seconds=30, temperature=18),
+        _weather("Legujabbvar", age_seconds=10, temperature=19),
+    ])
+    backend_main.save_weather_to_db(_weather("Legujabbvar", age_seconds=3000, temperature=5))
+
+    db = backend_main.SessionLocal()
+    try:
+        assert backend_main.get_latest_weather(db, "Legujabbvar").temperature == 19
+    finally:
+        db.close()
+
+    assert "Legujabbvar" in client.get("/api/cities").json()["cities"]
+
+
+def test_history_and_stats_endpoints_async_path(client):
+    """Az async végpontok ugyanazt adják, mint a szinkron CRUD függvények"""
+    backend_main.save_weather_batch_to_db([
+        _weather("Aszinkronfalva", age_seconds=120 * i, temperature=10 + i) for i in range(5)
+    ])
+
+    history = client.get("/api/weather/history", params={"city": "Aszinkronfalva", "limit": 3}).json()
+    assert [item["temperature"] for item in history] == [10, 11, 12]
+
+    stats = client.get("/api/weather/stats", params={"city": "Aszinkronfalva", "hours": 1}).json()
+    db = backend_main.SessionLocal()
+    try:
+        assert stats == backend_main.get_weather_stats(db, "Aszinkronfalva", 1).model_dump(mode="json")
+    finally:
+        db.close()
+    assert stats["record_count"] == 5
+
+
+def test_batch_endpoint_reports_status_per_city(client):
+    """Egy kérés: friss, elavult (háttérfrissítéssel), frissített és ismeretlen város"""
+    backend_main.save_weather_batch_to_db([
+        _weather("Csoportfriss", temperature=11),
+        _weather("Csoportelavult", age_seconds=SOFT_MAX_AGE + 60, temperature=12),
+    ])
+    upstream_data = {
+        "Csoportelavult": _weather("Csoportelavult", temperature=22),
+        "Csoportuj": _weather("Csoportuj", temperature=23),
+    }
+
+    with patch.object(backend_main, "fetch_weather_from_api", side_effect=upstream_data.get) as fetch:
+        response = client.get("/api/weather/batch",
+                              params={"cities": "Csoportfriss, Csoportelavult,Csoportuj,Nincsilyen,Csoportfriss"})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(r["city"], r["status"]) for r in results] == [
+        ("Csoportfriss", "fresh"),
+        ("Csoportelavult", "stale"),
+        ("Csoportuj", "refreshed"),
+        ("Nincsilyen", "not_found"),
+    ]
+    assert results[1]["weather"]["temperature"] == 12
+    assert results[2]["weather"]["temperature"] == 23
+    assert results[3]["weather"] is None
+    assert sorted(call.args[0] for call in fetch.call_args_list) == ["Csoportelavult", "Csoportuj", "Nincsilyen"]
+
+
+def test_batch_endpoint_limits_city_count(client):
+    cities = ",".join(f"Varos{i}" for i in range(backend_main.config.WEATHER_BATCH_MAX_CITIES + 1))
+    assert client.get("/api/weather/batch", params={"cities": cities}).status_code == 400
+    assert client.get("/api/weather/batch", params={"cities": " , "}).status_code == 400
+
+
+def test_stats_batch_endpoint_returns_matrix(client):
+    backend_main.save_weather_batch_to_db([
+        _weather("Matrixváros", age_seconds=600 * i, temperature=10 + i) for i in range(12)
+    ])
+
+    response = client.get("/api/weather/stats/batch",
+                          params={"cities": "Matrixváros,Üresváros", "hours": "1,24"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["hours"] == [1, 24]
+    assert body["stats"]["Matrixváros"]["24"]["record_count"] == 12
+    assert body["stats"]["Matrixváros"]["1"]["record_count"] < 12
+    assert body["stats"]["Üresváros"] == {"1": None, "24": None}
+    assert client.get("/api/weather/stats/batch",
+                      params={"cities": "Matrixváros", "hours": "1,x"}).status_code == 400
+
+
+def test_history_time_range_and_keyset_pagination(client):
+    """from/to tartomány és kurzoros lapozás: minden sor pontosan egyszer, azonos időbélyegnél is"""
+    now = datetime.utcnow()
+    readings = [_weather("Lapozóváros", age_seconds=60 * i, temperature=i) for i in range(25)]
+    # Két mérés azonos időbélyeggel, hogy a (timestamp, id) kulcs is le legyen fedve
+    readings.append({**readings[10], "temperature": 100})
+    backend_main.save_weather_batch_to_db(readings)
+
+    params = {
+        "city": "Lapozóváros", "limit": 4,
+        "from": (now - timedelta(minutes=20, seconds=30)).isoformat(),
+        "to": (now - timedelta(minutes=2, seconds=30)).isoformat(),
+    }
+    pages, cursor = [], None
+    while True:
+        response = client.get("/api/weather/history", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        assert 'rel="next"' in response.headers["Link"]
+
+    temperatures = [item["temperature"] for page in pages for item in page]
+    assert all(len(page) == 4 for page in pages[:-1])
+    assert sorted(temperatures) == sorted(list(range(3, 21)) + [100])
+    timestamps = [item["timestamp"] for page in pages for item in page]
+    assert timestamps == sorted(timestamps, reverse=True)
+
+
+def test_history_rejects_bad_cursor_and_range(client):
+    assert client.get("/api/weather/history", params={"city": "X", "cursor": "???"}).status_code == 400
+    assert client.get("/api/weather/history", params={
+        "city": "X", "from": "2024-01-02T00:00:00", "to": "2024-01-01T00:00:00"
+    }).status_code == 400
+
+
+def test_export_streams_ndjson_and_csv_in_chunks(client):
+    """Az export időrendben, darabokban érkezik; a tartomány a from/to szerint szűr"""
+    import csv
+    import io
+    import json
+
+    now = datetime.utcnow()
+    backend_main.save_weather_batch_to_db([
+        _weather("Exportváros", age_seconds=60 * i, temperature=i) for i in range(10)
+    ])
+    params = {"city": "Exportváros", "from": (now - timedelta(minutes=7, seconds=30)).isoformat()}
+
+    with patch.object(backend_main.config, "EXPORT_CHUNK_SIZE", 3):
+        ndjson = client.get("/api/weather/export", params=params)
+        exported_csv = client.get("/api/weather/export", params={**params, "format": "csv"})
+
+    assert ndjson.headers["content-type"] == "application/x-ndjson"
+    assert "attachment" in ndjson.headers["content-disposition"]
+    rows = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert [row["temperature"] for row in rows] == [7, 6, 5, 4, 3, 2, 1, 0]
+    assert rows[0]["city"] == "Exportváros"
+
+    reader = list(csv.DictReader(io.StringIO(exported_csv.text)))
+    assert [float(row["temperature"]) for row in reader] == [7, 6, 5, 4, 3, 2, 1, 0]
+    assert client.get("/api/weather/export", params={"city": "X", "format": "xml"}).status_code == 422
+
+
+def test_series_endpoint_downsamples_long_range(client):
+    """Hosszú tartományból legfeljebb `points` pont jön, a szélsőértékekkel együtt"""
+    readings = [_weather("Idősorváros", age_seconds=600 * i, temperature=(i % 50) / 10) for i in range(1000)]
+    readings[500]["temperature"] = 45.0
+    backend_main.save_weather_batch_to_db(readings)
+
+    since = (datetime.utcnow() - timedelta(days=8)).isoformat()
+    for method in ("minmax", "lttb"):
+        body = client.get("/api/weather/series", params={
+            "city": "Idősorváros", "from": since, "points": 100, "method": method
+        }).json()
+        assert body["source_points"] == 1000
+        assert len(body["points"]) <= 100
+        assert max(point["temperature"] for point in body["points"]) == 45.0
+        timestamps = [point["timestamp"] for point in body["points"]]
+        assert timestamps == sorted(timestamps)
@@ -0,0 +1,74 @@
+"""
+Hamis OpenWeather upstream (benchmarks/fake_upstream.py) tesztelése
+"""
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from fake_upstream import FakeOpenWeather, FaultModel, install  # noqa: E402
+from backend.main import parse_weather_payload, process_forecast_data  # noqa: E402
+from backend.upstream import UpstreamClient  # noqa: E402
+
+
+def test_adapter_serves_backend_payloads():
+    client = UpstreamClient(base_url="http://fake.local/data/2.5", api_key="abc")
+    adapter = install(client)
+
+    weather = client.get("/weather", params={"q": "Kecskemét"})
+    assert weather.status_code == 200
+    assert parse_weather_payload(weather.json())["city"] == "Kecskemét"
+
+    forecast = process_forecast_data(client.get("/forecast", params={"q": "Kecskemét", "cnt": 40}).json())
+    assert forecast.city == "Kecskemét" and forecast.forecasts
+
+    group = client.get("/group", params={"id": str(weather.json()["id"])}).json()
+    assert [item["name"] for item in group["list"]] == ["Kecskemét"]
+    assert adapter.calls == 3
+
+
+def test_adapter_timeout_and_errors():
+    client = UpstreamClient(base_url="http://fake.local/data/2.5", api_key="abc")
+    install(client, FaultModel(timeout_rate=1, timeout_seconds=5))
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        client.get("/weather", params={"q": "Budapest"}, timeout=0.01)
+
+    install(client, FaultModel(error_rate=1))
+    assert client.get("/weather", params={"q": "Budapest"}).status_code in (500, 502, 503)
+
+
+def test_fault_model_is_reproducible():
+    def statuses(seed):
+        model = FaultModel(latency="lognormal", latency_ms=50, latency_spread=0.5,
+                           error_rate=0.2, throttle_rate=0.2, seed=seed)
+        return [model.decide() for _ in range(50)]
+
+    assert statuses(3) == statuses(3)
+    assert {status for _, status in statuses(3)} >= {None, 429}
+
+
+def test_rate_limit_returns_429():
+    model = FaultModel(rate_limit=2)
+    assert [model.decide()[1] for _ in range(3)] == [None, None, 429]
+
+
+def test_asgi_app_statuses_and_stats():
+    app = FakeOpenWeather(FaultModel(throttle_rate=0.5, seed=1))
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://fake") as client:
+            responses = [await client.get("/data/2.5/weather", params={"q": "Eger"}) for _ in range(20)]
+            stats = (await client.get("/_fake/stats")).json()
+        return responses, stats
+
+    responses, stats = asyncio.run(run())
+    throttled = [r for r in responses if r.status_code == 429]
+    assert throttled and all(r.headers["retry-after"] == "1" for r in throttled)
+    assert all(r.json()["name"] == "Eger" for r in responses if r.status_code == 200)
+    assert stats == {"weather 200": 20 - len(throttled), "weather 429": len(throttled)}
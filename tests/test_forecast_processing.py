@@ -0,0 +1,212 @@
+"""
+Előrejelzés feldolgozás tesztelése - arany kimenet a korábbi, listás implementációval
+"""
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.main import (
+    DailyForecast, ForecastResponse, process_forecast_batch, process_forecast_data
+)
+
+DESCRIPTIONS = ["derült ég", "enyhén felhős", "borult égbolt", "gyenge eső"]
+ICONS = ["01d", "02d", "04d", "10d", "01n"]
+
+
+def legacy_process_forecast_data(data: dict):
+    """A korábbi implementáció változatlan másolata (arany referencia)"""
+    try:
+        city = data["city"]["name"]
+        country = data["city"]["country"]
+
+        # Csoportosítás dátum szerint
+        daily_data = {}
+
+        for forecast in data["list"]:
+            # Konvertálás UTC időből
+            dt = datetime.fromtimestamp(forecast["dt"])
+            date_str = dt.strftime("%Y-%m-%d")
+            hour = dt.hour
+
+            if date_str not in daily_data:
+                daily_data[date_str] = {
+                    "day_temps": [],   # 9-18 óra
+                    "night_temps": [], # 21-6 óra
+                    "temps": [],
+                    "humidities": [],
+                    "pressures": [],
+                    "wind_speeds": [],
+                    "descriptions": [],
+                    "icons": [],
+                    "pops": []
+                }
+
+            daily_data[date_str]["temps"].append(forecast["main"]["temp"])
+            daily_data[date_str]["humidities"].append(forecast["main"]["humidity"])
+            daily_data[date_str]["pressures"].append(forecast["main"]["pressure"])
+            daily_data[date_str]["wind_speeds"].append(forecast["wind"]["speed"])
+            daily_data[date_str]["descriptions"].append(forecast["weather"][0]["description"])
+            daily_data[date_str]["icons"].append(forecast["weather"][0]["icon"])
+            daily_data[date_str]["pops"].append(forecast.get("pop", 0))
+
+            # Nappali/éjszakai hőmérséklet elkülönítése
+            if 9 <= hour <= 18:
+                daily_data[date_str]["day_temps"].append(forecast["main"]["temp"])
+            elif hour <= 6 or hour >= 21:
+                daily_data[date_str]["night_temps"].append(forecast["main"]["temp"])
+
+        # Napi előrejelzések létrehozása
+        forecasts = []
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        # Csak jövőbeli napok (ma és utána)
+        future_dates = [date for date in daily_data.keys() if date >= today]
+        future_dates.sort()
+
+        for date_str in future_dates[:7]:  # Maximum 7 nap
+            values = daily_data[date_str]
+
+            # Ha nincs nappali/éjszakai adat, használjuk az átlagot
+            avg_day_temp = sum(values["day_temps"])/len(values["day_temps"]) if values["day_temps"] else sum(values["temps"])/len(values["temps"])
+            avg_night_temp = sum(values["night_temps"])/len(values["night_temps"]) if values["night_temps"] else sum(values["temps"])/len(values["temps"])
+
+            # Leggyakorbbi leírás és ikon
+            most_common_desc = max(set(values["descriptions"]), key=values["descriptions"].count)
+            most_common_icon = max(set(values["icons"]), key=values["icons"].count)
+
+            forecasts.append(DailyForecast(
+                date=date_str,
+                day_temp=round(avg_day_temp, 1),
+                night_temp=round(avg_night_temp, 1),
+                min_temp=round(min(values["temps"]), 1),
+                max_temp=round(max(values["temps"]), 1),
+                humidity=round(sum(values["humidities"])/len(values["humidities"])),
+                pressure=round(sum(values["pressures"])/len(values["pressures"])),
+                wind_speed=round(sum(values["wind_speeds"])/len(values["wind_speeds"]), 1),
+                description=most_common_desc,
+                icon=most_common_icon,
+                pop=round(max(values["pops"]) * 100)  # Százalékban
+            ))
+
+        return ForecastResponse(
+            city=city,
+            country=country,
+            forecasts=forecasts,
+            last_update=datetime.utcnow()
+        )
+
+    except Exception as e:
+        return None
+
+
+def make_payload(seed: int, slots: int = 40, start: datetime = None, int_values: bool = False) -> dict:
+    """OpenWeather /forecast jellegű adat: 3 órás mérések a megadott kezdettől"""
+    rng = random.Random(seed)
+    if start is None:
+        start = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=rng.randint(0, 6))
+    entries = []
+    for i in range(slots):
+        temp = rng.randint(-10, 35) if int_values else round(rng.uniform(-10, 35), 2)
+        entry = {
+            "dt": int((start + timedelta(hours=3 * i)).timestamp()),
+            "main": {
+                "temp": temp,
+                "humidity": rng.randint(20, 100),
+                "pressure": rng.randint(990, 1030)
+            },
+            "wind": {"speed": rng.randint(0, 12) if int_values else round(rng.uniform(0, 15), 2)},
+            "weather": [{"description": rng.choice(DESCRIPTIONS), "icon": rng.choice(ICONS)}]
+        }
+        if rng.random() < 0.8:
+            entry["pop"] = rng.choice([0, 0.07, 0.35, 1, round(rng.random(), 2)])
+        entries.append(entry)
+    return {"city": {"name": f"Város{seed}", "country": "HU"}, "list": entries}
+
+
+def assert_same_forecast(new: ForecastResponse, old: ForecastResponse, payload: dict):
+    """Mezőnként azonos kimenet; a leggyakoribb leírás/ikon holtversenyénél bármelyik élen álló elfogadott"""
+    assert (new.city, new.country) == (old.city, old.country)
+    assert len(new.forecasts) == len(old.forecasts)
+
+    for new_day, old_day in zip(new.forecasts, old.forecasts):
+        new_fields = new_day.model_dump(mode="json")
+        old_fields = old_day.model_dump(mode="json")
+        for field in ("description", "icon"):
+            counts = Counter(
+                entry["weather"][0][field] for entry in payload["list"]
+                if datetime.fromtimestamp(entry["dt"]).strftime("%Y-%m-%d") == new_day.date
+            )
+            assert counts[new_fields.pop(field)] == counts[old_fields.pop(field)] == max(counts.values())
+        assert new_fields == old_fields
+        # A JSON kimenet típusai is egyeznek (pl. pop 20.0, nem 20)
+        assert {k: type(v) for k, v in new_fields.items()} == {k: type(v) for k, v in old_fields.items()}
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_matches_legacy_output(seed):
+    payload = make_payload(seed, int_values=seed % 5 == 0)
+    assert_same_forecast(process_forecast_data(payload), legacy_process_forecast_data(payload), payload)
+
+
+def test_matches_legacy_past_slots_and_seven_day_cap():
+    """Tegnapi mérések kimaradnak, 10 nap adatból csak az első 7 jövőbeli nap marad"""
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    payload = make_payload(99, slots=80, start=start)
+
+    new = process_forecast_data(payload)
+    assert_same_forecast(new, legacy_process_forecast_data(payload), payload)
+    assert len(new.forecasts) == 7
+    assert new.forecasts[0].date == datetime.now().strftime("%Y-%m-%d")
+
+
+def test_day_night_edge_hours():
+    """6 és 21 óra éjszakai, 9 és 18 óra nappali, 7-8 és 19-20 óra egyik sem"""
+    day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    temps = {6: 1.0, 7: 50.0, 9: 10.0, 18: 20.0, 20: 50.0, 21: 3.0}
+    payload = {
+        "city": {"name": "Budapest", "country": "HU"},
+        "list": [
+            {
+                "dt": int((day + timedelta(hours=hour)).timestamp()),
+                "main": {"temp": temp, "humidity": 50, "pressure": 1000},
+                "wind": {"speed": 1.0},
+                "weather": [{"description": "derült ég", "icon": "01d"}]
+            }
+            for hour, temp in temps.items()
+        ]
+    }
+
+    forecast = process_forecast_data(payload).forecasts[0]
+    assert forecast.day_temp == 15.0
+    assert forecast.night_temp == 2.0
+    assert forecast.pop == 0.0
+    assert_same_forecast(process_forecast_data(payload), legacy_process_forecast_data(payload), payload)
+
+
+def test_most_common_tie_takes_first_seen():
+    payload = make_payload(1, slots=2, start=datetime.now() + timedelta(days=1))
+    payload["list"][0]["weather"][0].update(description="gyenge eső", icon="10d")
+    payload["list"][1]["weather"][0].update(description="derült ég", icon="01d")
+    payload["list"][1]["dt"] = payload["list"][0]["dt"] + 60
+
+    forecast = process_forecast_data(payload).forecasts[0]
+    assert (forecast.description, forecast.icon) == ("gyenge eső", "10d")
+
+
+def test_invalid_payload_returns_none():
+    assert process_forecast_data({"city": {"name": "Budapest"}, "list": []}) is None
+    assert process_forecast_data({"city": {"name": "Budapest", "country": "HU"}, "list": [{"dt": 0}]}) is None
+
+
+def test_batch_processing():
+    payloads = [make_payload(seed) for seed in range(10)]
+    payloads.insert(3, {"list": []})
+
+    results = process_forecast_batch(payloads)
+    assert len(results) == 11
+    assert results[3] is None
+    for payload, result in zip(payloads, results):
+        if result is not None:
+            assert_same_forecast(result, legacy_process_forecast_data(payload), payload)
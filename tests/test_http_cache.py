@@ -0,0 +1,104 @@
+"""
+HTTP feltételes gyorsítótárazás tesztelése
+"""
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+import backend.main as backend_main
+from backend.http_cache import http_date
+
+client = TestClient(backend_main.app)
+
+
+def _weather(city: str, age_seconds: float = 0):
+    return {
+        "city": city, "temperature": 15.0, "humidity": 55, "pressure": 1012, "wind_speed": 1.5,
+        "description": "derült ég", "icon": "01d",
+        "timestamp": datetime.utcnow() - timedelta(seconds=age_seconds)
+    }
+
+
+def test_current_weather_etag_roundtrip():
+    """Második kérés ugyanazzal az ETag-gel 304, új mérés után 200"""
+    backend_main.save_weather_to_db(_weather("Etagváros", age_seconds=60))
+
+    first = client.get("/api/weather", params={"city": "Etagváros"})
+    etag = first.headers["ETag"]
+    max_age = int(first.headers["Cache-Control"].split("max-age=")[1])
+    assert 0 < max_age <= backend_main.config.WEATHER_SOFT_MAX_AGE - 60
+
+    cached = client.get("/api/weather", params={"city": "Etagváros"}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    backend_main.save_weather_to_db(_weather("Etagváros"))
+    changed = client.get("/api/weather", params={"city": "Etagváros"}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_history_if_modified_since_skips_query():
+    """If-Modified-Since esetén az előzmény lekérdezés nem fut le"""
+    backend_main.save_weather_to_db(_weather("Dátumváros", age_seconds=30))
+    first = client.get("/api/weather/history", params={"city": "Dátumváros"})
+    last_modified = first.headers["Last-Modified"]
+
+    with patch.object(backend_main, "get_weather_history_async") as history:
+        cached = client.get("/api/weather/history", params={"city": "Dátumváros"},
+                            headers={"If-Modified-Since": last_modified})
+    assert cached.status_code == 304
+    history.assert_not_called()
+
+    older = http_date(datetime.utcnow() - timedelta(hours=1))
+    assert client.get("/api/weather/history", params={"city": "Dátumváros"},
+                      headers={"If-Modified-Since": older}).status_code == 200
+
+
+def test_history_etag_depends_on_limit():
+    backend_main.save_weather_to_db(_weather("Limitváros"))
+    etag = client.get("/api/weather/history", params={"city": "Limitváros", "limit": 5}).headers["ETag"]
+    response = client.get("/api/weather/history", params={"city": "Limitváros", "limit": 10},
+                          headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+def test_forecast_max_age_follows_cache_ttl():
+    """Az előrejelzés max-age-e a cache bejegyzés hátralévő élettartama"""
+    forecast = backend_main.ForecastResponse(city="Budapest", country="HU", forecasts=[],
+                                             last_update=datetime.utcnow())
+    backend_main.forecast_cache.clear()
+    with patch.object(backend_main, "fetch_forecast_from_api", return_value=forecast):
+        first = client.get("/api/forecast", params={"city": "Budapest"})
+
+    max_age = int(first.headers["Cache-Control"].split("max-age=")[1])
+    assert 0 < max_age <= backend_main.config.FORECAST_CACHE_TTL
+    cached = client.get("/api/forecast", params={"city": "budapest"},
+                        headers={"If-None-Match": first.headers["ETag"]})
+    assert cached.status_code == 304
+
+
+def test_stale_weather_304_keeps_stale_headers():
+    """Elavult adat visszaigazolásakor a 304 is jelzi az elavultságot"""
+    backend_main.save_weather_to_db(_weather("Avultváros", age_seconds=backend_main.config.WEATHER_SOFT_MAX_AGE + 60))
+
+    with patch.object(backend_main, "revalidate_weather"):
+        etag = client.get("/api/weather", params={"city": "Avultváros"}).headers["ETag"]
+        cached = client.get("/api/weather", params={"city": "Avultváros"}, headers={"If-None-Match": etag})
+
+    assert cached.status_code == 304
+    assert cached.headers["X-Data-Stale"] == "true"
+    assert int(cached.headers["Age"]) >= backend_main.config.WEATHER_SOFT_MAX_AGE
+
+
+def test_stats_has_no_last_modified():
+    """A csúszó ablakú statisztikát csak az ETag validálja, az If-Modified-Since nem ad 304-et"""
+    backend_main.save_weather_to_db(_weather("Ablakváros", age_seconds=30))
+    first = client.get("/api/weather/stats", params={"city": "Ablakváros"})
+    assert first.status_code == 200
+    assert "Last-Modified" not in first.headers
+
+    since = http_date(datetime.utcnow() + timedelta(hours=1))
+    assert client.get("/api/weather/stats", params={"city": "Ablakváros"},
+                      headers={"If-Modified-Since": since}).status_code == 200
@@ -0,0 +1,40 @@
+"""
+Séma migrációk tesztelése
+"""
+from sqlalchemy import create_engine, inspect, text
+
+from backend.migrations import MIGRATIONS, applied_versions, run_migrations
+
+
+def test_legacy_database_upgraded_in_place(tmp_path):
+    """A régi create_all sémájú adatbázis adatvesztés nélkül frissül"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE weather (id INTEGER PRIMARY KEY, city VARCHAR, temperature FLOAT, "
+            "humidity INTEGER, pressure INTEGER, wind_speed FLOAT, description VARCHAR, "
+            "icon VARCHAR, timestamp DATETIME)"
+        ))
+        conn.execute(text("CREATE INDEX ix_weather_city ON weather (city)"))
+        conn.execute(text("CREATE INDEX ix_weather_id ON weather (id)"))
+        conn.execute(text(
+            "INSERT INTO weather (city, temperature, humidity, description, timestamp) "
+            "VALUES ('Budapest', 21.5, 50, 'napos', '2024-01-01 12:00:00')"
+        ))
+
+    ran = run_migrations(engine)
+
+    assert ran == sorted(version for version, _, _ in MIGRATIONS)
+    indexes = {index["name"] for index in inspect(engine).get_indexes("weather")}
+    assert "ix_weather_city_timestamp" in indexes
+    assert "ix_weather_city" not in indexes
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM weather")).scalar() == 1
+        assert conn.execute(text("SELECT city, temperature FROM latest_weather")).all() == [("Budapest", 21.5)]
+        assert conn.execute(text("SELECT bucket_start, count FROM weather_hourly")).all() == [
+            ("2024-01-01 12:00:00.000000", 1)
+        ]
+
+    # Második futtatás nem csinál semmit
+    assert run_migrations(engine) == []
+    assert applied_versions(engine) == ran
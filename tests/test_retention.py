@@ -0,0 +1,66 @@
+"""
+Adatmegőrzés tesztelése
+"""
+from datetime import datetime, timedelta
+
+import backend.main as backend_main
+from backend.models import WeatherRecord, WeatherHourly, WeatherDaily
+from backend.retention import RetentionJob
+from backend.writer import WeatherWriter
+
+CITY = "Megőrzésfalva"
+
+
+def _reading(days_ago: float):
+    return {
+        "city": CITY, "temperature": 10.0, "humidity": 50, "pressure": 1000, "wind_speed": 1.0,
+        "description": "teszt", "icon": "01d",
+        "timestamp": datetime.utcnow() - timedelta(days=days_ago)
+    }
+
+
+def test_retention_purges_in_batches_and_keeps_daily():
+    """Régi nyers sorok és óránkénti összesítések törlődnek, a napi összesítés megmarad"""
+    backend_main.save_weather_batch_to_db(
+        [_reading(100 + i / 24) for i in range(10)]   # óránkénti megőrzésen túl
+        + [_reading(50 + i / 24) for i in range(7)]   # nyers megőrzésen túl
+        + [_reading(i / 24) for i in range(5)]        # friss
+    )
+
+    job = RetentionJob(backend_main.SessionLocal, raw_days=35, hourly_days=90, batch_size=4, pause=0)
+    progress = job.run()
+
+    assert progress["state"] == "done"
+    assert progress["deleted"] == {"weather": 17, "weather_hourly": 10}
+    assert progress["batches"] > 2
+
+    db = backend_main.SessionLocal()
+    try:
+        assert db.query(WeatherRecord).filter(WeatherRecord.city == CITY).count() == 5
+        assert db.query(WeatherHourly).filter(WeatherHourly.city == CITY).count() == 12
+        daily_total = sum(row.count for row in db.query(WeatherDaily).filter(WeatherDaily.city == CITY))
+        assert daily_total == 22
+    finally:
+        db.close()
+
+
+def test_retention_batches_run_through_writer():
+    """A törlő kötegek a write_func-on (az író szálon) futnak"""
+    backend_main.save_weather_batch_to_db([_reading(60 + i / 24) for i in range(3)])
+
+    writer = WeatherWriter(backend_main.save_weather_batch_to_db)
+    calls = []
+
+    def write_func(func):
+        calls.append(func)
+        return writer.run(func)
+
+    try:
+        progress = RetentionJob(backend_main.SessionLocal, raw_days=35, hourly_days=90,
+                                batch_size=100, pause=0, write_func=write_func).run()
+    finally:
+        writer.stop()
+
+    assert progress["state"] == "done"
+    assert progress["deleted"]["weather"] >= 3
+    assert len(calls) == progress["batches"]
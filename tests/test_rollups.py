@@ -0,0 +1,123 @@
+"""
+Óránkénti/napi összesítések tesztelése
+"""
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql
+
+import backend.main as backend_main
+from backend.models import WeatherRecord, WeatherDaily
+from backend.rollups import WindowStats, next_hour, next_day, weather_stats_matrix_stmt, weather_stats_stmt
+
+CITY = "Rollupváros"
+
+
+@pytest.fixture(scope="module")
+def seeded():
+    """Három napnyi, szabálytalan időközű mérés"""
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    readings = []
+    ts = now - timedelta(days=3)
+    while ts < now:
+        readings.append({
+            "city": CITY, "temperature": round(rng.uniform(-5, 30), 2), "humidity": rng.randint(30, 95),
+            "pressure": 1010, "wind_speed": 1.0, "description": "teszt", "icon": "01d", "timestamp": ts
+        })
+        ts += timedelta(minutes=rng.randint(7, 53))
+    # Két részletben mentjük, hogy a meglévő időszakok frissítése is le legyen fedve
+    backend_main.save_weather_batch_to_db(readings[::2])
+    backend_main.save_weather_batch_to_db(readings[1::2])
+    return readings
+
+
+def _raw_stats(db, hours):
+    since = datetime.utcnow() - timedelta(hours=hours)
+    return db.query(
+        func.count(WeatherRecord.id), func.avg(WeatherRecord.temperature),
+        func.min(WeatherRecord.temperature), func.max(WeatherRecord.temperature),
+        func.avg(WeatherRecord.humidity)
+    ).filter(WeatherRecord.city == CITY, WeatherRecord.timestamp >= since).one()
+
+
+@pytest.mark.parametrize("hours", [1, 5, 23, 30, 49, 72, 720])
+def test_rollup_stats_match_raw_aggregates(seeded, hours):
+    """A rollup alapú statisztika megegyezik a nyers sorokon számolttal"""
+    db = backend_main.SessionLocal()
+    try:
+        stats = backend_main.get_weather_stats(db, CITY, hours)
+        count, avg_temp, min_temp, max_temp, avg_humidity = _raw_stats(db, hours)
+    finally:
+        db.close()
+
+    assert stats.record_count == count
+    assert stats.avg_temperature == round(avg_temp, 1)
+    assert stats.min_temperature == min_temp
+    assert stats.max_temperature == max_temp
+    assert stats.avg_humidity == round(avg_humidity, 1)
+
+
+def test_daily_rollup_totals(seeded):
+    """A napi összesítések a mérések számát pontosan tartalmazzák"""
+    db = backend_main.SessionLocal()
+    try:
+        total = db.query(func.sum(WeatherDaily.count)).filter(WeatherDaily.city == CITY).scalar()
+    finally:
+        db.close()
+    assert total == len(seeded)
+
+
+def test_bucket_edges():
+    """Határra eső időpont saját maga a határ"""
+    edge = datetime(2024, 5, 1, 0, 0)
+    assert next_hour(edge) == edge
+    assert next_day(edge) == edge
+    assert next_hour(edge + timedelta(seconds=1)) == edge + timedelta(hours=1)
+    assert next_day(edge + timedelta(minutes=5)) == edge + timedelta(days=1)
+
+
+def test_stats_matrix_matches_single_queries(seeded):
+    """A város × időablak mátrix cellái megegyeznek az egyenkénti statisztikával"""
+    hours_list = [1, 5, 30, 720]
+    db = backend_main.SessionLocal()
+    try:
+        matrix = backend_main.get_weather_stats_matrix(db, [CITY, "Nincsilyenváros"], hours_list)
+        single = {hours: backend_main.get_weather_stats(db, CITY, hours) for hours in hours_list}
+    finally:
+        db.close()
+
+    assert matrix.hours == hours_list
+    assert matrix.stats["Nincsilyenváros"] == {str(hours): None for hours in hours_list}
+    for hours in hours_list:
+        cell = matrix.stats[CITY][str(hours)]
+        assert cell.record_count == single[hours].record_count
+        assert cell.avg_temperature == single[hours].avg_temperature
+        assert cell.min_temperature == single[hours].min_temperature
+        assert cell.max_temperature == single[hours].max_temperature
+        assert cell.avg_humidity == single[hours].avg_humidity
+
+
+def test_stats_from_row_with_decimal_count():
+    """PostgreSQL-en a SUM(bigint) Decimal darabszámot ad - ettől nem szabad elhasalni"""
+    row = WindowStats(Decimal(4), 50.0, 10.0, 15.0, 262.0, datetime(2024, 5, 1))
+    stats = backend_main.stats_from_row(CITY, row)
+    assert stats.record_count == 4 and isinstance(stats.record_count, int)
+    assert stats.avg_temperature == 12.5
+    assert stats.avg_humidity == 65.5
+    assert backend_main.stats_from_row(CITY, WindowStats(Decimal(0), None, None, None, None, None)) is None
+
+
+def test_stats_count_is_cast_to_integer_on_postgresql():
+    sql = str(weather_stats_stmt(CITY, datetime(2024, 5, 1)).compile(dialect=postgresql.dialect()))
+    assert "CAST(coalesce(sum(anon_1.count)" in sql and "AS INTEGER) AS count" in sql
+
+
+def test_stats_matrix_counts_are_cast_to_integer_on_postgresql():
+    sinces = [datetime(2024, 5, 1), datetime(2024, 4, 1)]
+    sql = str(weather_stats_matrix_stmt([CITY], sinces).compile(dialect=postgresql.dialect()))
+    for index in range(len(sinces)):
+        assert f"AS INTEGER) AS w{index}_count" in sql
@@ -0,0 +1,69 @@
+"""
+Scheduler tesztelése
+"""
+import time
+from unittest.mock import patch
+
+from backend.scheduler import WeatherScheduler
+
+CITIES = [f"Város{i}" for i in range(8)]
+
+
+def test_scheduled_update_runs_cities_in_parallel():
+    """A ciklusidő a leglassabb városhoz igazodik, nem a városok számához"""
+    def slow_fetch(city):
+        time.sleep(0.2)
+        return {"city": city}
+
+    scheduler = WeatherScheduler(slow_fetch, lambda rows: len(rows), max_workers=8)
+    with patch("backend.scheduler.config.DEFAULT_CITIES", CITIES):
+        cycle = scheduler.scheduled_update()
+
+    assert cycle["success_count"] == len(CITIES)
+    assert cycle["duration_seconds"] < 0.2 * len(CITIES) / 2
+    assert scheduler.last_cycle is cycle
+
+
+def test_scheduled_update_reports_failures_per_city():
+    """Városonkénti eredmények, hibás város nem állítja meg a ciklust"""
+    def fetch(city):
+        if city == "Város3":
+            raise RuntimeError("upstream hiba")
+        return None if city == "Város5" else {"city": city}
+
+    scheduler = WeatherScheduler(fetch, lambda rows: len(rows), max_workers=3)
+    with patch("backend.scheduler.config.DEFAULT_CITIES", CITIES):
+        cycle = scheduler.scheduled_update()
+
+    assert cycle["results"]["Város3"] is False
+    assert cycle["results"]["Város5"] is False
+    assert cycle["success_count"] == len(CITIES) - 2
+
+
+def test_scheduled_update_flushes_cycle_in_one_batch():
+    """A ciklus adatai egyetlen csoportos mentéssel kerülnek az adatbázisba"""
+    import backend.main as backend_main
+
+    batches = []
+
+    def save_batch(weather_list):
+        batches.append(weather_list)
+        return backend_main.save_weather_batch_to_db(weather_list)
+
+    def fetch(city):
+        return {"city": city, "temperature": 12.5, "humidity": 70, "pressure": 1008,
+                "wind_speed": 4.0, "description": "eső", "icon": "10d",
+                "timestamp": backend_main.datetime.utcnow()}
+
+    scheduler = WeatherScheduler(fetch, save_weather_batch_func=save_batch, max_workers=4)
+    with patch("backend.scheduler.config.DEFAULT_CITIES", CITIES):
+        cycle = scheduler.scheduled_update()
+
+    assert len(batches) == 1 and len(batches[0]) == len(CITIES)
+    assert cycle["success_count"] == len(CITIES)
+
+    db = backend_main.SessionLocal()
+    try:
+        assert backend_main.get_latest_weather(db, "Város0").description == "eső"
+    finally:
+        db.close()
@@ -0,0 +1,51 @@
+"""
+Upstream kliens tesztelése
+"""
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from backend.upstream import UpstreamClient
+
+
+def test_session_is_shared():
+    """A session egyszer jön létre és újrahasznosítódik"""
+    client = UpstreamClient(api_key="abc", max_connections=4)
+    session = client.session
+    assert client.session is session
+    adapter = session.get_adapter("https://api.openweathermap.org")
+    assert adapter._pool_maxsize == 4
+    client.close()
+    assert client._session is None
+
+
+@patch('requests.Session.get')
+def test_get_adds_default_params(mock_get):
+    """Az API kulcs és az alapparaméterek minden híváshoz bekerülnek"""
+    mock_get.return_value = Mock(status_code=200)
+    client = UpstreamClient(base_url="http://fake.local/data/2.5/", api_key="abc", connect_timeout=1)
+
+    client.get("/weather", params={"q": "Budapest"}, timeout=5)
+
+    args, kwargs = mock_get.call_args
+    assert args[0] == "http://fake.local/data/2.5/weather"
+    assert kwargs["params"] == {"appid": "abc", "lang": "hu", "units": "metric", "q": "Budapest"}
+    assert kwargs["timeout"] == (1, 5)
+
+
+def test_busy_pool_wait_is_bounded():
+    """Foglalt poolnál a hívó legfeljebb pool_timeout-ig vár, utána ConnectionError"""
+    client = UpstreamClient(base_url="http://127.0.0.1:9", max_connections=1, pool_timeout=0.2, retries=0)
+    adapter = client.session.get_adapter("http://127.0.0.1:9")
+    pool = adapter.poolmanager.connection_from_url("http://127.0.0.1:9")
+    held = pool._get_conn()  # az egyetlen kapcsolatot más "használja"
+
+    started = time.monotonic()
+    with pytest.raises(requests.exceptions.ConnectionError, match="Nincs szabad upstream kapcsolat"):
+        client.get("/weather", params={"q": "Budapest"}, timeout=1)
+    assert time.monotonic() - started < 1
+
+    pool._put_conn(held)
+    client.close()
@@ -0,0 +1,69 @@
+"""
+Író szál tesztelése
+"""
+import threading
+
+import pytest
+
+from backend.writer import WeatherWriter
+
+
+def test_writer_batches_concurrent_submits():
+    """Egyszerre beküldött elemek egy tranzakcióba kerülnek"""
+    batches = []
+    writer = WeatherWriter(lambda rows: batches.append(rows) or len(rows), batch_size=100, flush_interval=0.2)
+
+    futures = [writer.submit([{"city": f"V{i}"}]) for i in range(10)]
+    assert [f.result(timeout=2) for f in futures] == [1] * 10
+    assert len(batches) == 1 and len(batches[0]) == 10
+    writer.stop()
+    assert not writer.is_running
+
+
+def test_writer_size_trigger_and_failure():
+    """A méret trigger kötegekre bont; sikertelen mentésnél 0 az eredmény"""
+    batches = []
+    gate = threading.Event()
+
+    def write(rows):
+        gate.wait(2)
+        batches.append(len(rows))
+        return 0 if len(batches) == 1 else len(rows)
+
+    writer = WeatherWriter(write, batch_size=3, flush_interval=1)
+    futures = [writer.submit([{"n": i}]) for i in range(7)]
+    gate.set()
+
+    assert [f.result(timeout=3) for f in futures] == [0, 0, 0, 1, 1, 1, 1]
+    assert batches == [3, 3, 1]
+    assert writer.stats["failed_batches"] == 1
+    writer.stop()
+
+
+def test_writer_stop_flushes_queue():
+    """Leállításkor a sorban maradt elemek is kiíródnak"""
+    written = []
+    writer = WeatherWriter(lambda rows: written.extend(rows) or len(rows), flush_interval=0.5)
+    futures = [writer.submit([{"n": i}]) for i in range(5)]
+    writer.stop()
+    assert len(written) == 5
+    assert all(f.done() for f in futures)
+
+
+def test_writer_runs_jobs_in_order_with_batches():
+    """Az egyedi feladatok az író szálon, a beküldés sorrendjében futnak; a kivétel visszajut"""
+    events = []
+    writer = WeatherWriter(lambda rows: events.append(("batch", len(rows))) or len(rows), flush_interval=0.2)
+
+    first = writer.submit([{"n": 1}, {"n": 2}])
+    assert writer.run(lambda: events.append(("job", threading.current_thread().name)) or 42) == 42
+    assert first.result(timeout=2) == 2
+    assert events == [("batch", 2), ("job", "weather-writer")]
+
+    def fail():
+        raise ValueError("hibás feladat")
+
+    with pytest.raises(ValueError):
+        writer.run(fail)
+    assert writer.submit([{"n": 3}]).result(timeout=2) == 1
+    writer.stop()